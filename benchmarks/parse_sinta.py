@@ -0,0 +1,67 @@
+"""
+Bandingkan backend parser halaman SINTA pada halaman fixture.
+
+    python -m benchmarks.parse_sinta [--repeat 200] [--fixtures benchmarks/fixtures]
+
+Fixture berisi satu halaman per view (garuda, scopus, google_scholar,
+researches) dengan struktur ar-list-item seperti halaman profil SINTA.
+Halaman asli bisa disimpan ke folder yang sama (nama file = view) untuk
+mengukur ulang.
+"""
+import argparse
+import os
+import time
+
+from repository.sinta_parser import BACKENDS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixtures(directory: str) -> dict:
+    pages = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".html"):
+            with open(os.path.join(directory, name), "rb") as f:
+                pages[name[:-len(".html")]] = f.read()
+    return pages
+
+
+def bench(parse, content: bytes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(content)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    backends = list(BACKENDS)
+    baseline = "html.parser"
+
+    print(f"{'view':<16}" + "".join(f"{name:>14}" for name in backends) + "   items")
+    totals = dict.fromkeys(backends, 0.0)
+    for view, content in pages.items():
+        # Semua backend harus menghasilkan record yang sama
+        expected = BACKENDS[baseline](content)
+        for name in backends:
+            if BACKENDS[name](content) != expected:
+                print(f"⚠️ {name} berbeda dari {baseline} pada {view}")
+
+        row = f"{view:<16}"
+        for name in backends:
+            seconds = bench(BACKENDS[name], content, args.repeat)
+            totals[name] += seconds
+            row += f"{seconds * 1000:>12.2f}ms"
+        print(row + f"{len(expected):>8}")
+
+    print(f"{'total':<16}" + "".join(f"{totals[name] * 1000:>12.2f}ms" for name in backends))
+    print(f"{'speedup':<16}" + "".join(f"{totals[baseline] / totals[name]:>13.1f}x" for name in backends))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,13 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, exc
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from starlette.concurrency import run_in_threadpool
+from collections import deque
 from dotenv import load_dotenv
 import os
+import threading
+import time
 
 # Load dari file .env
 load_dotenv()
@@ -15,12 +21,110 @@ DB_PORT = os.getenv("DB_PORT")  # Default MySQL port
 
 # Buat URL database
 SQLALCHEMY_DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# URL async untuk endpoint read-only; untuk testing bisa sqlite+aiosqlite:///test.db
+ASYNC_DATABASE_URL = os.getenv(
+    "ASYNC_DATABASE_URL",
+    f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+# Pengaturan connection pool (per worker uvicorn)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Harus lebih kecil dari wait_timeout MySQL agar koneksi basi didaur ulang dulu
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_ISOLATION_LEVEL = os.getenv("DB_ISOLATION_LEVEL")  # mis. READ COMMITTED; kosong = default server
+# Pool async (endpoint read-only) terpisah dari pool sinkron; koneksi maksimum
+# per worker = DB_POOL_SIZE + DB_MAX_OVERFLOW + ASYNC_DB_POOL_SIZE + ASYNC_DB_MAX_OVERFLOW
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "3"))
+ASYNC_DB_MAX_OVERFLOW = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", "5"))
+
+
+class PoolMetrics:
+    """Statistik waktu tunggu checkout koneksi dari pool."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            p95 = recent[int(len(recent) * 0.95) - 1] if recent else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "p95_wait_ms": round(p95 * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class MonitoredQueuePool(QueuePool):
+    """QueuePool yang mencatat berapa lama request menunggu koneksi."""
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+
+class MonitoredAsyncQueuePool(MonitoredQueuePool, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+
+engine_options = dict(
+    poolclass=MonitoredQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+if DB_ISOLATION_LEVEL:
+    engine_options["isolation_level"] = DB_ISOLATION_LEVEL
 
 # Buat engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **{
+        **engine_options,
+        "poolclass": MonitoredAsyncQueuePool,
+        "pool_size": ASYNC_DB_POOL_SIZE,
+        "max_overflow": ASYNC_DB_MAX_OVERFLOW,
+    }
+)
 
 # Buat session factory
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 # Buat deklarasi model
 Base = declarative_base()
@@ -31,4 +135,72 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Dependency async untuk endpoint read-only (search & statistik), tidak memakai threadpool
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _call_with_session(func, *args, **kwargs):
+    with SessionLocal() as db:
+        return func(db, *args, **kwargs)
+
+
+async def run_in_sync_session(func, *args, **kwargs):
+    """
+    Seperti AsyncSession.run_sync, tapi di threadpool dengan session sinkron
+    sendiri. Untuk kerja yang memakan CPU (mis. membangun inverted index) agar
+    tidak memblokir event loop.
+    """
+    return await run_in_threadpool(_call_with_session, func, *args, **kwargs)
+
+
+def get_pool_status(bind=engine) -> dict:
+    """Konfigurasi, jumlah koneksi terpakai dan waktu tunggu checkout pool."""
+    pool = bind.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            pool_size=pool.size(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+            recycle=DB_POOL_RECYCLE,
+            pre_ping=DB_POOL_PRE_PING,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    status["wait"] = getattr(pool, "metrics", pool_metrics).snapshot()
+    return status
+
+
+def create_missing_indexes(bind=engine):
+    """
+    Migrasi index untuk database lama: create_all tidak menambah index ke tabel
+    yang sudah ada, jadi buat index di metadata yang belum ada di database.
+    Langkah migrasi eksplisit (`python -m migrate indexes` atau POST
+    /migrate/indexes), tidak dijalankan saat startup worker.
+    """
+    inspector = inspect(bind)
+    created = []
+
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        existing |= {uq["name"] for uq in inspector.get_unique_constraints(table.name)}
+
+        for index in table.indexes:
+            # Index khusus dialect (mis. FULLTEXT MySQL) dilewati di dialect lain
+            dialect = index.info.get("dialect")
+            if dialect and dialect != bind.dialect.name:
+                continue
+            if index.name not in existing:
+                index.create(bind=bind, checkfirst=True)
+                created.append(index.name)
+
+    return created
@@ -1,16 +1,32 @@
 from fastapi import FastAPI, Depends
-from database import engine
+from database import engine, SessionLocal
 import models
+from repository.bulk import check_dialect
+from repository.jobs import mark_interrupted_jobs, start_job_monitor
 import os
-from routes import authors,garuda,scopus, database, researches
+from routes import authors,garuda,scopus, database, researches, jobs
+# Router scholar belum dipasang, tapi handler job sync_scholar didaftarkan saat modul di-import
+from routes import scholar
 from routes.search import articles as search_articles, authors as search_authors, researches as search_researches
 from routes.statistics import articles as stats_articles,researches as stats_researches, overall as stats_overall
 
 # Buat instance FastAPI
 app = FastAPI()
 
+# Upload/sync memakai upsert khusus dialect: tolak dialect yang tidak didukung sejak awal
+check_dialect(engine)
+
 # Buat tabel di database jika belum ada
 models.Base.metadata.create_all(bind=engine)
+# Index baru untuk tabel lama dibuat lewat `python -m migrate indexes`
+
+# Token nama user lama dilengkapi lewat `python -m migrate name-tokens`, bukan di sini
+# Tabel ringkasan statistik untuk data lama diisi lewat `python -m migrate stats`
+with SessionLocal() as db:
+    # Job yang heartbeat-nya kedaluwarsa (worker mati/restart) ditandai failed supaya bisa di-resume
+    mark_interrupted_jobs(db)
+# Heartbeat job milik proses ini + pengecekan job terputus secara berkala
+start_job_monitor()
 
 print("✅ Loaded DB HOST:", os.getenv("DB_HOST"))
 
@@ -28,6 +44,7 @@ app.include_router(stats_overall.router, prefix="/api")
 app.include_router(stats_articles.router, prefix="/api")
 app.include_router(stats_researches.router, prefix="/api")
 app.include_router(database.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
 
 
 
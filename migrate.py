@@ -0,0 +1,50 @@
+"""
+Langkah migrasi satu kali untuk database yang sudah ada. Tidak dijalankan
+saat startup, supaya worker uvicorn tidak mengulangnya setiap boot.
+
+    python -m migrate indexes name-tokens stats
+    python -m migrate all
+"""
+import argparse
+
+from database import SessionLocal, create_missing_indexes, engine
+from repository.stats_rollup import ensure_stats_rollup
+from repository.user import backfill_user_name_tokens
+
+
+def migrate_indexes():
+    created = create_missing_indexes(bind=engine)
+    print(f"✅ {len(created)} index dibuat: {', '.join(created) or '-'}")
+
+
+def migrate_name_tokens():
+    with SessionLocal() as db:
+        count = backfill_user_name_tokens(db)
+    print(f"✅ Token nama dibuat untuk {count} user")
+
+
+def migrate_stats():
+    with SessionLocal() as db:
+        built = ensure_stats_rollup(db)
+    print("✅ Tabel ringkasan statistik dibangun" if built else "✅ Tabel ringkasan statistik sudah terisi")
+
+
+STEPS = {
+    "indexes": migrate_indexes,
+    "name-tokens": migrate_name_tokens,
+    "stats": migrate_stats,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("steps", nargs="+", choices=[*STEPS, "all"])
+    args = parser.parse_args()
+
+    steps = list(STEPS) if "all" in args.steps else args.steps
+    for step in steps:
+        STEPS[step]()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, Boolean, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, BigInteger, String, Float, ForeignKey, Text, Boolean, UniqueConstraint, Index, DateTime, JSON
+from sqlalchemy import event, delete, insert, inspect
+from sqlalchemy.orm import column_property, relationship
 from database import Base
+from search.text import name_tokens
 
 
 class User(Base):
@@ -9,6 +11,21 @@ class User(Base):
     name = Column(String(255), nullable=True)
     npp = Column(String(255), nullable=True)
     author = relationship("Author", back_populates="user", uselist=False)
+    __table_args__ = (
+        Index("ix_users_name", "name"),
+    )
+
+
+class UserNameToken(Base):
+    """Token nama ternormalisasi per user, supaya pencarian nama bisa index seek."""
+    __tablename__ = "user_name_tokens"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    token = Column(String(64), nullable=False)
+    __table_args__ = (
+        Index("ix_user_name_tokens_token_user", "token", "user_id"),
+        Index("ix_user_name_tokens_user", "user_id"),
+    )
 
 class Author(Base):
     __tablename__ = "authors"
@@ -29,23 +46,48 @@ class Author(Base):
     publications = relationship("PublicationAuthor", back_populates="author")
     research = relationship("ResearcherAuthor", back_populates="author")
     subjects = relationship("UserSubject", back_populates="author")
+    __table_args__ = (
+        Index("ix_authors_sinta_id", "sinta_id"),
+    )
+
+# Department per profil SINTA, agar scrape_sinta tidak mengambil ulang halaman profil setiap run
+class AuthorDepartmentCache(Base):
+    __tablename__ = "author_department_cache"
+    id = Column(Integer, primary_key=True, index=True)
+    profile_url = Column(String(255), nullable=False, unique=True)
+    department = Column(String(255), nullable=True)
+    fetched_at = Column(DateTime, nullable=False)
 
 
 class Article(Base):
     __tablename__ = "articles"
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
-    year = Column(Integer)
+    # active_history: nilai lama dimuat saat diubah, dipakai stats_rollup untuk mengurangi kunci lama
+    year = column_property(Column(Integer), active_history=True)
     doi = Column(String(255), default="None", nullable=True)
     accred = Column(String(255), nullable=True)
     abstract = Column(Text)
     citation_count = Column(Integer, nullable=True)
     article_url = Column(Text, nullable=True)
     journal = Column(String(255))
-    source = Column(String(255))
+    source = column_property(Column(String(255)), active_history=True)
     university = Column(String(255))
     authors = relationship("PublicationAuthor", back_populates="article")
     keywords = relationship("ArticleKeyword", back_populates="article")
+    __table_args__ = (
+        # Filter sumber/tahun + urutan listing dan keyset pagination (nilai, id)
+        Index("ix_articles_source_year_id", "source", "year", "id"),
+        Index("ix_articles_year_id", "year", "id"),
+        Index("ix_articles_citation_id", "citation_count", "id"),
+        # Lookup duplikat saat upload/sync
+        Index("ix_articles_title", "title"),
+        Index("ix_articles_doi", "doi"),
+        # FULLTEXT hanya dibuat di MySQL; database lain memakai fallback LIKE.
+        # info['dialect'] dibaca create_missing_indexes, ddl_if dipakai create_all
+        Index("ft_articles_title", "title", mysql_prefix="FULLTEXT", info={"dialect": "mysql"}).ddl_if(dialect="mysql"),
+        Index("ft_articles_title_abstract", "title", "abstract", mysql_prefix="FULLTEXT", info={"dialect": "mysql"}).ddl_if(dialect="mysql"),
+    )
 
 class Subject(Base):
     __tablename__ = "subjects"
@@ -53,6 +95,9 @@ class Subject(Base):
     name = Column(String(255), nullable=True)
 
     authors = relationship("UserSubject", back_populates="subject")
+    __table_args__ = (
+        Index("ix_subjects_name", "name"),
+    )
 
 class UserSubject(Base):
     __tablename__ = "user_subjects"
@@ -63,19 +108,31 @@ class UserSubject(Base):
 
     author = relationship("Author", back_populates="subjects")
     subject = relationship("Subject", back_populates="authors")
+    __table_args__ = (
+        Index("ix_user_subjects_author_subject", "author_id", "subject_id"),
+        Index("ix_user_subjects_subject", "subject_id"),
+    )
 
 
 class Research(Base):
     __tablename__ = "research"
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
-    fund = Column(Integer)
+    # active_history: nilai lama dimuat saat diubah, dipakai stats_rollup untuk mengurangi kunci lama
+    fund = column_property(Column(Integer), active_history=True)
     fund_status = Column(String(255))
-    fund_source = Column(String(255))
+    fund_source = column_property(Column(String(255)), active_history=True)
     fund_type = Column(String(255))
-    year = Column(Integer)
+    year = column_property(Column(Integer), active_history=True)
     leader_name = Column(String(255), nullable=True)
     authors = relationship("ResearcherAuthor", back_populates="research")
+    __table_args__ = (
+        Index("ix_research_fund_source_year", "fund_source", "year"),
+        Index("ix_research_year_id", "year", "id"),
+        Index("ix_research_fund_id", "fund", "id"),
+        Index("ix_research_title_year", "title", "year"),
+        Index("ft_research_title", "title", mysql_prefix="FULLTEXT", info={"dialect": "mysql"}).ddl_if(dialect="mysql"),
+    )
 
 class ResearcherAuthor(Base):
     __tablename__ = "researchers_authors"
@@ -85,6 +142,10 @@ class ResearcherAuthor(Base):
     is_leader = Column(Boolean, default=False)
     research = relationship("Research", back_populates="authors")
     author = relationship("Author", back_populates="research")
+    __table_args__ = (
+        Index("ix_researchers_authors_research_author", "researcher_id", "author_id"),
+        Index("ix_researchers_authors_author_research", "author_id", "researcher_id"),
+    )
 
 class PublicationAuthor(Base):
     __tablename__ = "publication_authors"
@@ -96,6 +157,7 @@ class PublicationAuthor(Base):
     author = relationship("Author", back_populates="publications")
     __table_args__ = (
     UniqueConstraint('article_id', 'author_id', name='uq_article_author'),
+    Index("ix_publication_authors_author_article", "author_id", "article_id"),
 )
 
 
@@ -111,4 +173,122 @@ class ArticleKeyword(Base):
     article_id = Column(Integer, ForeignKey("articles.id"))
     keyword_id = Column(Integer, ForeignKey("keywords.id"))
     article = relationship("Article", back_populates="keywords")
-    keyword = relationship("Keyword", back_populates="articles")
\ No newline at end of file
+    keyword = relationship("Keyword", back_populates="articles")
+    __table_args__ = (
+        Index("ix_article_keywords_article_keyword", "article_id", "keyword_id"),
+        Index("ix_article_keywords_keyword", "keyword_id"),
+    )
+
+
+# ==== Tabel ringkasan statistik (diperbarui oleh repository/stats_rollup.py) ====
+# NULL di tabel asal disimpan sebagai '' (source) dan 0 (year) agar unique key berlaku
+
+class ArticleSourceYearStat(Base):
+    __tablename__ = "stats_article_source_year"
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String(255), nullable=False, default="")
+    year = Column(Integer, nullable=False, default=0)
+    article_count = Column(Integer, nullable=False, default=0)
+    __table_args__ = (
+        UniqueConstraint("source", "year", name="uq_stats_article_source_year"),
+    )
+
+class ResearchFundYearStat(Base):
+    __tablename__ = "stats_research_fund_year"
+    id = Column(Integer, primary_key=True, index=True)
+    fund_source = Column(String(255), nullable=False, default="")
+    year = Column(Integer, nullable=False, default=0)
+    research_count = Column(Integer, nullable=False, default=0)
+    fund_total = Column(BigInteger, nullable=False, default=0)
+    __table_args__ = (
+        UniqueConstraint("fund_source", "year", name="uq_stats_research_fund_year"),
+    )
+
+# ==== High-water mark sync inkremental (repository/sync_state.py) ====
+# Publikasi terbaru yang sudah tersimpan per author dan sumber (GARUDA, SCOPUS, GOOGLE_SCHOLAR)
+
+class SyncState(Base):
+    __tablename__ = "sync_states"
+    id = Column(Integer, primary_key=True, index=True)
+    author_id = Column(Integer, ForeignKey("authors.id"), nullable=False)
+    source = Column(String(50), nullable=False)
+    last_title = Column(String(255), nullable=True)
+    last_doi = Column(String(255), nullable=True)
+    last_year = Column(Integer, nullable=True)
+    # Hash isi halaman profil 1 saat sync terakhir yang tersimpan; sama berarti tidak ada publikasi baru
+    page_hash = Column(String(64), nullable=True)
+    pages_fetched = Column(Integer, nullable=False, default=0)
+    synced_at = Column(DateTime, nullable=True)
+    full_synced_at = Column(DateTime, nullable=True)
+    __table_args__ = (
+        UniqueConstraint("author_id", "source", name="uq_sync_states_author_source"),
+    )
+
+# ==== Versi data untuk invalidasi cache antar worker (services/cache.py) ====
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+# ==== Job background (dijalankan oleh repository/jobs.py) ====
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    # pending, running, completed, failed, cancelled
+    status = Column(String(20), nullable=False, default="pending")
+    params = Column(JSON, nullable=True)
+    total_units = Column(Integer, nullable=True)
+    completed_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    # Unit selesai dari versi lama; job baru mencatatnya di tabel job_units
+    completed_units = Column(JSON, nullable=True)
+    counters = Column(JSON, nullable=True)
+    errors = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    # Proses (host:pid) yang menjalankan/mengantrekan job dan detak terakhirnya;
+    # job tanpa detak baru dianggap terputus (lihat repository/jobs.py)
+    owner = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    __table_args__ = (
+        Index("ix_jobs_status_id", "status", "id"),
+        Index("ix_jobs_kind_id", "kind", "id"),
+    )
+
+
+class JobUnit(Base):
+    """Unit (mis. author id) yang sudah selesai dalam satu job, dipakai untuk resume."""
+    __tablename__ = "job_units"
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    unit = Column(BigInteger, nullable=False)
+    __table_args__ = (
+        UniqueConstraint("job_id", "unit", name="uq_job_units_job_unit"),
+    )
+
+
+def write_user_name_tokens(connection, user_id: int, name: str):
+    connection.execute(delete(UserNameToken.__table__).where(UserNameToken.user_id == user_id))
+    tokens = name_tokens(name)
+    if tokens:
+        connection.execute(
+            insert(UserNameToken.__table__),
+            [{"user_id": user_id, "token": token} for token in tokens]
+        )
+
+
+@event.listens_for(User, "after_insert")
+def _insert_user_name_tokens(mapper, connection, target):
+    write_user_name_tokens(connection, target.id, target.name)
+
+
+@event.listens_for(User, "after_update")
+def _update_user_name_tokens(mapper, connection, target):
+    if inspect(target).attrs.name.history.has_changes():
+        write_user_name_tokens(connection, target.id, target.name)
@@ -1,19 +1,22 @@
-import requests
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
 from bs4 import BeautifulSoup
-import time
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from models import User, Author, PublicationAuthor
+from models import User, Author, PublicationAuthor, AuthorDepartmentCache
 from schemas import CrawlAuthors, TopAuthorResponse
+from repository.bulk import upsert
+from repository.crawl_engine import crawl_engine
 
 BASE_URL = "https://sinta.kemdikbud.go.id/departments/authors/20/896879FE-5FBE-4AB0-A7CD-3FAD1EEE3CFF/6635C54C-E05B-4161-A443-BCCA6926474A"
-
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-}
+LIST_PAGES = 7  # Ganti sesuai kebutuhan
+# Department dari halaman profil dianggap basi setelah sekian hari lalu diambil ulang
+DEPARTMENT_CACHE_TTL_DAYS = float(os.getenv("DEPARTMENT_CACHE_TTL_DAYS", "30"))
 
 def scrape_and_save_authors(db: Session):
-    scraped_data = scrape_sinta()
+    scraped_data = scrape_sinta(db)
     saved_count, skipped_count = save_scraped_data(scraped_data, db)
     
     return {
@@ -22,72 +25,117 @@ def scrape_and_save_authors(db: Session):
         "total_scraped": len(scraped_data)
     }
 
-def scrape_sinta():
-    results = []
-
-    for page in range(1, 8):  # Ganti sesuai kebutuhan
-        url = f"{BASE_URL}?page={page}"
-        response = requests.get(url, headers=HEADERS)
-
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.content, "html.parser")
-            author_sections = soup.find_all("div", class_="au-item mt-3 mb-3 pb-5 pt-3")
-
-            for author in author_sections:
-                name_tag = author.find("a")
-                name = name_tag.get_text(strip=True) if name_tag else "N/A"
-                profile_link = name_tag["href"] if name_tag else "N/A"
-                full_profile_link = f"https://sinta.kemdikbud.go.id{profile_link}" if profile_link.startswith('/') else profile_link
-
-                sinta_id_tag = author.find("div", class_="profile-id")
-                sinta_id = sinta_id_tag.get_text(strip=True).replace("ID : ", "") if sinta_id_tag else "N/A"
-
-                scopus_hindex_tag = author.find("span", class_="profile-id text-warning")
-                scopus_hindex = scopus_hindex_tag.get_text(strip=True).replace("Scopus H-Index : ", "") if scopus_hindex_tag else "0"
-
-                gs_hindex_tag = author.find("span", class_="profile-id text-success ml-3")
-                gs_hindex = gs_hindex_tag.get_text(strip=True).replace("GS H-Index : ", "") if gs_hindex_tag else "0"
-
-                score_blocks = author.find_all("div", class_="stat-num text-center")
-                sinta_score_3yr = score_blocks[0].get_text(strip=True) if len(score_blocks) >= 2 else "0"
-                sinta_score_total = score_blocks[1].get_text(strip=True) if len(score_blocks) >= 2 else "0"
-                affil_score_3yr = score_blocks[2].get_text(strip=True) if len(score_blocks) >= 4 else "0"
-                affil_score_total = score_blocks[3].get_text(strip=True) if len(score_blocks) >= 4 else "0"
-
-                # === Ambil department dari halaman profil dosen ===
-                department_name = "N/A"
-                try:
-                    profile_resp = requests.get(full_profile_link, headers=HEADERS)
-                    if profile_resp.status_code == 200:
-                        profile_soup = BeautifulSoup(profile_resp.content, "html.parser")
-                        meta_div = profile_soup.find("div", class_="meta-profile")
-                        if meta_div:
-                            dept_tag = meta_div.find("a", href=lambda x: x and "/departments/profile/" in x)
-                            if dept_tag:
-                                department_name = dept_tag.get_text(strip=True)
-                except Exception as e:
-                    print(f"Gagal ambil department dari {full_profile_link}: {e}")
-
-                # === Tambahkan ke hasil ===
-                results.append(
-                    CrawlAuthors(
-                        lecturer_name=name,
-                        sinta_profile_url=full_profile_link,
-                        sinta_id=sinta_id,
-                        profile_link=full_profile_link,
-                        scopus_hindex=scopus_hindex,
-                        gs_hindex=gs_hindex,
-                        sinta_score_3yr=sinta_score_3yr,
-                        sinta_score_total=sinta_score_total,
-                        affil_score_3yr=affil_score_3yr,
-                        affil_score_total=affil_score_total,
-                        department=department_name
-                    )
-                )
-
-                time.sleep(1)  # delay antar request agar tidak membanjiri server
-
-    return results
+def scrape_sinta(db: Session):
+    """
+    Halaman daftar dosen diambil bersamaan lewat crawl engine (thread pool +
+    rate limit per host). Halaman profil hanya diambil untuk dosen yang
+    department-nya belum ada di cache atau sudah basi, juga secara paralel.
+    """
+    list_urls = [f"{BASE_URL}?page={page}" for page in range(1, LIST_PAGES + 1)]
+    authors = []
+    for result in crawl_engine.fetch_many_sync(list_urls):
+        if result.ok:
+            authors.extend(parse_author_list(result.content))
+
+    departments = cached_departments(db, [author["profile_link"] for author in authors])
+    missing = list(dict.fromkeys(
+        author["profile_link"] for author in authors
+        if author["profile_link"] not in departments and author["profile_link"].startswith("http")
+    ))
+    fetched = fetch_departments(missing)
+    save_departments(db, fetched)
+    departments.update(fetched)
+    print(f"🏷️ Department: {len(departments) - len(fetched)} dari cache, {len(fetched)} diambil dari profil")
+
+    return [
+        CrawlAuthors(
+            lecturer_name=author["name"],
+            sinta_profile_url=author["profile_link"],
+            sinta_id=author["sinta_id"],
+            profile_link=author["profile_link"],
+            scopus_hindex=author["scopus_hindex"],
+            gs_hindex=author["gs_hindex"],
+            sinta_score_3yr=author["sinta_score_3yr"],
+            sinta_score_total=author["sinta_score_total"],
+            affil_score_3yr=author["affil_score_3yr"],
+            affil_score_total=author["affil_score_total"],
+            department=departments.get(author["profile_link"], "N/A")
+        )
+        for author in authors
+    ]
+
+def parse_author_list(content: bytes) -> List[dict]:
+    soup = BeautifulSoup(content, "html.parser")
+    author_sections = soup.find_all("div", class_="au-item mt-3 mb-3 pb-5 pt-3")
+
+    authors = []
+    for author in author_sections:
+        name_tag = author.find("a")
+        name = name_tag.get_text(strip=True) if name_tag else "N/A"
+        profile_link = name_tag["href"] if name_tag else "N/A"
+        full_profile_link = f"https://sinta.kemdikbud.go.id{profile_link}" if profile_link.startswith('/') else profile_link
+
+        sinta_id_tag = author.find("div", class_="profile-id")
+        sinta_id = sinta_id_tag.get_text(strip=True).replace("ID : ", "") if sinta_id_tag else "N/A"
+
+        scopus_hindex_tag = author.find("span", class_="profile-id text-warning")
+        scopus_hindex = scopus_hindex_tag.get_text(strip=True).replace("Scopus H-Index : ", "") if scopus_hindex_tag else "0"
+
+        gs_hindex_tag = author.find("span", class_="profile-id text-success ml-3")
+        gs_hindex = gs_hindex_tag.get_text(strip=True).replace("GS H-Index : ", "") if gs_hindex_tag else "0"
+
+        score_blocks = author.find_all("div", class_="stat-num text-center")
+        authors.append({
+            "name": name,
+            "profile_link": full_profile_link,
+            "sinta_id": sinta_id,
+            "scopus_hindex": scopus_hindex,
+            "gs_hindex": gs_hindex,
+            "sinta_score_3yr": score_blocks[0].get_text(strip=True) if len(score_blocks) >= 2 else "0",
+            "sinta_score_total": score_blocks[1].get_text(strip=True) if len(score_blocks) >= 2 else "0",
+            "affil_score_3yr": score_blocks[2].get_text(strip=True) if len(score_blocks) >= 4 else "0",
+            "affil_score_total": score_blocks[3].get_text(strip=True) if len(score_blocks) >= 4 else "0",
+        })
+    return authors
+
+def parse_department(content: bytes) -> str:
+    profile_soup = BeautifulSoup(content, "html.parser")
+    meta_div = profile_soup.find("div", class_="meta-profile")
+    if meta_div:
+        dept_tag = meta_div.find("a", href=lambda x: x and "/departments/profile/" in x)
+        if dept_tag:
+            return dept_tag.get_text(strip=True)
+    return "N/A"
+
+def fetch_departments(profile_links: List[str]) -> Dict[str, str]:
+    # Profil yang gagal diambil tidak dimasukkan, jadi dicoba lagi di run berikutnya
+    departments = {}
+    for result in crawl_engine.fetch_many_sync(profile_links):
+        if result.ok:
+            departments[result.url] = parse_department(result.content)
+        else:
+            print(f"Gagal ambil department dari {result.url}: {result.error or result.status_code}")
+    return departments
+
+def cached_departments(db: Session, profile_links: List[str]) -> Dict[str, str]:
+    """Department yang masih segar di cache, per profile link."""
+    fresh_after = datetime.now() - timedelta(days=DEPARTMENT_CACHE_TTL_DAYS)
+    rows = db.query(AuthorDepartmentCache.profile_url, AuthorDepartmentCache.department).filter(
+        AuthorDepartmentCache.profile_url.in_(set(profile_links)),
+        AuthorDepartmentCache.fetched_at >= fresh_after
+    )
+    return {profile_url: department for profile_url, department in rows}
+
+def save_departments(db: Session, departments: Dict[str, str]):
+    now = datetime.now()
+    upsert(
+        db,
+        AuthorDepartmentCache.__table__,
+        [{"profile_url": url, "department": department, "fetched_at": now} for url, department in departments.items()],
+        keys=["profile_url"],
+        update_columns=["department", "fetched_at"]
+    )
+    db.commit()
 
 def get_or_create_user(db: Session, name: str):
     user = db.query(User).filter(User.name == name).first()
@@ -0,0 +1,177 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from itertools import zip_longest
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, or_
+from sqlalchemy.orm import Session
+
+from models import User, Author, Article, PublicationAuthor
+from repository.bulk import insert_ignore
+from repository.ingest import existing_pairs, in_batches
+from repository.stats_rollup import record_stats_inserts
+from search.corpus import mark_stale_on_commit
+from search.text import NAME_PREFIX_MIN_LENGTH, name_tokens, title_key
+
+
+@dataclass
+class PaperRecord:
+    """Satu artikel hasil scrape yang siap disimpan, apa pun sumbernya."""
+    title: str
+    source: str
+    year: Optional[int] = None
+    doi: Optional[str] = None
+    accred: Optional[str] = None
+    journal: Optional[str] = None
+    article_url: Optional[str] = None
+    citation_count: Optional[int] = None
+    # Nama yang ditautkan ke artikel (dosen pemilik profil atau semua penulis)
+    author_names: List[str] = field(default_factory=list)
+    author_order: Optional[int] = None
+
+
+def to_int(value) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    return int(value) if value and str(value).isdigit() else None
+
+
+def clean_doi(doi: Optional[str]) -> Optional[str]:
+    # 'N/A' adalah default parser jika DOI tidak ada, jangan dipakai untuk mencocokkan artikel
+    if not doi or doi.strip().lower() in ("none", "n/a"):
+        return None
+    return doi.strip()
+
+
+class AuthorResolver:
+    """
+    Nama -> author id dari peta token nama yang dimuat sekali, lalu dipakai
+    ulang untuk semua batch dalam satu sync run.
+    Aturannya sama dengan user_name_filter: setiap token nama yang dicari
+    harus menjadi awalan salah satu token nama user. Hanya user yang punya
+    baris Author yang bisa dicocokkan (PublicationAuthor.author_id -> authors.id).
+    """
+
+    def __init__(self, db: Session):
+        rows = db.query(Author.id, User.name).join(User, Author.user_id == User.id).all()
+        self._tokens = sorted((token, author_id) for author_id, name in rows for token in name_tokens(name))
+        self._keys = [token for token, _ in self._tokens]
+        self._cache: Dict[str, Optional[int]] = {}
+
+    def _prefix_matches(self, prefix: str) -> set:
+        # Sama dengan user_name_filter: token pendek harus cocok persis
+        exact = len(prefix) < NAME_PREFIX_MIN_LENGTH
+        start = bisect_left(self._keys, prefix)
+        matches = set()
+        for token, author_id in self._tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            if not exact or token == prefix:
+                matches.add(author_id)
+        return matches
+
+    def resolve(self, name: str) -> Optional[int]:
+        if name in self._cache:
+            return self._cache[name]
+
+        candidates = None
+        for token in name_tokens(name):
+            matches = self._prefix_matches(token)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                break
+
+        author_id = min(candidates) if candidates else None
+        self._cache[name] = author_id
+        return author_id
+
+
+def doi_key(doi: str) -> str:
+    # DOI tidak membedakan huruf besar/kecil, seperti collation database
+    return doi.casefold()
+
+
+def _find_articles(db: Session, titles: Iterable[str], dois: Iterable[str]):
+    """
+    Artikel yang sudah ada per title_key dan per doi_key; satu query IN per
+    batch. Hasil dikunci ulang karena database mencocokkan tanpa membedakan
+    huruf besar/kecil.
+    """
+    by_title: Dict[str, int] = {}
+    by_doi: Dict[str, int] = {}
+    for batch_titles, batch_dois in zip_longest(in_batches(set(titles)), in_batches(set(dois)), fillvalue=[]):
+        rows = db.query(Article.id, Article.title, Article.doi).filter(or_(
+            Article.title.in_(batch_titles), Article.doi.in_(batch_dois)
+        )).order_by(Article.id)
+        for article_id, title, doi in rows:
+            by_title.setdefault(title_key(title), article_id)
+            if doi:
+                by_doi.setdefault(doi_key(doi), article_id)
+    return by_title, by_doi
+
+
+def save_papers(db: Session, records: List[PaperRecord], resolver: Optional[AuthorResolver] = None) -> Dict[str, int]:
+    """
+    Simpan satu batch hasil scrape dalam satu transaksi: artikel yang sudah
+    ada dicocokkan lewat DOI atau judul dengan satu query IN, artikel baru
+    dan relasi PublicationAuthor di-insert sekaligus. Tanpa `resolver` peta
+    nama author dimuat ulang untuk batch ini.
+    """
+    records = [record for record in records if record.title]
+    if not records:
+        return {"inserted_articles": 0, "inserted_relations": 0}
+
+    for record in records:
+        record.doi = clean_doi(record.doi)
+    by_title, by_doi = _find_articles(
+        db, [r.title for r in records], [r.doi for r in records if r.doi]
+    )
+
+    def article_id(record: PaperRecord) -> Optional[int]:
+        if record.doi and doi_key(record.doi) in by_doi:
+            return by_doi[doi_key(record.doi)]
+        return by_title.get(title_key(record.title))
+
+    # 1. Artikel baru (judul unik dalam batch)
+    new_articles = {}
+    for record in records:
+        if article_id(record) is None and title_key(record.title) not in new_articles:
+            new_articles[title_key(record.title)] = {
+                "title": record.title,
+                "year": record.year,
+                "doi": record.doi,
+                "accred": record.accred,
+                "journal": record.journal,
+                "article_url": record.article_url,
+                "citation_count": record.citation_count,
+                "source": record.source
+            }
+    if new_articles:
+        rows = list(new_articles.values())
+        db.execute(insert(Article.__table__), rows)
+        inserted_titles, _ = _find_articles(db, [row["title"] for row in rows], [])
+        by_title.update(inserted_titles)
+        record_stats_inserts(db, articles=rows)
+        mark_stale_on_commit(db, Article, inserted_titles.values())
+
+    # 2. Relasi artikel-author, duplikat dilewati
+    resolver = resolver or AuthorResolver(db)
+    relations = {}
+    for record in records:
+        target = article_id(record)
+        for name in record.author_names:
+            author_id = resolver.resolve(name)
+            if author_id is not None and target is not None:
+                relations.setdefault((target, author_id), record.author_order)
+
+    existing = existing_pairs(db, PublicationAuthor.article_id, PublicationAuthor.author_id,
+                              [article for article, _ in relations])
+    rows = [
+        {"article_id": article, "author_id": author, "author_order": order}
+        for (article, author), order in relations.items()
+        if (article, author) not in existing
+    ]
+    inserted_relations = insert_ignore(db, PublicationAuthor.__table__, rows)
+
+    db.commit()
+    return {"inserted_articles": len(new_articles), "inserted_relations": inserted_relations}
@@ -0,0 +1,91 @@
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import Table
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Dialect yang punya bentuk upsert/insert-ignore di bawah; MySQL untuk produksi,
+# SQLite untuk test lokal
+SUPPORTED_DIALECTS = ("mysql", "sqlite", "postgresql")
+
+
+def check_dialect(bind: Engine):
+    """Dipanggil saat startup: gagal di awal, bukan di tengah upload/sync."""
+    if bind.dialect.name not in SUPPORTED_DIALECTS:
+        raise RuntimeError(
+            f"Dialect database '{bind.dialect.name}' tidak didukung untuk bulk upsert; "
+            f"gunakan salah satu dari: {', '.join(SUPPORTED_DIALECTS)}"
+        )
+
+
+def _dialect_insert(db: Session, table: Table) -> Tuple[str, object]:
+    """INSERT khusus dialect: MySQL punya ON DUPLICATE KEY, SQLite/PostgreSQL ON CONFLICT."""
+    bind = db.get_bind()
+    check_dialect(bind)
+    dialect = bind.dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return dialect, insert(table)
+
+
+def upsert(db: Session, table: Table, rows: List[Dict], keys: Iterable[str], update_columns: Iterable[str]):
+    """
+    INSERT banyak baris sekaligus; baris yang bentrok di unique key (keys)
+    diperbarui kolom update_columns-nya. MySQL: ON DUPLICATE KEY UPDATE,
+    SQLite/PostgreSQL: ON CONFLICT DO UPDATE.
+    """
+    if not rows:
+        return
+
+    dialect, stmt = _dialect_insert(db, table)
+    if dialect == "mysql":
+        stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_columns})
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={c: stmt.excluded[c] for c in update_columns}
+        )
+
+    db.execute(stmt, rows)
+
+
+def insert_ignore(db: Session, table: Table, rows: List[Dict]) -> int:
+    """
+    INSERT banyak baris sekaligus dan lewati baris yang bentrok di unique key.
+    MySQL: INSERT IGNORE, SQLite/PostgreSQL: ON CONFLICT DO NOTHING.
+    Mengembalikan jumlah baris yang benar-benar masuk.
+    """
+    if not rows:
+        return 0
+
+    dialect, stmt = _dialect_insert(db, table)
+    if dialect == "mysql":
+        stmt = stmt.prefix_with("IGNORE")
+    else:
+        stmt = stmt.on_conflict_do_nothing()
+
+    return db.execute(stmt, rows).rowcount
+
+
+def upsert_increment(db: Session, table: Table, rows: List[Dict], keys: Iterable[str], increment_columns: Iterable[str]):
+    """
+    Seperti upsert, tapi baris yang bentrok ditambah (kolom = kolom + nilai),
+    bukan ditimpa. Aman untuk beberapa penulis bersamaan karena penambahan
+    dilakukan oleh database, bukan dari snapshot transaksi masing-masing.
+    """
+    if not rows:
+        return
+
+    dialect, stmt = _dialect_insert(db, table)
+    if dialect == "mysql":
+        stmt = stmt.on_duplicate_key_update({c: table.c[c] + stmt.inserted[c] for c in increment_columns})
+    else:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={c: table.c[c] + stmt.excluded[c] for c in increment_columns}
+        )
+
+    db.execute(stmt, rows)
@@ -0,0 +1,194 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from repository.http_cache import HttpCache, content_hash, http_cache
+from repository.http_client import build_session, rotating_headers
+
+# Batas global request yang berjalan bersamaan (semua sync berbagi engine yang sama)
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+# Maksimal request per detik ke satu host, agar tetap sopan ke sinta.kemdikbud.go.id
+CRAWL_RATE_PER_HOST = float(os.getenv("CRAWL_RATE_PER_HOST", "4"))
+CRAWL_RETRIES = int(os.getenv("CRAWL_RETRIES", "3"))
+CRAWL_TIMEOUT = float(os.getenv("CRAWL_TIMEOUT", "15"))
+CRAWL_BACKOFF = float(os.getenv("CRAWL_BACKOFF", "1.0"))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: Optional[int] = None
+    content: bytes = b""
+    error: Optional[str] = None
+    attempts: int = 0
+    elapsed: float = 0.0
+    # Server menjawab 304; content diambil dari cache disk
+    not_modified: bool = False
+    # Isi halaman sama dengan fetch sebelumnya (304 atau hash sama), parsing bisa dilewati
+    unchanged: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 200
+
+
+class HostRateLimiter:
+    """
+    Jadwalkan request ke host yang sama minimal 1/rate detik terpisah.
+    reserve() langsung mengembalikan waktu tunggu, jadi bisa dipakai dari
+    thread maupun event loop mana pun.
+    """
+
+    def __init__(self, rate_per_host: float):
+        self.interval = 1.0 / rate_per_host if rate_per_host > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, host: str) -> float:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+            return slot - now
+
+
+class CrawlEngine:
+    """
+    Engine crawl bersama: request dijalankan di thread pool berukuran
+    `concurrency` (batas global), dengan rate limit per host, timeout dan
+    retry + exponential backoff untuk error jaringan, 429 dan 5xx.
+
+    Jika ada HttpCache, request dikirim sebagai conditional request
+    (If-None-Match / If-Modified-Since) dan body disimpan terkompresi di disk.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = CRAWL_CONCURRENCY,
+        rate_per_host: float = CRAWL_RATE_PER_HOST,
+        retries: int = CRAWL_RETRIES,
+        timeout: float = CRAWL_TIMEOUT,
+        backoff: float = CRAWL_BACKOFF,
+        cache: Optional[HttpCache] = http_cache
+    ):
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.limiter = HostRateLimiter(rate_per_host)
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="crawl")
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # requests.Session tidak thread-safe, jadi satu session per worker thread
+        session = getattr(self._local, "session", None)
+        if session is None:
+            # Retry ditangani loop engine sendiri (dengan rate limit), bukan oleh adapter
+            session = build_session(retries=0, pool_size=self.concurrency)
+            self._local.session = session
+        return session
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        return self._session().get(url, headers=rotating_headers(headers), timeout=self.timeout)
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), 60.0)
+        return self.backoff * (2 ** attempt) + random.uniform(0, self.backoff)
+
+    def _fetch_once(self, url: str, result: FetchResult) -> Optional[requests.Response]:
+        cached = self.cache.get(url) if self.cache else None
+        try:
+            response = self._get(url, cached.conditional_headers() if cached else None)
+        except requests.RequestException as e:
+            result.error = f"{type(e).__name__}: {e}"
+            return None
+
+        if response.status_code == 304 and cached:
+            # Tidak berubah sejak fetch terakhir: pakai body dari cache
+            result.status_code = 200
+            result.content = cached.body
+            result.error = None
+            result.not_modified = result.unchanged = True
+            self.cache.touch(url)
+            self.cache.record(not_modified=True, unchanged=True)
+            return response
+
+        result.status_code = response.status_code
+        result.content = response.content
+        result.error = f"HTTP {response.status_code}" if response.status_code in RETRY_STATUS else None
+        if self.cache and response.status_code == 200:
+            # Server tanpa ETag/Last-Modified: tetap bisa dideteksi lewat hash isi
+            result.unchanged = cached is not None and cached.content_hash == content_hash(response.content)
+            self.cache.record(unchanged=result.unchanged)
+            self.cache.put(url, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return response
+
+    def _finish(self, result: FetchResult, start: float) -> FetchResult:
+        result.elapsed = time.perf_counter() - start
+        if result.error:
+            print(f"🚫 Gagal fetch {result.url} setelah {result.attempts} percobaan: {result.error}")
+        return result
+
+    async def fetch(self, url: str) -> FetchResult:
+        """Ambil satu URL; error tidak di-raise tapi dicatat di FetchResult.error."""
+        loop = asyncio.get_running_loop()
+        host = urlparse(url).netloc
+        result = FetchResult(url=url)
+        start = time.perf_counter()
+
+        for attempt in range(self.retries + 1):
+            await asyncio.sleep(self.limiter.reserve(host))
+            result.attempts = attempt + 1
+            response = await loop.run_in_executor(self._executor, self._fetch_once, url, result)
+            if result.error is None or attempt == self.retries:
+                break
+            await asyncio.sleep(self._retry_delay(attempt, response))
+
+        return self._finish(result, start)
+
+    def fetch_sync(self, url: str) -> FetchResult:
+        """Versi blocking untuk kode yang belum async; rate limit dan retry sama."""
+        host = urlparse(url).netloc
+        result = FetchResult(url=url)
+        start = time.perf_counter()
+
+        for attempt in range(self.retries + 1):
+            time.sleep(self.limiter.reserve(host))
+            result.attempts = attempt + 1
+            response = self._fetch_once(url, result)
+            if result.error is None or attempt == self.retries:
+                break
+            time.sleep(self._retry_delay(attempt, response))
+
+        return self._finish(result, start)
+
+    def fetch_many_sync(self, urls: Iterable[str]) -> List[FetchResult]:
+        """Ambil banyak URL sekaligus di thread pool engine; urutan hasil sama dengan urls."""
+        return list(self._executor.map(self.fetch_sync, urls))
+
+    async def as_completed(self, tasks: Iterable[Awaitable]) -> AsyncIterator:
+        """Jalankan semua task bersamaan dan hasilkan hasilnya begitu masing-masing selesai."""
+        futures = [asyncio.ensure_future(t) for t in tasks]
+        try:
+            for next_done in asyncio.as_completed(futures):
+                yield await next_done
+        finally:
+            # Konsumen berhenti lebih awal (mis. error saat simpan): batalkan sisanya
+            for future in futures:
+                future.cancel()
+
+
+crawl_engine = CrawlEngine()
@@ -1,294 +1,291 @@
-import requests
 from fastapi import HTTPException
 from bs4 import BeautifulSoup
-import re, time
-from typing import List
+import asyncio, os, re, time
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 from schemas import PaperResponse, GarudaAbstractResponse
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from models import Article, User, Author, PublicationAuthor
 import random
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from repository.user import find_user_by_name
+from repository.crawl_engine import FetchResult, crawl_engine
+from repository.sinta_parser import find_link, parse_items
+from repository.batch_writer import AuthorResolver, PaperRecord, save_papers, to_int
+from repository.jobs import JobContext
+from repository.sync_state import ProfileWalk, iter_profile_pages, iter_profile_pages_sync
+from search.corpus import mark_stale_on_commit
 
+# Jumlah halaman abstract yang diambil bersamaan, dan jumlah abstract per batch simpan
+ABSTRACT_CONCURRENCY = int(os.getenv("ABSTRACT_CONCURRENCY", "8"))
+ABSTRACT_BATCH_SIZE = int(os.getenv("ABSTRACT_BATCH_SIZE", "50"))
 
-def garuda_scrapping(lecturer_name: str, profile_link: str):
-    garuda_url = f"{profile_link}?view=garuda"
-    print(f'📡 Fetching data from: {garuda_url}')
 
-    headers = {
-        'User-Agent': random.choice([
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)',
-            'Mozilla/5.0 (X11; Linux x86_64)',
-        ]),
-        'Accept-Language': 'en-US,en;q=0.9',
-    }
+def parse_garuda_page(lecturer_name: str, content: bytes, limit: Optional[int] = None) -> List[PaperResponse]:
+    papers = []
+    for item in parse_items(content, limit):
+        try:
+            journal_category_tag = find_link(item.meta(0), cls='ar-pub')
+            journal_category = journal_category_tag.text if journal_category_tag else 'N/A'
 
-    try:
-        response = requests.get(garuda_url, headers=headers, timeout=10)
-        time.sleep(3)  # Delay acak
-    except Exception as e:
-        log_error(f"[RequestError] {lecturer_name} - {garuda_url} - {str(e)}")
-        return []
+            author_order, year, doi, accred = 'N/A', 'N/A', 'N/A', 'N/A'
+            authors = []
 
-    papers = []
+            for a_tag in item.meta(1):
+                if a_tag.href != '#!':
+                    continue
+                text = a_tag.text
+                if 'Author Order' in text:
+                    match = re.search(r'\d+', text)
+                    if match:
+                        author_order = match.group()
+                elif a_tag.icon is not None:
+                    if 'zmdi-calendar' in a_tag.icon:
+                        year = text.replace('📅', '').strip()
+                    elif 'zmdi-comment-list' in a_tag.icon:
+                        doi = text.replace('🔗', '').replace('DOI: ', '').strip()
+                    elif 'zmdi-chart-donut' in a_tag.icon:
+                        accred = text.replace('📊', '').replace('Accred : ', '').strip()
+                else:
+                    authors.append(text)
 
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.content, 'html.parser')
-        items = soup.find_all('div', class_='ar-list-item mb-5')
-
-        if not items:
-            log_error(f"[NoData] {lecturer_name} - {garuda_url} - Halaman tidak mengandung publikasi.")
-            return []
-
-        for item in items:
-            try:
-                title_container = item.find('div', class_='ar-title')
-                title_tag = title_container.find('a') if title_container else None
-                title = title_tag.text.strip() if title_tag else 'N/A'
-                publication_link = title_tag['href'] if title_tag and title_tag.has_attr('href') else 'N/A'
-
-                meta_divs = item.find_all('div', class_='ar-meta')
-                journal_category_tag = meta_divs[0].find('a', class_='ar-pub') if len(meta_divs) > 0 else None
-                journal_category = journal_category_tag.text.strip() if journal_category_tag else 'N/A'
-
-                second_meta_div = meta_divs[1] if len(meta_divs) > 1 else None
-                author_order, year, doi, accred = 'N/A', 'N/A', 'N/A', 'N/A'
-                authors = []
-
-                if second_meta_div:
-                    for a_tag in second_meta_div.find_all('a', href='#!'):
-                        text = a_tag.text.strip()
-                        if 'Author Order' in text:
-                            match = re.search(r'\d+', text)
-                            if match:
-                                author_order = match.group()
-                        else:
-                            i_tag = a_tag.find('i')
-                            if i_tag:
-                                icon_class = i_tag.get('class', [])
-                                if 'zmdi-calendar' in icon_class:
-                                    year = text.replace('📅', '').strip()
-                                elif 'zmdi-comment-list' in icon_class:
-                                    doi = text.replace('🔗', '').replace('DOI: ', '').strip()
-                                elif 'zmdi-chart-donut' in icon_class:
-                                    accred = text.replace('📊', '').replace('Accred : ', '').strip()
-                            else:
-                                authors.append(text)
-
-                papers.append(PaperResponse(
-                    lecturer_name=lecturer_name,
-                    title=title,
-                    publication_link=publication_link,
-                    journal_category=journal_category,
-                    author_order=author_order,
-                    authors=authors,
-                    year=year,
-                    doi=doi,
-                    accred=accred
-                ))
-            except Exception as parse_error:
-                log_error(f"[ParseError] {lecturer_name} - {garuda_url} - {parse_error}")
-    else:
-        log_error(f"[HTTPError] {lecturer_name} - {garuda_url} - Status code: {response.status_code}")
-        print("Preview response content:", response.text[:300])
+            papers.append(PaperResponse(
+                lecturer_name=lecturer_name,
+                title=item.title if item.title is not None else 'N/A',
+                publication_link=item.link or 'N/A',
+                journal_category=journal_category,
+                author_order=author_order,
+                authors=authors,
+                year=year,
+                doi=doi,
+                accred=accred
+            ))
+        except Exception as parse_error:
+            log_error(f"[ParseError] {lecturer_name} - {parse_error}")
 
     return papers
 
+
+def garuda_scrapping(lecturer_name: str, profile_link: str) -> Iterator[PaperResponse]:
+    """Semua publikasi GARUDA di profil, halaman demi halaman, sebagai generator."""
+    print(f'📡 Fetching data from: {profile_link}?view=garuda')
+
+    # Jeda antar request diatur rate limiter engine, bukan sleep tetap
+    found = False
+    for _, papers in iter_profile_pages_sync(
+        profile_link, "garuda", lambda content: parse_garuda_page(lecturer_name, content)
+    ):
+        found = True
+        yield from papers
+
+    if not found:
+        log_error(f"[NoData] {lecturer_name} - {profile_link}?view=garuda - Halaman tidak mengandung publikasi.")
+
 def log_error(message: str):
     print("🚫", message)
     with open("garuda_scrape_errors.log", "a", encoding="utf-8") as f:
         f.write(message + "\n")
 
-def garuda_data(scraped_data: list[PaperResponse], db: Session):
-    for data in scraped_data:
-        # Cek apakah artikel sudah ada berdasarkan DOI atau judul
-        article = db.query(Article).filter(
-            (Article.doi == data.doi) | (Article.title == data.title)
-        ).first()
-
-        if not article:
-            article = Article(
-                title=data.title,
-                year=int(data.year) if data.year.isdigit() else None,
-                doi=data.doi if data.doi and data.doi.lower() != "none" else None,
-                accred=data.accred,
-                article_url=data.publication_link,
-                journal=data.journal_category,
-                source="GARUDA"
-            )
-            db.add(article)
-            db.commit()
-            db.refresh(article)
-
-        # Proses semua penulis
-        for idx, author_name in enumerate(data.authors):
-            author = db.query(User).filter(User.name.ilike(f"%{author_name}%")).first()
-            if not author:
-                continue  # Lewati jika tidak ditemukan
-
-            # Cek duplikat kombinasi article + author
-            existing_relation = db.query(PublicationAuthor).filter_by(
-                article_id=article.id,
-                author_id=author.id
-            ).first()
-
-            if not existing_relation:
-                author_order = int(data.author_order) if data.author_order and data.author_order.isdigit() else None
-                db.add(PublicationAuthor(
-                    article_id=article.id,
-                    author_id=author.id,
-                    author_order=author_order
-                ))
-
-    db.commit()
+def garuda_data(scraped_data: list[PaperResponse], db: Session, resolver: Optional[AuthorResolver] = None):
+    # Semua penulis artikel yang terdaftar sebagai dosen ikut ditautkan
+    save_papers(db, [
+        PaperRecord(
+            title=data.title,
+            source="GARUDA",
+            year=to_int(data.year),
+            doi=data.doi,
+            accred=data.accred,
+            journal=data.journal_category,
+            article_url=data.publication_link,
+            author_names=data.authors,
+            author_order=to_int(data.author_order)
+        )
+        for data in scraped_data
+    ], resolver)
 
 
 
 
-def garuda_sync(lecturer_name: str, profile_link: str):
-    garuda_url = f"{profile_link}?view=garuda"
-    print(f'Fetching data from: {garuda_url}')
-    response = requests.get(garuda_url)
 
-    papers = []
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.content, 'html.parser')
-        items = soup.find_all('div', class_='ar-list-item mb-5')
+def garuda_sync(
+    lecturer_name: str,
+    profile_link: str,
+    walk: Optional[ProfileWalk] = None
+) -> AsyncIterator[Tuple[int, List[PaperResponse]]]:
+    """Publikasi GARUDA yang lebih baru dari `walk.mark` (semua halaman jika tanpa mark), per halaman."""
+    print(f'Fetching data from: {profile_link}?view=garuda')
+    return iter_profile_pages(
+        profile_link, "garuda", lambda content: parse_garuda_page(lecturer_name, content), walk
+    )
 
-        # Ambil hanya 5 artikel teratas
-        items = items[:5]  # Hanya ambil 5 artikel pertama
+def parse_garuda_abstract(content: bytes) -> Optional[str]:
+    soup = BeautifulSoup(content, "html.parser")
+    abstract_div = soup.find("div", class_="abstract-article")
+    if not abstract_div:
+        return None
+    xmp = abstract_div.find("xmp", class_="abstract-article")
+    return xmp.text.strip() if xmp else "N/A"
 
-        for item in items:
-            title_tag = item.find('div', class_='ar-title').find('a')
-            title = title_tag.text.strip() if title_tag else 'N/A'
-            publication_link = title_tag['href'] if title_tag and title_tag.has_attr('href') else 'N/A'
-            journal_category_tag = item.find('div', class_='ar-meta').find('a', class_='ar-pub')
-            journal_category = journal_category_tag.text.strip() if journal_category_tag else 'N/A'
-
-            second_meta_div = item.find_all('div', class_='ar-meta')[1] if len(item.find_all('div', class_='ar-meta')) > 1 else None
-            author_order, year, doi, accred = 'N/A', 'N/A', 'N/A', 'N/A'
-            authors = []
-
-            if second_meta_div:
-                for a_tag in second_meta_div.find_all('a', href='#!'):
-                    text = a_tag.text.strip()
-                    if 'Author Order' in text:
-                        match = re.search(r'\d+', text)
-                        if match:
-                            author_order = match.group()
-                    else:
-                        i_tag = a_tag.find('i')
-                        if i_tag:
-                            icon_class = i_tag.get('class', [])
-                            if 'zmdi-calendar' in icon_class:
-                                year = text.replace('📅', '').strip()
-                            elif 'zmdi-comment-list' in icon_class:
-                                doi = text.replace('🔗', '').replace('DOI: ', '').strip()
-                            elif 'zmdi-chart-donut' in icon_class:
-                                accred = text.replace('📊', '').replace('Accred : ', '').strip()
-                        else:
-                            authors.append(text)
-
-            papers.append(PaperResponse(
-                lecturer_name=lecturer_name,
-                title=title,
-                publication_link=publication_link,
-                journal_category=journal_category,
-                author_order=author_order,
-                authors=authors,
-                year=year,
-                doi=doi,
-                accred=accred
-            ))
-
-    return papers
 
 def garuda_abstract_scraping(article_list: List[tuple]) -> List[GarudaAbstractResponse]:
     results = []
 
-    for idx, (article_id, title, url) in enumerate(article_list, start=1):
+    # Semua halaman diambil paralel lewat crawl engine; rate limit per host menggantikan sleep
+    fetched = crawl_engine.fetch_many_sync([url for _, _, url in article_list])
+    for idx, ((article_id, title, url), result) in enumerate(zip(article_list, fetched), start=1):
         print(f"\n[{idx}] 🔍 Scraping: {title}")
         print(f"🌐 URL: {url}")
 
-        abstract_text = "N/A"
-
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
-            abstract_div = soup.find("div", class_="abstract-article")
-
-            if abstract_div:
-                xmp = abstract_div.find("xmp", class_="abstract-article")
-                abstract_text = xmp.text.strip() if xmp else "N/A"
-                print("✅ Abstract ditemukan")
-            else:
-                print("⚠️ Abstract tidak ditemukan")
-
-        except Exception as e:
-            print(f"❌ Gagal scraping: {str(e)}")
+        if not result.ok:
+            print(f"❌ Gagal scraping: {result.error or result.status_code}")
             continue
 
+        abstract_text = parse_garuda_abstract(result.content)
+        if abstract_text is None:
+            print("⚠️ Abstract tidak ditemukan")
+        else:
+            print("✅ Abstract ditemukan")
+
         results.append(GarudaAbstractResponse(
             article_id=article_id,
             title=title,
             article_url=url,
-            abstract=abstract_text
+            abstract=abstract_text or "N/A"
         ))
 
-        time.sleep(1)  # untuk hindari rate-limit
-
     return results
 
 
+def save_abstracts(db: Session, batch: List[GarudaAbstractResponse]):
+    # Satu UPDATE executemany per batch; bulk update tidak lewat after_flush, jadi index ditandai manual
+    db.execute(update(Article), [{"id": data.article_id, "abstract": data.abstract} for data in batch])
+    mark_stale_on_commit(db, Article, [data.article_id for data in batch])
+    db.commit()
+
+
+async def backfill_garuda_abstracts(
+    db: Session,
+    job: Optional[JobContext] = None,
+    concurrency: int = ABSTRACT_CONCURRENCY,
+    batch_size: int = ABSTRACT_BATCH_SIZE
+) -> dict:
+    """
+    Ambil abstract semua artikel GARUDA yang abstract-nya masih NULL.
+
+    `concurrency` worker mengambil halaman lewat crawl engine dan mengirim
+    hasilnya ke queue; konsumen menyimpan abstract per `batch_size` artikel
+    begitu datang. Setiap batch yang tersimpan menjadi checkpoint
+    (job.units_done), dan artikel yang gagal diambil tetap NULL sehingga run
+    berikutnya melanjutkan dari artikel yang belum selesai.
+    """
+    job = job or JobContext()
+    results = []
+
+    articles = db.query(Article.id, Article.title, Article.article_url).filter(
+        Article.source == "GARUDA",
+        Article.abstract == None
+    ).order_by(Article.id).all()
+
+    print(f"🔍 Jumlah artikel GARUDA tanpa abstract: {len(articles)}")
+    job.set_total(len(articles))
+
+    pending = iter([article for article in articles if not job.is_done(article.id)])
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(batch_size, concurrency))
+
+    async def worker():
+        cancelled = False
+        try:
+            for article_id, title, url in pending:
+                try:
+                    result = await crawl_engine.fetch(url) if url else None
+                except Exception as e:
+                    # Dicatat sebagai artikel gagal; worker lanjut ke artikel berikutnya
+                    result = FetchResult(url=url, error=f"{type(e).__name__}: {e}")
+                await queue.put((article_id, title, url, result))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # Sentinel selalu dikirim (juga jika worker error), agar konsumen tidak
+            # menunggu selamanya; saat dibatalkan konsumen sudah berhenti membaca queue
+            if not cancelled:
+                await queue.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    running = len(workers)
+    batch: List[GarudaAbstractResponse] = []
+
+    def save_batch(saved: List[GarudaAbstractResponse]):
+        job.check_cancelled()
+        try:
+            save_abstracts(db, saved)
+        except SQLAlchemyError as e:
+            db.rollback()
+            job.error(f"Gagal simpan batch ID {saved[0].article_id}-{saved[-1].article_id}: {str(e)}")
+        else:
+            results.extend({"id": data.article_id, "title": data.title, "abstract": data.abstract} for data in saved)
+            job.units_done([data.article_id for data in saved], saved=len(saved))
+            print(f"💾 {len(results)} abstract tersimpan")
+
+    async def flush():
+        # Session sinkron: commit dan checkpoint job dijalankan di thread, bukan di event loop
+        saved = list(batch)
+        batch.clear()
+        await asyncio.to_thread(save_batch, saved)
+
+    try:
+        while running:
+            item = await queue.get()
+            if item is None:
+                running -= 1
+                continue
+
+            article_id, title, url, result = item
+            if result is None or not result.ok:
+                reason = (result.error or f"HTTP {result.status_code}") if result else "URL kosong"
+                await asyncio.to_thread(job.error, f"Gagal scraping ID {article_id}: {reason}")
+                continue
+
+            batch.append(GarudaAbstractResponse(
+                article_id=article_id,
+                title=title,
+                article_url=url,
+                abstract=parse_garuda_abstract(result.content) or "N/A"
+            ))
+            if len(batch) >= batch_size:
+                await flush()
+
+        if batch:
+            await flush()
+    finally:
+        # Dibatalkan atau error saat simpan: hentikan worker yang masih berjalan
+        for task in workers:
+            task.cancel()
+
+    return {
+        "message": "Scraping GARUDA selesai dan abstract disimpan ke database!",
+        "total_saved": len(results),
+        "saved_data": results
+    }
+
+
 def get_lecturers_with_profiles(db: Session):
     return db.query(User.name, Author.sinta_profile_url)\
              .select_from(User).join(Author).all()
 
 
 def save_scraped_data_to_db(scraped_data: list[PaperResponse], db: Session):
-    for paper in scraped_data:
-        # 1. Cari atau buat article
-        article = db.query(Article).filter(
-            (Article.doi == paper.doi) | (Article.title == paper.title)
-        ).first()
-
-        if not article:
-            article = Article(
-                title=paper.title,
-                year=int(paper.year) if paper.year and paper.year.isdigit() else None,
-                doi=paper.doi if paper.doi and paper.doi.lower() != "none" else None,
-                accred=paper.accred,
-                article_url=paper.publication_link,
-                journal=paper.journal_category,
-                source="GARUDA"
-            )
-            db.add(article)
-            db.commit()
-            db.refresh(article)
-
-        # 2. Cari author berdasarkan nama (user.name)
-        user = db.query(User).filter(User.name.ilike(f"%{paper.lecturer_name}%")).first()
-        if not user:
-            continue  # lewati kalau author tidak ditemukan
-
-        author = db.query(Author).filter_by(user_id=user.id).first()
-        if not author:
-            continue  # lewati kalau tidak ada relasi ke Author
-
-        # 3. Tambahkan relasi article-author dengan pengecekan error duplikat
-        author_order = int(paper.author_order) if paper.author_order and paper.author_order.isdigit() else None
-        relation = PublicationAuthor(
-            article_id=article.id,
-            author_id=author.id,
-            author_order=author_order
+    save_papers(db, [
+        PaperRecord(
+            title=paper.title,
+            source="GARUDA",
+            year=to_int(paper.year),
+            doi=paper.doi,
+            accred=paper.accred,
+            journal=paper.journal_category,
+            article_url=paper.publication_link,
+            author_names=[paper.lecturer_name],
+            author_order=to_int(paper.author_order)
         )
-
-        try:
-            db.add(relation)
-            db.flush()  # coba simpan ke memory, akan error jika duplikat
-        except IntegrityError:
-            db.rollback()  # batalkan relasi duplikat
-            continue
-
-    db.commit()
+        for paper in scraped_data
+    ])
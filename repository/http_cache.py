@@ -0,0 +1,177 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Cache halaman mentah SINTA di disk, dipakai crawl engine untuk conditional request
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".http_cache")
+# Entry yang tidak dipakai/divalidasi selama MAX_AGE detik dihapus dan diambil ulang penuh
+HTTP_CACHE_MAX_AGE = float(os.getenv("HTTP_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Eviction dijalankan setiap sekian kali put, bukan setiap put
+EVICT_EVERY = 100
+
+
+@dataclass
+class CachedPage:
+    url: str
+    body: bytes
+    content_hash: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class HttpCache:
+    """
+    Satu file per URL: baris pertama header JSON (etag, last_modified,
+    content_hash), sisanya body terkompresi zlib. Umur entry diukur dari
+    mtime, yang diperbarui setiap kali entry dipakai atau divalidasi (304),
+    sehingga eviction berdasarkan ukuran membuang entry yang paling lama
+    tidak dipakai lebih dulu.
+    """
+
+    def __init__(
+        self,
+        directory: str = HTTP_CACHE_DIR,
+        max_age: float = HTTP_CACHE_MAX_AGE,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES
+    ):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._stats = {"lookups": 0, "hits": 0, "not_modified": 0, "unchanged": 0, "stored": 0, "evicted": 0}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + ".page")
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        self._count("lookups")
+        path = self._path(url)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                body = zlib.decompress(f.read())
+        except (OSError, ValueError, zlib.error):
+            return None
+
+        self._count("hits")
+        return CachedPage(url=url, body=body, **header)
+
+    def put(self, url: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None) -> CachedPage:
+        page = CachedPage(url=url, body=body, content_hash=content_hash(body), etag=etag, last_modified=last_modified)
+        header = {"content_hash": page.content_hash, "etag": etag, "last_modified": last_modified}
+
+        # Tulis ke file sementara lalu rename, agar pembaca lain tidak melihat file setengah jadi
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json.dumps(header).encode() + b"\n")
+            f.write(zlib.compress(body))
+        os.replace(tmp_path, path)
+
+        self._count("stored")
+        with self._lock:
+            self._puts += 1
+            evict = self._puts % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+        return page
+
+    def touch(self, url: str):
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def record(self, not_modified: bool = False, unchanged: bool = False):
+        if not_modified:
+            self._count("not_modified")
+        if unchanged:
+            self._count("unchanged")
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".page"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self) -> int:
+        """Hapus entry yang kedaluwarsa, lalu yang paling lama tidak dipakai sampai di bawah max_bytes."""
+        now = time.time()
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for mtime, size, path in entries:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._stats["evicted"] += removed
+        return removed
+
+    def clear(self) -> int:
+        removed = 0
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        with self._lock:
+            stats = dict(self._stats)
+        return {
+            **stats,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "max_age": self.max_age,
+            "directory": self.directory
+        }
+
+
+http_cache = HttpCache() if HTTP_CACHE_ENABLED else None
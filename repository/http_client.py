@@ -0,0 +1,73 @@
+import os
+import random
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Dipakai semua scraper: satu pool koneksi keep-alive per thread, jadi request
+# berikutnya ke sinta.kemdikbud.go.id tidak mengulang handshake TCP+TLS
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "1.0"))
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.1 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+]
+
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9,id;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+_local = threading.local()
+
+
+def rotating_headers(extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Header default dengan User-Agent acak per request."""
+    return {**DEFAULT_HEADERS, "User-Agent": random.choice(USER_AGENTS), **(extra or {})}
+
+
+def build_session(retries: int = HTTP_RETRIES, pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """
+    Session dengan pool koneksi keep-alive dan retry bawaan urllib3 (error
+    koneksi, 429 dan 5xx, menghormati Retry-After). retries=0 untuk pemanggil
+    yang punya loop retry sendiri, seperti crawl engine.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def get_session() -> requests.Session:
+    # requests.Session tidak thread-safe, jadi satu session per thread
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = build_session()
+        _local.session = session
+    return session
+
+
+def http_get(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = HTTP_TIMEOUT, **kwargs) -> requests.Response:
+    return get_session().get(url, headers=rotating_headers(headers), timeout=timeout, **kwargs)
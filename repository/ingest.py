@@ -0,0 +1,418 @@
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+import pandas as pd
+from fastapi import UploadFile
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from models import User, Author, Article, PublicationAuthor, Research, ResearcherAuthor
+from repository.bulk import insert_ignore, upsert
+from repository.stats_rollup import record_stats_inserts
+from search.corpus import mark_stale_on_commit
+from search.text import title_key
+
+# Jumlah baris file yang diproses lalu di-commit sekaligus
+INGEST_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE", "1000"))
+# Jumlah nilai per klausa IN saat preload lookup
+LOOKUP_BATCH = 500
+
+ARTICLE_COLUMNS = ["title", "year", "doi", "accred", "abstract", "citation_count",
+                   "article_url", "journal", "source", "university"]
+RESEARCH_COLUMNS = ["title", "fund", "fund_status", "fund_source", "fund_type", "year", "leader_name"]
+AUTHOR_COLUMNS = ["sinta_profile_url", "sinta_id", "department", "scopus_hindex", "gs_hindex",
+                  "sinta_score_3yr", "sinta_score_total", "affil_score_3yr", "affil_score_total"]
+
+
+# ==== Pembersihan kolom (vectorised) ====
+
+def iter_chunks(df: pd.DataFrame, size: int = INGEST_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+
+def upload_frames(file: UploadFile, size: int = INGEST_CHUNK_SIZE) -> Iterable[pd.DataFrame]:
+    """
+    Baca file upload per chunk. Body multipart sudah di-spool ke file
+    sementara oleh Starlette, jadi CSV dibaca langsung dari file tersebut
+    dan memori yang dipakai sebanding dengan ukuran chunk, bukan ukuran file.
+    Header dibaca di sini sehingga file yang rusak langsung gagal.
+
+    Semua sel dibaca sebagai teks: tipe hasil inferensi bisa berbeda antar
+    chunk (mis. User ID "12" vs "12.0" jika chunk itu punya sel kosong).
+    """
+    file.file.seek(0)
+    if file.filename.endswith(('.xls', '.xlsx')):
+        # Excel tidak bisa dibaca bertahap: dibaca utuh lalu diproses per chunk
+        return iter_chunks(pd.read_excel(file.file, dtype=str), size)
+    return pd.read_csv(file.file, chunksize=size, dtype=str)
+
+
+def text_column(df: pd.DataFrame, column: str, default: str = "") -> pd.Series:
+    """Kolom teks yang sudah di-strip; sel kosong/NaN menjadi ''."""
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[column].fillna("").astype(str).str.strip()
+
+
+def int_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Kolom bilangan bulat (Int64); nilai kosong atau bukan bilangan bulat menjadi NA."""
+    if column not in df.columns:
+        return pd.Series(pd.NA, index=df.index, dtype="Int64")
+    values = pd.to_numeric(df[column], errors="coerce")
+    return values.where(values % 1 == 0).astype("Int64")
+
+
+def rounded_int_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """Kolom angka yang disimpan di kolom Integer (mis. dana): dibulatkan ke Int64, kosong menjadi NA."""
+    if column not in df.columns:
+        return pd.Series(pd.NA, index=df.index, dtype="Int64")
+    return pd.to_numeric(df[column], errors="coerce").round().astype("Int64")
+
+
+def empty_to_none(series: pd.Series) -> pd.Series:
+    return series.where(series != "")
+
+
+def records(frame: pd.DataFrame, columns: List[str]) -> List[Dict]:
+    """Baris DataFrame sebagai dict untuk executemany; NA/NaN menjadi None."""
+    frame = frame[columns].astype(object)
+    return frame.where(frame.notna(), None).to_dict("records")
+
+
+# ==== Preload lookup ====
+
+def in_batches(values: Iterable, size: int = LOOKUP_BATCH) -> Iterator[list]:
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def load_authors(db: Session) -> pd.DataFrame:
+    """Semua author (sinta_id, author_id, author_name) dalam satu query, untuk di-merge ke file."""
+    rows = (
+        db.query(Author.sinta_id, Author.id, User.name)
+        .outerjoin(User, Author.user_id == User.id)
+        .filter(Author.sinta_id.isnot(None))
+        .order_by(Author.id)
+        .all()
+    )
+    authors = pd.DataFrame(rows, columns=["sinta_id", "author_id", "author_name"])
+    return authors.drop_duplicates("sinta_id")
+
+
+def article_ids_by_title(db: Session, titles: Iterable[str]) -> Dict[str, int]:
+    """title_key(judul) -> article id, dicari per batch judul."""
+    ids = {}
+    for batch in in_batches(set(titles)):
+        rows = db.query(Article.id, Article.title).filter(Article.title.in_(batch)).order_by(Article.id)
+        for article_id, title in rows:
+            ids.setdefault(title_key(title), article_id)
+    return ids
+
+
+def research_ids_by_key(db: Session, titles: Iterable[str]) -> Dict[Tuple, int]:
+    """(title_key(judul), year, fund) -> research id, dicari per batch judul."""
+    ids = {}
+    for batch in in_batches(set(titles)):
+        rows = (
+            db.query(Research.id, Research.title, Research.year, Research.fund)
+            .filter(Research.title.in_(batch))
+            .order_by(Research.id)
+        )
+        for research_id, title, year, fund in rows:
+            ids.setdefault((title_key(title), year, fund), research_id)
+    return ids
+
+
+def unknown_titles(frame: pd.DataFrame, known_keys) -> Set[str]:
+    """Judul di frame yang title_key-nya belum ada di known_keys."""
+    return set(frame.loc[~frame["title_key"].isin(list(known_keys)), "title"])
+
+
+def existing_pairs(db: Session, left, right, left_ids: Iterable[int]) -> Set[Tuple[int, int]]:
+    """Pasangan (left, right) yang sudah ada di tabel relasi, untuk left_ids tertentu."""
+    pairs = set()
+    for batch in in_batches(set(left_ids)):
+        pairs.update(tuple(row) for row in db.query(left, right).filter(left.in_(batch)))
+    return pairs
+
+
+# ==== Penulisan per chunk ====
+
+def insert_articles(db: Session, rows: List[Dict], title_ids: Dict[str, int]) -> int:
+    """
+    Insert artikel baru lewat executemany lalu ambil id-nya dengan lookup judul.
+    title_ids dikunci title_key, jadi judul yang hanya beda huruf besar/kecil
+    tidak di-insert dua kali.
+    """
+    if not rows:
+        return 0
+    db.execute(insert(Article.__table__), rows)
+    inserted = article_ids_by_title(db, [row["title"] for row in rows])
+    title_ids.update(inserted)
+    # Insert lewat Core tidak terlihat oleh listener ORM
+    record_stats_inserts(db, articles=rows)
+    mark_stale_on_commit(db, Article, inserted.values())
+    return len(rows)
+
+
+def new_pairs(relations: pd.DataFrame, left: str, right: str, existing: Set[Tuple[int, int]]) -> pd.DataFrame:
+    relations = relations.drop_duplicates([left, right])
+    if relations.empty:
+        return relations
+    known = pd.MultiIndex.from_frame(relations[[left, right]]).isin(list(existing))
+    return relations[~known]
+
+
+def finish_chunk(db: Session, chunks: List[Dict], rows: int, start: float):
+    db.commit()
+    elapsed = time.perf_counter() - start
+    entry = {
+        "chunk": len(chunks) + 1,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else None
+    }
+    chunks.append(entry)
+    print(f"📦 Chunk {entry['chunk']}: {rows} baris dalam {elapsed:.2f}s ({entry['rows_per_second']} baris/detik)")
+
+
+# ==== Pipeline per jenis file ====
+
+def ingest_garuda_articles(db: Session, frames: Iterable[pd.DataFrame]) -> Dict:
+    """
+    Export artikel SINTA/GARUDA: artikel yang judulnya sudah ada dilewati
+    seluruhnya, artikel baru ditautkan ke author lewat kolom User ID.
+    """
+    authors = load_authors(db)
+    title_ids: Dict[str, int] = {}
+    inserted_articles = inserted_relations = 0
+    chunks: List[Dict] = []
+
+    for chunk in frames:
+        start = time.perf_counter()
+        doi = text_column(chunk, "DOI").str.replace("DOI:", "", regex=False).str.strip()
+        frame = pd.DataFrame({
+            "title": text_column(chunk, "Judul"),
+            "year": int_column(chunk, "Tahun"),
+            "doi": doi.where((doi != "") & (doi.str.lower() != "none")),
+            "accred": text_column(chunk, "Index Jurnal"),
+            "abstract": text_column(chunk, "Abstract"),
+            "citation_count": pd.Series(pd.NA, index=chunk.index, dtype="Int64"),
+            "article_url": text_column(chunk, "Paper Link"),
+            "journal": text_column(chunk, "Kategori Jurnal"),
+            "source": "SINTA",
+            "university": text_column(chunk, "Universitas"),
+            "sinta_id": text_column(chunk, "User ID"),
+            "author_order": int_column(chunk, "Order"),
+        })
+        frame = frame[frame["title"] != ""]
+        frame = frame.assign(title_key=frame["title"].map(title_key))
+
+        title_ids.update(article_ids_by_title(db, unknown_titles(frame, title_ids)))
+        new = frame[~frame["title_key"].isin(list(title_ids))].drop_duplicates("title_key")
+        inserted_articles += insert_articles(db, records(new, ARTICLE_COLUMNS), title_ids)
+
+        relations = new.merge(authors, on="sinta_id", how="inner")
+        relations = relations.assign(
+            article_id=relations["title_key"].map(title_ids),
+            author_id=relations["author_id"].astype("Int64")
+        )
+        rows = records(relations, ["article_id", "author_id", "author_order"])
+        inserted_relations += insert_ignore(db, PublicationAuthor.__table__, rows)
+
+        finish_chunk(db, chunks, len(chunk), start)
+
+    return {
+        "inserted_articles": inserted_articles,
+        "inserted_relations": inserted_relations,
+        "chunks": chunks
+    }
+
+
+def ingest_scopus_articles(db: Session, frames: Iterable[pd.DataFrame]) -> Dict:
+    """Export artikel SCOPUS: artikel yang sudah ada tetap ditautkan ke author-nya."""
+    authors = load_authors(db)
+    title_ids: Dict[str, int] = {}
+    inserted_articles = inserted_relations = skipped_relations = 0
+    chunks: List[Dict] = []
+
+    for chunk in frames:
+        start = time.perf_counter()
+        frame = pd.DataFrame({
+            "title": text_column(chunk, "Title"),
+            "year": int_column(chunk, "Year"),
+            "doi": empty_to_none(text_column(chunk, "DOI")),
+            "accred": text_column(chunk, "Accred"),
+            "abstract": text_column(chunk, "Abstract"),
+            "citation_count": int_column(chunk, "Cited"),
+            "article_url": text_column(chunk, "Publisher Link"),
+            "journal": text_column(chunk, "Jurnal"),
+            "source": "SCOPUS",
+            "university": None,
+            "sinta_id": text_column(chunk, "User ID"),
+            "author_order": int_column(chunk, "Order"),
+        })
+        frame = frame[(frame["title"] != "") & (frame["sinta_id"] != "")]
+        frame = frame.merge(authors, on="sinta_id", how="inner")
+        frame = frame.assign(title_key=frame["title"].map(title_key))
+
+        title_ids.update(article_ids_by_title(db, unknown_titles(frame, title_ids)))
+        new = frame[~frame["title_key"].isin(list(title_ids))].drop_duplicates("title_key")
+        inserted_articles += insert_articles(db, records(new, ARTICLE_COLUMNS), title_ids)
+
+        relations = frame.assign(
+            article_id=frame["title_key"].map(title_ids).astype("Int64"),
+            author_id=frame["author_id"].astype("Int64")
+        )
+        existing = existing_pairs(db, PublicationAuthor.article_id, PublicationAuthor.author_id,
+                                  relations["article_id"].tolist())
+        relations = new_pairs(relations, "article_id", "author_id", existing)
+        rows = records(relations, ["article_id", "author_id", "author_order"])
+        inserted = insert_ignore(db, PublicationAuthor.__table__, rows)
+        inserted_relations += inserted
+        skipped_relations += len(frame) - inserted
+
+        finish_chunk(db, chunks, len(chunk), start)
+
+    return {
+        "inserted_articles": inserted_articles,
+        "inserted_relations": inserted_relations,
+        "skipped_relations": skipped_relations,
+        "chunks": chunks
+    }
+
+
+def ingest_researches(db: Session, frames: Iterable[pd.DataFrame]) -> Dict:
+    """Export penelitian SINTA: penelitian unik per (title, year, fund), relasi unik per author."""
+    authors = load_authors(db)
+    authors = authors[authors["author_name"].notna()]
+    research_ids: Dict[Tuple, int] = {}
+    inserted_research = inserted_relations = 0
+    chunks: List[Dict] = []
+
+    for chunk in frames:
+        start = time.perf_counter()
+        frame = pd.DataFrame({
+            "sinta_id": text_column(chunk, "User ID"),
+            "title": text_column(chunk, "Title"),
+            "leader_name": empty_to_none(text_column(chunk, "Leader")),
+            "year": int_column(chunk, "Year"),
+            # Research.fund Integer: dibulatkan sebelum jadi key agar cocok dengan nilai di DB
+            "fund": rounded_int_column(chunk, "Dana Penelitian"),
+            "fund_status": empty_to_none(text_column(chunk, "Status Penelitian")),
+            "fund_source": empty_to_none(text_column(chunk, "Sumber Pendanaan")),
+            "fund_type": empty_to_none(text_column(chunk, "Jenis Penelitian")),
+        })
+        frame = frame[frame["title"] != ""].merge(authors, on="sinta_id", how="inner")
+        frame["title_key"] = frame["title"].map(title_key)
+        frame["is_leader"] = (
+            frame["author_name"].str.strip().str.lower() == frame["leader_name"].fillna("").str.lower()
+        )
+
+        known_titles = {key[0] for key in research_ids}
+        research_ids.update(research_ids_by_key(db, unknown_titles(frame, known_titles)))
+
+        rows = records(frame, RESEARCH_COLUMNS + ["title_key", "author_id", "is_leader"])
+        new_research = {}
+        for row in rows:
+            key = (row["title_key"], row["year"], row["fund"])
+            if key not in research_ids:
+                new_research.setdefault(key, {column: row[column] for column in RESEARCH_COLUMNS})
+
+        if new_research:
+            db.execute(insert(Research.__table__), list(new_research.values()))
+            inserted = research_ids_by_key(db, {row["title"] for row in new_research.values()})
+            research_ids.update(inserted)
+            record_stats_inserts(db, researches=new_research.values())
+            mark_stale_on_commit(db, Research, [inserted[key] for key in new_research if key in inserted])
+            inserted_research += len(new_research)
+
+        relations = pd.DataFrame({
+            "researcher_id": [research_ids[(row["title_key"], row["year"], row["fund"])] for row in rows],
+            "author_id": [row["author_id"] for row in rows],
+            "is_leader": [row["is_leader"] for row in rows],
+        })
+        existing = existing_pairs(db, ResearcherAuthor.researcher_id, ResearcherAuthor.author_id,
+                                  relations["researcher_id"].tolist())
+        relations = new_pairs(relations, "researcher_id", "author_id", existing)
+        relation_rows = records(relations, ["researcher_id", "author_id", "is_leader"])
+        if relation_rows:
+            db.execute(insert(ResearcherAuthor.__table__), relation_rows)
+        inserted_relations += len(relation_rows)
+
+        finish_chunk(db, chunks, len(chunk), start)
+
+    return {
+        "inserted_research": inserted_research,
+        "inserted_relations": inserted_relations,
+        "chunks": chunks
+    }
+
+
+def ingest_authors(db: Session, frames: Iterable[pd.DataFrame]) -> Dict:
+    """Export dosen SINTA: user dicocokkan lewat nama, author di-upsert per user_id."""
+    user_ids: Dict[str, int] = {}
+    inserted = updated = 0
+    chunks: List[Dict] = []
+
+    for chunk in frames:
+        start = time.perf_counter()
+        frame = pd.DataFrame({
+            "name": text_column(chunk, "Lecturer Name"),
+            "npp": empty_to_none(text_column(chunk, "npp")),
+            "sinta_id": text_column(chunk, "Sinta ID"),
+            "sinta_profile_url": text_column(chunk, "Profile Link"),
+            "department": text_column(chunk, "Department"),
+            "scopus_hindex": text_column(chunk, "Scopus H-Index", "0"),
+            "gs_hindex": text_column(chunk, "GS H-Index", "0"),
+            "sinta_score_3yr": text_column(chunk, "Sinta Score 3yr", "0"),
+            "sinta_score_total": text_column(chunk, "Sinta Score Total", "0"),
+            "affil_score_3yr": text_column(chunk, "Affil Score 3yr", "0"),
+            "affil_score_total": text_column(chunk, "Affil Score Total", "0"),
+        })
+        frame = frame[frame["name"] != ""]
+
+        # 1. User berdasarkan nama: preload yang sudah ada, sisanya dibuat sekaligus
+        for batch in in_batches(set(frame["name"]) - user_ids.keys()):
+            for user_id, name in db.query(User.id, User.name).filter(User.name.in_(batch)):
+                user_ids.setdefault(name, user_id)
+
+        users = frame.drop_duplicates("name", keep="last")
+        existing_users = users[users["name"].isin(list(user_ids))]
+        npp_updates = records(existing_users[existing_users["npp"].notna()].assign(
+            id=existing_users["name"].map(user_ids)
+        ), ["id", "npp"])
+        if npp_updates:
+            db.execute(update(User), npp_updates)
+
+        # Lewat ORM agar listener token nama (pencarian) tetap berjalan
+        new_users = [User(name=row["name"], npp=row["npp"])
+                     for row in records(users[~users["name"].isin(list(user_ids))], ["name", "npp"])]
+        db.add_all(new_users)
+        db.flush()
+        user_ids.update({user.name: user.id for user in new_users})
+
+        # 2. Author per user_id: insert baru atau update yang sudah ada
+        frame = frame.assign(user_id=frame["name"].map(user_ids))
+        existing_authors = set()
+        for batch in in_batches(set(frame["user_id"])):
+            existing_authors.update(row.user_id for row in db.query(Author.user_id).filter(Author.user_id.in_(batch)))
+
+        # Baris kedua untuk user yang sama di file juga dihitung sebagai update
+        is_update = frame["user_id"].isin(list(existing_authors)) | frame["user_id"].duplicated()
+        updated += int(is_update.sum())
+        inserted += int((~is_update).sum())
+
+        rows = records(frame.drop_duplicates("user_id", keep="last"), ["user_id"] + AUTHOR_COLUMNS)
+        upsert(db, Author.__table__, rows, keys=["user_id"], update_columns=AUTHOR_COLUMNS)
+
+        finish_chunk(db, chunks, len(chunk), start)
+
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "chunks": chunks
+    }
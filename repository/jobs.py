@@ -0,0 +1,371 @@
+import asyncio
+import inspect
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import Job, JobUnit
+from repository.bulk import insert_ignore
+from services.cache import invalidate_cache
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Hanya error terakhir yang disimpan di kolom errors
+MAX_JOB_ERRORS = 50
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+ACTIVE_STATUSES = ("pending", "running")
+# Setiap proses memperbarui heartbeat_at job miliknya tiap JOB_HEARTBEAT_SECONDS;
+# job aktif yang detaknya lebih tua dari JOB_STALE_SECONDS dianggap terputus
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "120"))
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# kind -> handler(db, job, **params); diisi lewat @job_handler di modul routes
+HANDLERS: Dict[str, Callable[..., Any]] = {}
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+_monitor_lock = threading.Lock()
+_monitor_started = False
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def job_handler(kind: str):
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+class JobContext:
+    """
+    Progress satu job yang disimpan ke tabel jobs.
+
+    Tanpa job_id (fungsi crawl dipanggil langsung dari route) semua method
+    tidak menyimpan apa pun, jadi kode yang sama bisa jalan di foreground
+    maupun sebagai job background.
+    """
+
+    def __init__(
+        self,
+        job_id: Optional[int] = None,
+        completed_units: Optional[List[Any]] = None,
+        counters: Optional[Dict[str, int]] = None,
+        errors: Optional[List[str]] = None,
+        completed_count: int = 0,
+        error_count: int = 0
+    ):
+        self.job_id = job_id
+        self._done = set(completed_units or [])
+        self.counters = dict(counters or {})
+        self.errors = list(errors or [])
+        self.completed_count = completed_count
+        self.error_count = error_count
+
+    def is_done(self, unit) -> bool:
+        """True jika unit sudah selesai di run sebelumnya (untuk resume)."""
+        return unit in self._done
+
+    def set_total(self, total: int):
+        self._save(total_units=total)
+
+    def unit_done(self, unit, **counters: int):
+        self.units_done([unit], **counters)
+
+    def units_done(self, units: List[Any], **counters: int):
+        """
+        Tandai satu batch unit selesai dengan sekali simpan (checkpoint per batch).
+        Hanya unit baru yang ditulis ke job_units, jadi biaya checkpoint tidak
+        tumbuh dengan jumlah unit yang sudah selesai.
+        """
+        new_units = []
+        for unit in units:
+            if unit not in self._done:
+                self._done.add(unit)
+                new_units.append(unit)
+        self.completed_count += len(new_units)
+        for key, value in counters.items():
+            self.counters[key] = self.counters.get(key, 0) + value
+        if self.job_id is None:
+            return
+        with SessionLocal() as db:
+            insert_ignore(db, JobUnit.__table__, [{"job_id": self.job_id, "unit": unit} for unit in new_units])
+            db.query(Job).filter(Job.id == self.job_id).update(
+                {"completed_count": self.completed_count, "counters": dict(self.counters)}
+            )
+            db.commit()
+
+    def error(self, message: str):
+        print(f"⚠️ {message}")
+        self.error_count += 1
+        self.errors = (self.errors + [message])[-MAX_JOB_ERRORS:]
+        self._save(error_count=self.error_count, errors=list(self.errors))
+
+    def check_cancelled(self):
+        if self.job_id is None:
+            return
+        with SessionLocal() as db:
+            if db.query(Job.cancel_requested).filter(Job.id == self.job_id).scalar():
+                raise JobCancelled()
+
+    def _save(self, **values):
+        if self.job_id is None:
+            return
+        with SessionLocal() as db:
+            db.query(Job).filter(Job.id == self.job_id).update(values)
+            db.commit()
+
+
+def _claim(db: Session, job_id: int, from_statuses, **values) -> bool:
+    """
+    Ubah status job hanya jika statusnya masih salah satu from_statuses
+    (UPDATE ... WHERE status IN ...). Atomik antar worker: hanya satu yang menang.
+    """
+    claimed = (
+        db.query(Job)
+        .filter(Job.id == job_id, Job.status.in_(from_statuses))
+        .update(values, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+
+def validate_job_params(kind: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Cocokkan params dengan signature handler (setelah db dan job): key yang
+    tidak dikenal, param wajib yang kosong, atau tipe yang salah ditolak 400
+    sebelum job dibuat, bukan gagal di worker.
+    """
+    signature = inspect.signature(HANDLERS[kind])
+    accepted = {
+        name: parameter
+        for name, parameter in list(signature.parameters.items())[2:]
+        if parameter.kind in (parameter.POSITIONAL_OR_KEYWORD, parameter.KEYWORD_ONLY)
+    }
+    params = dict(params or {})
+
+    unknown = sorted(set(params) - set(accepted))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Parameter tidak dikenal untuk job '{kind}': {', '.join(unknown)} (diterima: {', '.join(accepted) or '-'})"
+        )
+    missing = [name for name, parameter in accepted.items() if parameter.default is parameter.empty and name not in params]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Parameter wajib untuk job '{kind}': {', '.join(missing)}")
+
+    for name, value in params.items():
+        annotation = accepted[name].annotation
+        if annotation is accepted[name].empty:
+            continue
+        try:
+            params[name] = TypeAdapter(annotation).validate_python(value)
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"Parameter '{name}' tidak valid: {e.errors()[0]['msg']}")
+    return params
+
+
+def submit_job(db: Session, kind: str, params: Optional[Dict[str, Any]] = None) -> Job:
+    if kind not in HANDLERS:
+        raise HTTPException(status_code=404, detail=f"Job '{kind}' tidak dikenal")
+    params = validate_job_params(kind, params)
+
+    now = datetime.now()
+    job = Job(
+        kind=kind,
+        status="pending",
+        params=params,
+        completed_units=[],
+        counters={},
+        errors=[],
+        owner=WORKER_ID,
+        heartbeat_at=now,
+        created_at=now
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    start_job_monitor()
+    _executor.submit(run_job, job.id)
+    return job
+
+
+def job_accepted(job: Job) -> JSONResponse:
+    """Response 202 untuk job yang baru dijadwalkan; progres dipantau lewat GET /jobs/{job_id}."""
+    return JSONResponse(
+        status_code=202,
+        content={"success": True, "job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
+    )
+
+
+def run_job(job_id: int):
+    """Dijalankan di worker pool: memanggil handler dengan session sendiri."""
+    with SessionLocal() as db:
+        now = datetime.now()
+        claimed = _claim(
+            db, job_id, ("pending",),
+            status="running", owner=WORKER_ID, heartbeat_at=now, started_at=now, finished_at=None
+        )
+        if not claimed:
+            # Sudah dibatalkan, atau diambil worker lain
+            return
+
+        job = db.get(Job, job_id)
+        completed_units = [unit for (unit,) in db.query(JobUnit.unit).filter(JobUnit.job_id == job.id)]
+        context = JobContext(
+            job_id=job.id,
+            # completed_units di tabel jobs hanya terisi untuk job dari versi lama
+            completed_units=(job.completed_units or []) + completed_units,
+            counters=job.counters,
+            errors=job.errors,
+            completed_count=job.completed_count or 0,
+            error_count=job.error_count or 0
+        )
+        handler = HANDLERS.get(job.kind)
+        params = job.params or {}
+        print(f"🛠️ Job {job_id} ({job.kind}) mulai")
+
+        result = None
+        try:
+            if handler is None:
+                raise RuntimeError(f"Handler job '{job.kind}' tidak terdaftar")
+            outcome = handler(db, context, **params)
+            if inspect.iscoroutine(outcome):
+                outcome = asyncio.run(outcome)
+            result = outcome
+            status = "completed"
+        except JobCancelled:
+            db.rollback()
+            status = "cancelled"
+        except Exception as e:
+            db.rollback()
+            traceback.print_exc()
+            context.error(f"{type(e).__name__}: {e}")
+            status = "failed"
+
+    with SessionLocal() as db:
+        finished = _claim(
+            db, job_id, ("running",),
+            status=status, result=jsonable_encoder(result), finished_at=datetime.now()
+        )
+        if not finished:
+            print(f"⚠️ Job {job_id} sudah ditandai terputus oleh worker lain, status akhir tidak disimpan")
+
+    print(f"🛠️ Job {job_id} selesai: {status}")
+    # Job bisa sudah menulis sebagian data meskipun gagal/dibatalkan
+    invalidate_cache()
+
+
+def get_job(db: Session, job_id: int) -> Job:
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def cancel_job(db: Session, job_id: int) -> Job:
+    job = get_job(db, job_id)
+    if job.status in FINISHED_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Job sudah {job.status}")
+
+    # Job yang masih antre langsung dibatalkan; yang sedang jalan berhenti
+    # di pengecekan unit berikutnya
+    if not _claim(db, job_id, ("pending",), status="cancelled", cancel_requested=True, finished_at=datetime.now()):
+        _claim(db, job_id, ("running",), cancel_requested=True)
+    db.refresh(job)
+    return job
+
+
+def resume_job(db: Session, job_id: int) -> Job:
+    job = get_job(db, job_id)
+
+    # job_units dipertahankan, handler melewati unit yang sudah selesai
+    claimed = _claim(
+        db, job_id, ("failed", "cancelled"),
+        status="pending", cancel_requested=False, finished_at=None, owner=WORKER_ID, heartbeat_at=datetime.now()
+    )
+    db.refresh(job)
+    if not claimed:
+        raise HTTPException(status_code=400, detail=f"Hanya job failed/cancelled yang bisa di-resume (status: {job.status})")
+
+    start_job_monitor()
+    _executor.submit(run_job, job.id)
+    return job
+
+
+def heartbeat_jobs(db: Session) -> int:
+    """Perbarui heartbeat_at semua job aktif milik proses ini (termasuk yang masih antre)."""
+    updated = (
+        db.query(Job)
+        .filter(Job.owner == WORKER_ID, Job.status.in_(ACTIVE_STATUSES))
+        .update({"heartbeat_at": datetime.now()}, synchronize_session=False)
+    )
+    db.commit()
+    return updated
+
+
+def mark_interrupted_jobs(db: Session) -> int:
+    """
+    Tandai failed job pending/running yang heartbeat-nya kedaluwarsa (prosesnya
+    mati atau restart) agar bisa di-resume. Job yang masih berdetak di worker
+    lain tidak disentuh.
+    """
+    cutoff = datetime.now() - timedelta(seconds=JOB_STALE_SECONDS)
+    expired = or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < cutoff)
+    candidates = db.query(Job).filter(Job.status.in_(ACTIVE_STATUSES), expired).all()
+
+    interrupted = 0
+    for job in candidates:
+        errors = ((job.errors or []) + ["Terputus: worker berhenti berdetak (restart/crash)"])[-MAX_JOB_ERRORS:]
+        # Kondisi diulang di UPDATE: job yang baru saja berdetak lagi tidak ikut ditandai
+        updated = (
+            db.query(Job)
+            .filter(Job.id == job.id, Job.status.in_(ACTIVE_STATUSES), expired)
+            .update({
+                "status": "failed",
+                "finished_at": datetime.now(),
+                "error_count": (job.error_count or 0) + 1,
+                "errors": errors
+            }, synchronize_session=False)
+        )
+        interrupted += updated
+    db.commit()
+    return interrupted
+
+
+def _monitor_jobs():
+    while True:
+        try:
+            with SessionLocal() as db:
+                heartbeat_jobs(db)
+                interrupted = mark_interrupted_jobs(db)
+            if interrupted:
+                print(f"⚠️ {interrupted} job terputus ditandai failed")
+        except Exception as e:
+            print(f"⚠️ Gagal memperbarui heartbeat job: {type(e).__name__}: {e}")
+        time.sleep(JOB_HEARTBEAT_SECONDS)
+
+
+def start_job_monitor():
+    """Jalankan thread heartbeat + pembersih job terputus sekali per proses."""
+    global _monitor_started
+    with _monitor_lock:
+        if _monitor_started:
+            return
+        _monitor_started = True
+    threading.Thread(target=_monitor_jobs, name="job-monitor", daemon=True).start()
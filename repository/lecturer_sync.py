@@ -0,0 +1,204 @@
+import asyncio
+import re
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
+
+from models import User, Author, Research, ResearcherAuthor
+from repository.batch_writer import AuthorResolver
+from repository.crawl_engine import crawl_engine
+from repository.jobs import JobContext
+from repository.research_crawl import research_sync
+from repository.sync_state import ProfileWalk, load_marks, save_mark
+
+
+class SessionWriter:
+    """
+    Menjalankan kerja DB sinkron di threadpool agar event loop tetap bebas
+    mengambil halaman. Session tidak thread-safe, jadi pemakaian session
+    yang sama dijalankan satu per satu.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, func: Callable, *args, **kwargs):
+        async with self._lock:
+            return await run_in_threadpool(func, *args, **kwargs)
+
+
+def _load_lecturers(db: Session):
+    return (
+        db.query(Author.id, User.name, Author.sinta_profile_url)
+        .select_from(User)
+        .join(Author)
+        .all()
+    )
+
+
+async def sync_lecturers(
+    db: Session,
+    fetch: Callable[[str, str, ProfileWalk], AsyncIterator[Tuple[int, list]]],
+    save: Callable[[list, Session, AuthorResolver], None],
+    job: Optional[JobContext] = None,
+    source: Optional[str] = None,
+    full: bool = False
+) -> int:
+    """
+    Crawl profil semua dosen bersamaan lewat crawl engine. Publikasi tiap
+    halaman profil langsung disimpan begitu datang, jadi riwayat lengkap
+    dosen tidak ditampung di memori. Dosen yang sudah selesai di run
+    sebelumnya (job.is_done) dilewati, jadi job yang gagal bisa
+    di-resume. Mengembalikan jumlah publikasi yang di-scrape.
+
+    Dengan `source`, sync berjalan inkremental: halaman profil dijalani dari
+    yang terbaru dan berhenti di publikasi yang sudah tersimpan (SyncState).
+    Full crawl hanya untuk dosen yang belum pernah di-sync atau jika full=True.
+    Mark hanya dimajukan jika profil dijalani sampai mark atau halaman
+    terakhir; walk yang terputus dicatat lewat job.error.
+    """
+    job = job or JobContext()
+    write = SessionWriter()
+
+    lecturers = await write(_load_lecturers, db)
+    print(f"Jumlah dosen: {len(lecturers)}")
+    lecturers = [lecturer for lecturer in lecturers if lecturer.sinta_profile_url]
+    await run_in_threadpool(job.set_total, len(lecturers))
+    marks = await write(load_marks, db, source) if source and not full else {}
+    # Peta nama author dimuat sekali per run, bukan di setiap simpan per halaman
+    resolver = await write(AuthorResolver, db)
+
+    async def crawl(author_id, lecturer_name, profile_link):
+        walk = ProfileWalk(mark=marks.get(author_id))
+        newest, scraped, pages = None, 0, 0
+        async for page, scraped_data in fetch(lecturer_name, profile_link, walk):
+            await run_in_threadpool(job.check_cancelled)
+            pages = page
+            if not scraped_data:
+                continue
+            # Satu halaman disimpan utuh sebelum halaman lain memakai session
+            await write(save, scraped_data, db, resolver)
+            newest = newest or scraped_data[0]
+            scraped += len(scraped_data)
+        return author_id, walk, newest, scraped, pages
+
+    tasks = [crawl(*lecturer) for lecturer in lecturers if not job.is_done(lecturer.id)]
+
+    total = 0
+    async for author_id, walk, newest, scraped, pages in crawl_engine.as_completed(tasks):
+        print(f"Jumlah data yang di-scrape: {scraped} ({pages} halaman)")
+        total += scraped
+        if not walk.complete:
+            # Halaman yang belum diambil akan hilang jika mark dimajukan: mark tetap,
+            # dan dosen tidak ditandai selesai supaya resume mengulanginya
+            await run_in_threadpool(
+                job.error, f"Sync dosen {author_id} tidak lengkap: {walk.error or 'berhenti sebelum halaman terakhir'}"
+            )
+            continue
+        # Run pertama tanpa hasil (profil kosong) tidak menyimpan mark, jadi tetap full crawl
+        if source and (newest is not None or walk.mark is not None):
+            await write(save_mark, db, author_id, source, walk, newest, pages, full=walk.mark is None)
+        await run_in_threadpool(job.unit_done, author_id, scraped=scraped, pages=pages)
+
+    return total
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r'\W+', '', name.lower().strip())
+
+
+def _save_researches(db: Session, author: Author, researches: List[dict]) -> Tuple[int, int]:
+    """Simpan research hasil crawl satu author; kembalikan (research baru, relasi baru)."""
+    inserted = relations = 0
+
+    for res in researches:
+        title = res["title"].strip()
+        if not title:
+            continue
+
+        # Cek duplikasi research
+        research = db.query(Research).filter(Research.title == title).first()
+        if not research:
+            research = Research(
+                title=title,
+                fund=float(res["fund"]) if res["fund"].replace(",", "").isdigit() else None,
+                fund_status=res["fund_status"] or None,
+                fund_source=res["fund_source"] or None,
+                fund_type=res["fund_type"] or None,
+                year=int(res["year"]) if res["year"].isdigit() else None
+            )
+            db.add(research)
+            db.commit()
+            db.refresh(research)
+            inserted += 1
+
+        # Cek relasi
+        existing_relation = db.query(ResearcherAuthor).filter_by(
+            researcher_id=research.id,
+            author_id=author.id
+        ).first()
+        if existing_relation:
+            continue
+
+        # Cek apakah leader berdasarkan perbandingan nama
+        author_name = normalize_name(author.user.name)
+        leader_name = normalize_name(res["leader"])
+        is_leader = author_name == leader_name
+
+        researcher_author = ResearcherAuthor(
+            researcher_id=research.id,
+            author_id=author.id,
+            is_leader=is_leader
+        )
+        db.add(researcher_author)
+        db.commit()
+        relations += 1
+
+    return inserted, relations
+
+
+def _load_research_authors(db: Session) -> List[Author]:
+    # User dimuat sekalian: nama author dipakai di event loop tanpa lazy load
+    return db.query(Author).options(joinedload(Author.user)).filter(Author.sinta_id.isnot(None)).all()
+
+
+async def sync_researches(db: Session, job: Optional[JobContext] = None) -> dict:
+    job = job or JobContext()
+    write = SessionWriter()
+    authors = await write(_load_research_authors, db)
+    await run_in_threadpool(job.set_total, len(authors))
+    total_inserted = 0
+    total_relations = 0
+
+    async def crawl(author):
+        print(f"🔍 Syncing for author: {author.user.name} ({author.sinta_id})")
+        walk = ProfileWalk()
+        try:
+            return author, walk, await research_sync(author.sinta_id, walk)
+        except Exception as e:
+            walk.error = f"{type(e).__name__}: {e}"
+            return author, walk, []
+
+    # Crawl semua author bersamaan, simpan begitu hasil tiap author datang
+    tasks = [crawl(author) for author in authors if author.sinta_id and not job.is_done(author.id)]
+    async for author, walk, researches in crawl_engine.as_completed(tasks):
+        await run_in_threadpool(job.check_cancelled)
+        # Halaman yang sempat diambil tetap disimpan (research tidak diduplikasi)
+        inserted, relations = await write(_save_researches, db, author, researches)
+
+        total_inserted += inserted
+        total_relations += relations
+        if not walk.complete:
+            # Author tidak ditandai selesai supaya resume mengulanginya
+            await run_in_threadpool(
+                job.error, f"Sync research {author.sinta_id} tidak lengkap: {walk.error or 'berhenti sebelum halaman terakhir'}"
+            )
+            continue
+        await run_in_threadpool(job.unit_done, author.id, inserted_researches=inserted, inserted_relations=relations)
+
+    return {
+        "success": True,
+        "inserted_researches": total_inserted,
+        "inserted_relations": total_relations
+    }
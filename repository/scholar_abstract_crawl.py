@@ -4,46 +4,26 @@ import re
 from models import Article, User, PublicationAuthor  # pastikan ini sesuai dengan project-mu
 from schemas import PaperResponseScholar  # asumsi ini sama seperti yang digunakan di Garuda
 from sqlalchemy.orm import Session
+from repository.user import find_user_by_name
 
-from typing import List
-from bs4 import BeautifulSoup
-import requests
-
-from typing import List
-import requests
-from bs4 import BeautifulSoup
-
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from repository.crawl_engine import crawl_engine
+from repository.sinta_parser import parse_items, find_link
+from repository.batch_writer import AuthorResolver, PaperRecord, save_papers, to_int
+from repository.sync_state import ProfileWalk, iter_profile_pages, iter_profile_pages_sync
 
-def scholar_scrapping(lecturer_name: str, profile_link: str) -> List[PaperResponseScholar]:
-    google_scholar_url = f"{profile_link}?view=google_scholar"
-    print(f'Fetching data from: {google_scholar_url}')
-    response = requests.get(google_scholar_url)
 
+def parse_scholar_page(lecturer_name: str, content: bytes, limit: Optional[int] = None) -> List[PaperResponseScholar]:
     papers = []
 
-    if response.status_code != 200:
-        print(f"Gagal mengambil data dari {google_scholar_url}")
-        return papers
-
-    soup = BeautifulSoup(response.content, 'html.parser')
-    articles = soup.find_all('div', class_='ar-list-item mb-5')
-    
-    for item in articles:
-        # Title dan Link
-        title_tag = item.find('div', class_='ar-title')
-        link_tag = title_tag.find('a') if title_tag else None
-        title = link_tag.text.strip() if link_tag else 'N/A'
-        publication_link = link_tag['href'] if link_tag and link_tag.has_attr('href') else 'N/A'
-
+    for item in parse_items(content, limit):
         authors = []
         author_order = None
-        meta_divs = item.find_all('div', class_='ar-meta')
 
-        for div in meta_divs:
-            author_tag = div.find('a', href='#!')
+        for meta in item.metas:
+            author_tag = find_link(meta, href='#!')
             if author_tag and "Authors :" in author_tag.text:
-                author_text = author_tag.text.strip()
-                authors_part = author_text.split("Authors :")[-1]
+                authors_part = author_tag.text.split("Authors :")[-1]
                 authors = [a.strip() for a in authors_part.split(',') if a.strip() and "..." not in a]
 
                 # Normalisasi nama dosen → pecah jadi keyword (e.g. ['ajib', 'susanto'])
@@ -55,29 +35,22 @@ def scholar_scrapping(lecturer_name: str, profile_link: str) -> List[PaperRespon
                         break
                 break  # keluar kalau sudah nemu authors
 
-        # Journal
-        journal_category_tag = item.find('a', class_='ar-pub')
-        journal_category = journal_category_tag.text.strip() if journal_category_tag else 'N/A'
-
         # Tahun dan Cited
         year = None
         cited = None
-        if len(meta_divs) > 1:
-            for a_tag in meta_divs[1].find_all('a', href='#!'):
-                text = a_tag.text.strip()
-                i_tag = a_tag.find('i')
-                if i_tag:
-                    icon_class = i_tag.get('class', [])
-                    if 'zmdi-calendar' in icon_class:
-                        year = text.replace('📅', '').strip()
-                    elif 'zmdi-comment-list' in icon_class:
-                        cited = text.replace('🔗', '').strip()
+        for a_tag in item.meta(1):
+            if a_tag.href != '#!' or a_tag.icon is None:
+                continue
+            if 'zmdi-calendar' in a_tag.icon:
+                year = a_tag.text.replace('📅', '').strip()
+            elif 'zmdi-comment-list' in a_tag.icon:
+                cited = a_tag.text.replace('🔗', '').strip()
 
         papers.append(PaperResponseScholar(
             lecturer_name=lecturer_name,
-            title=title,
-            publication_link=publication_link,
-            journal_category=journal_category,
+            title=item.title if item.title is not None else 'N/A',
+            publication_link=item.link or 'N/A',
+            journal_category=item.pub if item.pub is not None else 'N/A',
             author_order=author_order,
             authors=authors,
             year=year,
@@ -87,115 +60,37 @@ def scholar_scrapping(lecturer_name: str, profile_link: str) -> List[PaperRespon
     return papers
 
 
-
-def scholar_data(scraped_data: list[PaperResponseScholar], db: Session):
-    for data in scraped_data:
-        # Cek apakah artikel sudah ada
-        article = db.query(Article).filter(
-            (Article.title == data.title)
-        ).first()
-
-        if not article:
-            article = Article(
-                title=data.title,
-                year=int(data.year) if data.year.isdigit() else None,
-                article_url=data.publication_link,
-                journal=data.journal_category,
-                source="GOOGLE_SCHOLAR"
-            )
-            db.add(article)
-            db.commit()
-            db.refresh(article)
-
-        # Cek apakah dosen sudah ada
-        author = db.query(User).filter(User.name.ilike(f"%{data.lecturer_name}%")).first()
-        if author:
-            author_id = author.id
-            existing_relation = db.query(PublicationAuthor).filter_by(
-                article_id=article.id,
-                author_id=author_id,
-            ).first()
-
-            if not existing_relation:
-                new_relation = PublicationAuthor(
-                    article_id=article.id,
-                    author_id=author_id,
-                    author_order=data.author_order
-                )
-                db.add(new_relation)
-    db.commit()
-
-
-def scholar_sync(lecturer_name: str, profile_link: str) -> List[PaperResponseScholar]:
-    google_scholar_url = f"{profile_link}?view=google_scholar"
-    print(f'Fetching data from: {google_scholar_url}')
-    response = requests.get(google_scholar_url)
-
-    papers = []
-
-    if response.status_code != 200:
-        print(f"Gagal mengambil data dari {google_scholar_url}")
-        return papers
-
-    soup = BeautifulSoup(response.content, 'html.parser')
-    articles = soup.find_all('div', class_='ar-list-item mb-5')
-    
-    articles = articles[:5]
-
-    for item in articles:
-        # Title dan Link
-        title_tag = item.find('div', class_='ar-title')
-        link_tag = title_tag.find('a') if title_tag else None
-        title = link_tag.text.strip() if link_tag else 'N/A'
-        publication_link = link_tag['href'] if link_tag and link_tag.has_attr('href') else 'N/A'
-
-        authors = []
-        author_order = None
-        meta_divs = item.find_all('div', class_='ar-meta')
-
-        for div in meta_divs:
-            author_tag = div.find('a', href='#!')
-            if author_tag and "Authors :" in author_tag.text:
-                author_text = author_tag.text.strip()
-                authors_part = author_text.split("Authors :")[-1]
-                authors = [a.strip() for a in authors_part.split(',') if a.strip() and "..." not in a]
-
-                # Normalisasi nama dosen → pecah jadi keyword (e.g. ['ajib', 'susanto'])
-                lecturer_keywords = lecturer_name.lower().split()
-
-                for idx, name in enumerate(authors):
-                    if any(key in name.lower() for key in lecturer_keywords if len(key) > 2):
-                        author_order = idx + 1
-                        break
-                break  # keluar kalau sudah nemu authors
-
-        # Journal
-        journal_category_tag = item.find('a', class_='ar-pub')
-        journal_category = journal_category_tag.text.strip() if journal_category_tag else 'N/A'
-
-        # Tahun dan Cited
-        year = None
-        cited = None
-        if len(meta_divs) > 1:
-            for a_tag in meta_divs[1].find_all('a', href='#!'):
-                text = a_tag.text.strip()
-                i_tag = a_tag.find('i')
-                if i_tag:
-                    icon_class = i_tag.get('class', [])
-                    if 'zmdi-calendar' in icon_class:
-                        year = text.replace('📅', '').strip()
-                    elif 'zmdi-comment-list' in icon_class:
-                        cited = text.replace('🔗', '').strip()
-
-        papers.append(PaperResponseScholar(
-            lecturer_name=lecturer_name,
-            title=title,
-            publication_link=publication_link,
-            journal_category=journal_category,
-            author_order=author_order,
-            authors=authors,
-            year=year,
-            cited=cited
-        ))
-
-    return papers
+def scholar_scrapping(lecturer_name: str, profile_link: str) -> Iterator[PaperResponseScholar]:
+    """Semua publikasi Google Scholar di profil, halaman demi halaman, sebagai generator."""
+    print(f'Fetching data from: {profile_link}?view=google_scholar')
+    for _, papers in iter_profile_pages_sync(
+        profile_link, "google_scholar", lambda content: parse_scholar_page(lecturer_name, content)
+    ):
+        yield from papers
+
+
+
+def scholar_data(scraped_data: list[PaperResponseScholar], db: Session, resolver: Optional[AuthorResolver] = None):
+    save_papers(db, [
+        PaperRecord(
+            title=data.title,
+            source="GOOGLE_SCHOLAR",
+            year=to_int(data.year),
+            journal=data.journal_category,
+            article_url=data.publication_link,
+            author_names=[data.lecturer_name],
+            author_order=data.author_order
+        )
+        for data in scraped_data
+    ], resolver)
+
+
+def scholar_sync(
+    lecturer_name: str,
+    profile_link: str,
+    walk: Optional[ProfileWalk] = None
+) -> AsyncIterator[Tuple[int, List[PaperResponseScholar]]]:
+    print(f'Fetching data from: {profile_link}?view=google_scholar')
+    return iter_profile_pages(
+        profile_link, "google_scholar", lambda content: parse_scholar_page(lecturer_name, content), walk
+    )
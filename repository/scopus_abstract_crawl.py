@@ -2,73 +2,57 @@ import requests
 from fastapi import HTTPException
 from bs4 import BeautifulSoup
 import re
-from typing import List
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 from schemas import PaperResponse, PaperResponseScopus
 from sqlalchemy.orm import Session
 from models import Article, User, Author, PublicationAuthor
 from sqlalchemy.exc import IntegrityError
+from repository.user import find_user_by_name
+from repository.crawl_engine import crawl_engine
+from repository.sinta_parser import find_link, parse_items
+from repository.batch_writer import AuthorResolver, PaperRecord, save_papers
+from repository.sync_state import ProfileWalk, iter_profile_pages, iter_profile_pages_sync
 
 
-def scopus_scrapping(lecturer_name: str, profile_link: str) -> List[PaperResponseScopus]:
+def parse_scopus_page(lecturer_name: str, content: bytes, limit: Optional[int] = None) -> List[PaperResponseScopus]:
     results = []
 
-    if not profile_link:
-        return results
-
-    scopus_url = f"{profile_link}?view=scopus"
-    print(f"\n📚 Memproses (SCOPUS): {lecturer_name}")
-    print(f"🔗 Fetching from: {scopus_url}")
-
-    response = requests.get(scopus_url)
-    if response.status_code != 200:
-        print(f"❌ Gagal mengambil data dari {scopus_url}")
-        return results
-
-    soup = BeautifulSoup(response.content, 'html.parser')
-    articles = soup.find_all('div', class_='ar-list-item mb-5')
-
-    for item in articles:
-        title_tag = item.find('div', class_='ar-title').find('a')
-        title = title_tag.text.strip() if title_tag else 'N/A'
+    for item in parse_items(content, limit):
+        first_meta = item.meta(0)
 
-        accred_tag = item.find('div', class_='ar-meta').find('a', href='#!')
-        accred = accred_tag.text.strip() if accred_tag else 'N/A'
+        accred_tag = find_link(first_meta, href='#!')
+        accred = accred_tag.text if accred_tag else 'N/A'
 
-        jurnal_tag = item.find('div', class_='ar-meta').find('a', class_='ar-pub')
-        jurnal = jurnal_tag.text.strip() if jurnal_tag else 'N/A'
+        jurnal_tag = find_link(first_meta, cls='ar-pub')
+        jurnal = jurnal_tag.text if jurnal_tag else 'N/A'
 
-        first_meta_div = item.find('div', class_='ar-meta')
-        
-        # Perbaikan: pakai text= untuk konsistensi
-        author_order_tag = first_meta_div.find('a', href="#!", text=lambda t: t and "Author Order" in t)
+        author_order_tag = find_link(first_meta, href='#!', contains='Author Order')
         author_order_text = author_order_tag.text.replace('Author Order : ', '').strip() if author_order_tag else None
         author_order = None
         if author_order_text:
             match = re.search(r'\d+', author_order_text)
             author_order = int(match.group()) if match else None
 
-        creator_tag = first_meta_div.find('a', href="#!", text=lambda t: t and "Creator" in t)
+        creator_tag = find_link(first_meta, href='#!', contains='Creator')
         creator = creator_tag.text.replace('Creator : ', '').strip() if creator_tag else 'N/A'
 
-        all_meta_divs = item.find_all('div', class_='ar-meta')
         year = None
         cited = 0
-        if len(all_meta_divs) > 1:
-            second_meta_div = all_meta_divs[1]
+        if len(item.metas) > 1:
+            second_meta = item.meta(1)
 
-            year_tag = second_meta_div.find('a', class_='ar-year')
-            year_text = year_tag.text.strip() if year_tag else None
+            year_tag = find_link(second_meta, cls='ar-year')
+            year_text = year_tag.text if year_tag else None
             year = int(year_text) if year_text and year_text.isdigit() else None
 
-            cited_tag = second_meta_div.find('a', class_='ar-cited')
+            cited_tag = find_link(second_meta, cls='ar-cited')
             if cited_tag:
-                cited_text = cited_tag.text.strip()
-                match = re.search(r'\d+', cited_text)
+                match = re.search(r'\d+', cited_tag.text)
                 cited = int(match.group()) if match else None
 
         results.append(PaperResponseScopus(
             lecturer_name=lecturer_name,
-            title=title,
+            title=item.title if item.title is not None else 'N/A',
             accred=accred,
             jurnal=jurnal,
             author_order=author_order,
@@ -79,122 +63,43 @@ def scopus_scrapping(lecturer_name: str, profile_link: str) -> List[PaperRespons
 
     return results
 
-def scopus_data(scraped_data: List[PaperResponseScopus], db: Session):
-    for data in scraped_data:
-        # Cek apakah artikel sudah ada
-        article = db.query(Article).filter(
-            Article.title == data.title
-        ).first()
-
-        if not article:
-            article = Article(
-                title=data.title,
-                year=data.year,
-                accred=data.accred,
-                citation_count=data.cited,
-                article_url=None,
-                journal=data.jurnal,
-                source="SCOPUS"
-            )
-            db.add(article)
-            try:
-                db.commit()
-                db.refresh(article)
-            except IntegrityError:
-                db.rollback()
-                continue  # Lewati jika gagal menyimpan artikel
-
-        # Cek apakah dosen sudah ada
-        author = db.query(User).filter(User.name.ilike(f"%{data.lecturer_name}%")).first()
-        if author:
-            author_id = author.id
-
-            # Cek relasi apakah sudah ada
-            existing_relation = db.query(PublicationAuthor).filter_by(
-                article_id=article.id,
-                author_id=author_id,
-            ).first()
-
-            if not existing_relation:
-                new_relation = PublicationAuthor(
-                    article_id=article.id,
-                    author_id=author_id,
-                    author_order=data.author_order
-                )
-                db.add(new_relation)
-                try:
-                    db.commit()
-                except IntegrityError:
-                    db.rollback()
-                    continue  # Lewati jika gagal menyimpan relasi
-
-def scopus_sync(lecturer_name: str, profile_link: str) -> List[PaperResponseScopus]:
-    results = []
 
+def scopus_scrapping(lecturer_name: str, profile_link: str) -> Iterator[PaperResponseScopus]:
+    """Semua publikasi Scopus di profil, halaman demi halaman, sebagai generator."""
     if not profile_link:
-        return results
+        return
 
-    scopus_url = f"{profile_link}?view=scopus"
     print(f"\n📚 Memproses (SCOPUS): {lecturer_name}")
-    print(f"🔗 Fetching from: {scopus_url}")
-
-    response = requests.get(scopus_url)
-    if response.status_code != 200:
-        print(f"❌ Gagal mengambil data dari {scopus_url}")
-        return results
-
-    soup = BeautifulSoup(response.content, 'html.parser')
-    articles = soup.find_all('div', class_='ar-list-item mb-5')
-
-    articles = articles[:5]
-    for item in articles:
-        title_tag = item.find('div', class_='ar-title').find('a')
-        title = title_tag.text.strip() if title_tag else 'N/A'
-
-        accred_tag = item.find('div', class_='ar-meta').find('a', href='#!')
-        accred = accred_tag.text.strip() if accred_tag else 'N/A'
-
-        jurnal_tag = item.find('div', class_='ar-meta').find('a', class_='ar-pub')
-        jurnal = jurnal_tag.text.strip() if jurnal_tag else 'N/A'
-
-        first_meta_div = item.find('div', class_='ar-meta')
-        
-        # Perbaikan: pakai text= untuk konsistensi
-        author_order_tag = first_meta_div.find('a', href="#!", text=lambda t: t and "Author Order" in t)
-        author_order_text = author_order_tag.text.replace('Author Order : ', '').strip() if author_order_tag else None
-        author_order = None
-        if author_order_text:
-            match = re.search(r'\d+', author_order_text)
-            author_order = int(match.group()) if match else None
-
-        creator_tag = first_meta_div.find('a', href="#!", text=lambda t: t and "Creator" in t)
-        creator = creator_tag.text.replace('Creator : ', '').strip() if creator_tag else 'N/A'
-
-        all_meta_divs = item.find_all('div', class_='ar-meta')
-        year = None
-        cited = 0
-        if len(all_meta_divs) > 1:
-            second_meta_div = all_meta_divs[1]
-
-            year_tag = second_meta_div.find('a', class_='ar-year')
-            year_text = year_tag.text.strip() if year_tag else None
-            year = int(year_text) if year_text and year_text.isdigit() else None
-
-            cited_tag = second_meta_div.find('a', class_='ar-cited')
-            if cited_tag:
-                cited_text = cited_tag.text.strip()
-                match = re.search(r'\d+', cited_text)
-                cited = int(match.group()) if match else None
-
-        results.append(PaperResponseScopus(
-            lecturer_name=lecturer_name,
-            title=title,
-            accred=accred,
-            jurnal=jurnal,
-            author_order=author_order,
-            creator=creator,
-            year=year,
-            cited=cited,
-        ))
-
-    return results
+    print(f"🔗 Fetching from: {profile_link}?view=scopus")
+
+    for _, papers in iter_profile_pages_sync(
+        profile_link, "scopus", lambda content: parse_scopus_page(lecturer_name, content)
+    ):
+        yield from papers
+
+def scopus_data(scraped_data: List[PaperResponseScopus], db: Session, resolver: Optional[AuthorResolver] = None):
+    save_papers(db, [
+        PaperRecord(
+            title=data.title,
+            source="SCOPUS",
+            year=data.year,
+            accred=data.accred,
+            journal=data.jurnal,
+            citation_count=data.cited,
+            author_names=[data.lecturer_name],
+            author_order=data.author_order
+        )
+        for data in scraped_data
+    ], resolver)
+
+
+def scopus_sync(
+    lecturer_name: str,
+    profile_link: str,
+    walk: Optional[ProfileWalk] = None
+) -> AsyncIterator[Tuple[int, List[PaperResponseScopus]]]:
+    print(f"\n📚 Memproses (SCOPUS): {lecturer_name}")
+    print(f"🔗 Fetching from: {profile_link}?view=scopus")
+    return iter_profile_pages(
+        profile_link, "scopus", lambda content: parse_scopus_page(lecturer_name, content), walk
+    )
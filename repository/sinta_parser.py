@@ -0,0 +1,195 @@
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml opsional, fallback ke html.parser bawaan Python
+    etree = lxml_html = None
+
+# auto = lxml jika terpasang, selain itu BeautifulSoup + html.parser
+SINTA_PARSER = os.getenv("SINTA_PARSER", "auto")
+
+
+@dataclass
+class SintaLink:
+    """Satu <a> di dalam ar-meta."""
+    text: str
+    href: Optional[str] = None
+    classes: Tuple[str, ...] = ()
+    # Class dari <i> pertama di dalam link (ikon zmdi), None jika tidak ada <i>
+    icon: Optional[Tuple[str, ...]] = None
+
+
+@dataclass
+class SintaItem:
+    """
+    Satu div.ar-list-item pada halaman profil SINTA (view garuda, scopus,
+    google_scholar, researches). Setiap item di-parse sekali menjadi record
+    ini, lalu modul crawl masing-masing view memetakan field yang dibutuhkan.
+    """
+    # Teks <a> pertama di div.ar-title, dan teks seluruh div.ar-title
+    title: Optional[str] = None
+    title_text: Optional[str] = None
+    link: Optional[str] = None
+    # Link per div.ar-meta, sesuai urutan di halaman
+    metas: List[List[SintaLink]] = field(default_factory=list)
+    # Teks a.ar-pub pertama di item (jurnal / jenis penelitian)
+    pub: Optional[str] = None
+
+    def meta(self, index: int) -> List[SintaLink]:
+        return self.metas[index] if len(self.metas) > index else []
+
+
+def find_link(
+    links: List[SintaLink],
+    cls: Optional[str] = None,
+    href: Optional[str] = None,
+    contains: Optional[str] = None
+) -> Optional[SintaLink]:
+    """Link pertama yang punya class `cls`, href `href` dan teks mengandung `contains`."""
+    for link in links:
+        if cls is not None and cls not in link.classes:
+            continue
+        if href is not None and link.href != href:
+            continue
+        if contains is not None and contains not in link.text:
+            continue
+        return link
+    return None
+
+
+# ==== Backend BeautifulSoup ====
+
+def _bs4_link(a) -> SintaLink:
+    icon = a.find('i')
+    return SintaLink(
+        text=a.get_text().strip(),
+        href=a.get('href'),
+        classes=tuple(a.get('class', [])),
+        icon=tuple(icon.get('class', [])) if icon else None
+    )
+
+
+def _is_list_item(value) -> bool:
+    # Saat parsing, atribut class bisa masih berupa string utuh "ar-list-item mb-5"
+    classes = value.split() if isinstance(value, str) else (value or [])
+    return 'ar-list-item' in classes
+
+
+def _bs4_items(content: bytes, features: str, limit: Optional[int]) -> List[SintaItem]:
+    # Hanya subtree ar-list-item yang dibangun, sisa halaman dilewati tokenizer
+    soup = BeautifulSoup(content, features, parse_only=SoupStrainer('div', class_=_is_list_item))
+    items = soup.select('div.ar-list-item.mb-5', limit=limit or 0)
+
+    records = []
+    for item in items:
+        title_div = item.find('div', class_='ar-title')
+        title_link = title_div.find('a') if title_div else None
+        pub = item.find('a', class_='ar-pub')
+        records.append(SintaItem(
+            title=title_link.get_text().strip() if title_link else None,
+            title_text=title_div.get_text().strip() if title_div else None,
+            link=title_link.get('href') if title_link else None,
+            metas=[[_bs4_link(a) for a in div.find_all('a')] for div in item.find_all('div', class_='ar-meta')],
+            pub=pub.get_text().strip() if pub else None
+        ))
+    return records
+
+
+def parse_items_html_parser(content: bytes, limit: Optional[int] = None) -> List[SintaItem]:
+    return _bs4_items(content, 'html.parser', limit)
+
+
+def parse_items_bs4_lxml(content: bytes, limit: Optional[int] = None) -> List[SintaItem]:
+    return _bs4_items(content, 'lxml', limit)
+
+
+# ==== Backend lxml (XPath terkompilasi) ====
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if etree is not None:
+    _ITEMS = etree.XPath(f"//div[{_has_class('ar-list-item')} and {_has_class('mb-5')}]")
+    _TITLE = etree.XPath(f".//div[{_has_class('ar-title')}]")
+    _METAS = etree.XPath(f".//div[{_has_class('ar-meta')}]")
+    _PUB = etree.XPath(f".//a[{_has_class('ar-pub')}]")
+    _LINKS = etree.XPath(".//a")
+    _ICON = etree.XPath(".//i")
+
+
+def _lxml_link(a) -> SintaLink:
+    icons = _ICON(a)
+    return SintaLink(
+        text=a.text_content().strip(),
+        href=a.get('href'),
+        classes=tuple((a.get('class') or '').split()),
+        icon=tuple((icons[0].get('class') or '').split()) if icons else None
+    )
+
+
+def parse_items_lxml(content: bytes, limit: Optional[int] = None) -> List[SintaItem]:
+    if not content or not content.strip():
+        return []
+    items = _ITEMS(lxml_html.fromstring(content))
+    if limit is not None:
+        items = items[:limit]
+
+    records = []
+    for item in items:
+        title_divs = _TITLE(item)
+        title_div = title_divs[0] if title_divs else None
+        title_links = _LINKS(title_div) if title_div is not None else []
+        title_link = title_links[0] if title_links else None
+        pubs = _PUB(item)
+        records.append(SintaItem(
+            title=title_link.text_content().strip() if title_link is not None else None,
+            title_text=title_div.text_content().strip() if title_div is not None else None,
+            link=title_link.get('href') if title_link is not None else None,
+            metas=[[_lxml_link(a) for a in _LINKS(div)] for div in _METAS(item)],
+            pub=pubs[0].text_content().strip() if pubs else None
+        ))
+    return records
+
+
+BACKENDS: Dict[str, Callable[[bytes, Optional[int]], List[SintaItem]]] = {
+    "html.parser": parse_items_html_parser,
+}
+if etree is not None:
+    BACKENDS["lxml"] = parse_items_lxml
+    BACKENDS["bs4-lxml"] = parse_items_bs4_lxml
+
+
+def resolve_backend(name: str) -> str:
+    if name == "auto":
+        return "lxml" if "lxml" in BACKENDS else "html.parser"
+    if name not in BACKENDS:
+        print(f"⚠️ Parser '{name}' tidak tersedia, memakai html.parser")
+        return "html.parser"
+    return name
+
+
+DEFAULT_BACKEND = resolve_backend(SINTA_PARSER)
+
+
+def get_backend(name: Optional[str] = None) -> Callable[[bytes, Optional[int]], List[SintaItem]]:
+    return BACKENDS[resolve_backend(name) if name else DEFAULT_BACKEND]
+
+
+_PAGE_COUNT = re.compile(rb"Page\s+\d+\s+of\s+(\d+)", re.IGNORECASE)
+
+
+def parse_page_count(content: bytes) -> Optional[int]:
+    """Jumlah halaman dari teks paginasi SINTA ("Page 1 of 12 | Total Records : 118"), None jika tidak ada."""
+    match = _PAGE_COUNT.search(content or b"")
+    return int(match.group(1)) if match else None
+
+
+def parse_items(content: bytes, limit: Optional[int] = None, backend: Optional[str] = None) -> List[SintaItem]:
+    """Parse semua ar-list-item (atau `limit` item pertama) dari halaman profil SINTA."""
+    return get_backend(backend)(content, limit)
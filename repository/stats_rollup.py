@@ -0,0 +1,166 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, event, func, inspect
+from sqlalchemy.orm import Session
+from models import Article, Research, ArticleSourceYearStat, ResearchFundYearStat
+from repository.bulk import upsert, upsert_increment
+
+ARTICLE_DELTAS = "stats_article_deltas"
+RESEARCH_DELTAS = "stats_research_deltas"
+
+
+def record_stats_inserts(db: Session, articles: Iterable[Dict] = (), researches: Iterable[Dict] = ()):
+    """
+    Catat baris yang di-insert lewat Core (bulk insert), yang tidak terlihat
+    oleh listener ORM. Selisihnya ditambahkan ke tabel ringkasan saat commit.
+    """
+    for row in articles:
+        _add_article_delta(db, (row.get("source"), row.get("year")), 1)
+    for row in researches:
+        _add_research_delta(db, (row.get("fund_source"), row.get("year")), 1, row.get("fund"))
+
+
+def refresh_article_stats(db: Session):
+    """Hitung ulang seluruh ringkasan artikel dari tabel articles."""
+    source = func.coalesce(Article.source, "")
+    year = func.coalesce(Article.year, 0)
+    query = db.query(source, year, func.count(Article.id)).group_by(source, year)
+
+    db.execute(delete(ArticleSourceYearStat.__table__))
+    rows = [{"source": s, "year": y, "article_count": count} for s, y, count in query]
+    upsert(db, ArticleSourceYearStat.__table__, rows,
+           keys=["source", "year"], update_columns=["article_count"])
+
+
+def refresh_research_stats(db: Session):
+    """Hitung ulang seluruh ringkasan penelitian dari tabel research."""
+    fund_source = func.coalesce(Research.fund_source, "")
+    year = func.coalesce(Research.year, 0)
+    query = db.query(
+        fund_source, year, func.count(Research.id), func.sum(Research.fund)
+    ).group_by(fund_source, year)
+
+    db.execute(delete(ResearchFundYearStat.__table__))
+    rows = [
+        {"fund_source": s, "year": y, "research_count": count, "fund_total": int(fund or 0)}
+        for s, y, count, fund in query
+    ]
+    upsert(db, ResearchFundYearStat.__table__, rows,
+           keys=["fund_source", "year"], update_columns=["research_count", "fund_total"])
+
+
+def rebuild_stats(db: Session):
+    refresh_article_stats(db)
+    refresh_research_stats(db)
+    db.commit()
+
+
+def ensure_stats_rollup(db: Session) -> bool:
+    """
+    Bangun ringkasan sekali untuk database lama yang tabel ringkasannya masih
+    kosong. Langkah migrasi (`python -m migrate stats`), bukan startup worker.
+    """
+    has_rollup = db.query(ArticleSourceYearStat.id).first() or db.query(ResearchFundYearStat.id).first()
+    has_data = db.query(Article.id).first() or db.query(Research.id).first()
+    if has_data and not has_rollup:
+        rebuild_stats(db)
+        return True
+    return False
+
+
+def _rollup_key(key: Tuple) -> Tuple[str, int]:
+    source, year = key
+    return (source or "", year or 0)
+
+
+def _add_article_delta(session: Session, key: Tuple, count: int):
+    deltas = session.info.setdefault(ARTICLE_DELTAS, {})
+    key = _rollup_key(key)
+    deltas[key] = deltas.get(key, 0) + count
+
+
+def _add_research_delta(session: Session, key: Tuple, count: int, fund: Optional[float]):
+    deltas = session.info.setdefault(RESEARCH_DELTAS, {})
+    key = _rollup_key(key)
+    total = deltas.setdefault(key, [0, 0])
+    total[0] += count
+    total[1] += count * int(fund or 0)
+
+
+def _values(obj, attrs: List[str], old: bool) -> List:
+    """Nilai atribut saat ini, atau nilai yang tersimpan di database jika old=True."""
+    state = inspect(obj)
+    values = []
+    for attr in attrs:
+        history = state.attrs[attr].history
+        values.append(history.deleted[0] if old and history.deleted else getattr(obj, attr))
+    return values
+
+
+def _has_changes(obj, attrs: List[str]) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in attrs)
+
+
+def _track_article(session: Session, obj, sign: int, old: bool = False):
+    source, year = _values(obj, ["source", "year"], old)
+    _add_article_delta(session, (source, year), sign)
+
+
+def _track_research(session: Session, obj, sign: int, old: bool = False):
+    fund_source, year, fund = _values(obj, ["fund_source", "year", "fund"], old)
+    _add_research_delta(session, (fund_source, year), sign, fund)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_stats_changes(session, flush_context, instances):
+    # before_flush: baris lama masih ada di database, jadi nilai lama objek yang
+    # sudah expired (mis. setelah commit) masih bisa dimuat. Kolom kunci
+    # dipetakan dengan active_history=True agar nilai lamanya ikut dimuat
+    # saat diubah (lihat models.py).
+    trackers = {Article: (_track_article, ["source", "year"]), Research: (_track_research, ["fund_source", "year", "fund"])}
+
+    for obj in session.new:
+        tracker = trackers.get(type(obj))
+        if tracker:
+            tracker[0](session, obj, 1)
+    for obj in session.deleted:
+        tracker = trackers.get(type(obj))
+        if tracker:
+            tracker[0](session, obj, -1, old=True)
+    for obj in session.dirty:
+        tracker = trackers.get(type(obj))
+        if tracker and _has_changes(obj, tracker[1]):
+            # Pindah kunci (atau dana berubah): kurangi di nilai lama, tambah di nilai baru
+            tracker[0](session, obj, -1, old=True)
+            tracker[0](session, obj, 1)
+
+
+@event.listens_for(Session, "before_commit")
+def _apply_stats_before_commit(session):
+    """
+    Tambahkan selisih per kunci ke tabel ringkasan (count = count + n), tanpa
+    GROUP BY ulang, sehingga penulis bersamaan tidak saling menimpa.
+    """
+    session.flush()
+    article_deltas = session.info.pop(ARTICLE_DELTAS, {})
+    research_deltas = session.info.pop(RESEARCH_DELTAS, {})
+
+    # Urutan kunci tetap agar dua transaksi tidak saling menunggu (deadlock) di MySQL
+    article_rows = [
+        {"source": s, "year": y, "article_count": count}
+        for (s, y), count in sorted(article_deltas.items()) if count
+    ]
+    research_rows = [
+        {"fund_source": s, "year": y, "research_count": count, "fund_total": fund}
+        for (s, y), (count, fund) in sorted(research_deltas.items()) if count or fund
+    ]
+    upsert_increment(session, ArticleSourceYearStat.__table__, article_rows,
+                     keys=["source", "year"], increment_columns=["article_count"])
+    upsert_increment(session, ResearchFundYearStat.__table__, research_rows,
+                     keys=["fund_source", "year"], increment_columns=["research_count", "fund_total"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stats_changes(session):
+    session.info.pop(ARTICLE_DELTAS, None)
+    session.info.pop(RESEARCH_DELTAS, None)
@@ -1,19 +1,23 @@
 from sqlalchemy.orm import Session
 from models import Author, User, Subject, UserSubject
-import requests
+from repository.http_client import http_get
 from bs4 import BeautifulSoup
+from typing import Optional
+from repository.jobs import JobContext
 
 
-# User-Agent agar tidak terdeteksi sebagai bot
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-}
-
-def scrape_all_subjects(db: Session):
+def scrape_all_subjects(db: Session, job: Optional[JobContext] = None):
+    job = job or JobContext()
     authors = db.query(Author).all()
+    job.set_total(len(authors))
     results = []
 
     for author in authors:
+        # Resume: lewati author yang sudah selesai di run sebelumnya
+        if job.is_done(author.id):
+            continue
+        job.check_cancelled()
+
         lecturer_name = get_lecturer_name(db, author.user_id)
         subjects = scrape_subjects_from_profile(author.sinta_profile_url)
 
@@ -33,6 +37,7 @@ def scrape_all_subjects(db: Session):
             "affil_score_total": author.affil_score_total,
             "subjects": subjects
         })
+        job.unit_done(author.id, subjects=len(subjects))
 
     return {
         "success": True,
@@ -72,7 +77,7 @@ def scrape_subjects_from_profile(profile_url: str):
     if not profile_url.startswith("http"):
         profile_url = "https://sinta.kemdikbud.go.id" + profile_url
 
-    response = requests.get(profile_url, headers=HEADERS)
+    response = http_get(profile_url)
 
     subjects = []
     if response.status_code == 200:
@@ -0,0 +1,243 @@
+import asyncio
+import os
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models import SyncState
+from repository.batch_writer import clean_doi, to_int
+from repository.bulk import upsert
+from repository.crawl_engine import crawl_engine
+from repository.http_cache import content_hash
+from repository.sinta_parser import parse_page_count
+
+# Batas halaman profil yang dijalani per author, juga pada full crawl
+SYNC_MAX_PAGES = int(os.getenv("SYNC_MAX_PAGES", "50"))
+# Halaman yang diambil lebih dulu pada sync inkremental; kecil karena biasanya
+# mark sudah tercapai di halaman 1-2
+SYNC_PREFETCH_PAGES = int(os.getenv("SYNC_PREFETCH_PAGES", "2"))
+
+
+@dataclass
+class SyncMark:
+    """Publikasi terbaru yang sudah tersimpan untuk satu author dan sumber."""
+    title: Optional[str] = None
+    doi: Optional[str] = None
+    year: Optional[int] = None
+    page_hash: Optional[str] = None
+
+    def reached(self, paper) -> bool:
+        """
+        True jika `paper` sudah diketahui. Halaman profil SINTA urut dari yang
+        terbaru, jadi begitu mark (judul/DOI) ditemukan sisa halaman tidak
+        perlu dijalani. Jika mark sudah hilang dari profil, crawl berhenti di
+        tahun yang lebih tua dari mark dengan jendela satu tahun, karena
+        publikasi sering terindeks terlambat dengan tahun sebelum mark.
+        """
+        if self.title and paper.title == self.title:
+            return True
+        doi = clean_doi(getattr(paper, "doi", None))
+        if self.doi and doi == self.doi:
+            return True
+        year = to_int(paper.year)
+        return self.year is not None and year is not None and year < self.year - 1
+
+
+@dataclass
+class ProfileWalk:
+    """
+    Satu kali menjalani halaman profil seorang author: mark dari sync
+    sebelumnya sebagai masukan; hash halaman 1 dan status selesai/gagal
+    sebagai keluaran.
+    """
+    mark: Optional[SyncMark] = None
+    page_hash: Optional[str] = None
+    # True jika walk mencapai mark atau halaman terakhir yang sebenarnya;
+    # hanya walk lengkap yang boleh memajukan mark
+    complete: bool = False
+    # Alasan walk berhenti sebelum lengkap (fetch gagal, batas halaman)
+    error: Optional[str] = None
+
+
+def load_marks(db: Session, source: str) -> Dict[int, SyncMark]:
+    rows = db.query(
+        SyncState.author_id, SyncState.last_title, SyncState.last_doi, SyncState.last_year, SyncState.page_hash
+    ).filter(SyncState.source == source)
+    return {author_id: SyncMark(title, doi, year, page_hash) for author_id, title, doi, year, page_hash in rows}
+
+
+def save_mark(db: Session, author_id: int, source: str, walk: ProfileWalk, newest, pages: int, full: bool):
+    """
+    Simpan publikasi terbaru sebagai mark baru; tanpa publikasi baru mark lama
+    dipertahankan. Dipanggil setelah semua halaman walk tersimpan, jadi hash
+    halaman 1 baru dicatat sebagai "sudah tersimpan" setelah commit.
+    """
+    mark = walk.mark
+    if newest is not None:
+        mark = SyncMark(newest.title, clean_doi(getattr(newest, "doi", None)), to_int(newest.year))
+    mark = mark or SyncMark()
+
+    now = datetime.now()
+    row = {
+        "author_id": author_id,
+        "source": source,
+        "last_title": mark.title,
+        "last_doi": mark.doi,
+        "last_year": mark.year,
+        "page_hash": walk.page_hash,
+        "pages_fetched": pages,
+        "synced_at": now,
+        "full_synced_at": now if full else None
+    }
+    update_columns = ["last_title", "last_doi", "last_year", "page_hash", "pages_fetched", "synced_at"]
+    if full:
+        update_columns.append("full_synced_at")
+    upsert(db, SyncState.__table__, [row], keys=["author_id", "source"], update_columns=update_columns)
+    db.commit()
+
+
+def profile_page_url(profile_link: str, view: str, page: int) -> str:
+    return f"{profile_link}?page={page}&view={view}"
+
+
+def _page_items(result, parse: Callable[[bytes], list], previous_titles: Optional[list],
+                walk: Optional[ProfileWalk] = None) -> Optional[list]:
+    """
+    Item di satu halaman, atau None jika crawl harus berhenti di halaman ini:
+    karena profil sudah habis (walk.complete) atau fetch gagal (walk.error).
+    """
+    walk = walk if walk is not None else ProfileWalk()
+    if not result.ok:
+        print(f"❌ Gagal mengambil data dari {result.url}")
+        walk.error = f"Gagal mengambil {result.url}: {result.error or f'HTTP {result.status_code}'}"
+        return None
+    items = parse(result.content)
+    # Halaman kosong, atau SINTA mengulang halaman terakhir untuk nomor di luar jangkauan
+    if not items or [item.title for item in items] == previous_titles:
+        walk.complete = True
+        return None
+    return items
+
+
+def _take_new(items: list, mark: Optional[SyncMark]) -> Tuple[list, bool]:
+    """Item sebelum item pertama yang sudah diketahui, dan apakah mark tercapai."""
+    for index, item in enumerate(items):
+        if mark is not None and mark.reached(item):
+            return items[:index], True
+    return items, False
+
+
+async def iter_profile_pages(
+    profile_link: str,
+    view: str,
+    parse: Callable[[bytes], list],
+    walk: Optional[ProfileWalk] = None,
+    max_pages: int = SYNC_MAX_PAGES
+) -> AsyncIterator[Tuple[int, list]]:
+    """
+    Hasilkan (nomor halaman, publikasi baru) per halaman profil SINTA yang
+    diambil, dari halaman 1 (terbaru); daftarnya bisa kosong. Pemanggil bisa langsung menyimpan tiap halaman
+    tanpa menampung seluruh riwayat publikasi.
+
+    Dengan `walk.mark` (mode inkremental) halaman diambil beberapa sekaligus
+    (SYNC_PREFETCH_PAGES) dan berhenti di publikasi pertama yang sudah
+    diketahui; sisa halaman yang sudah dijadwalkan dibatalkan. Jika halaman 1 sama
+    persis dengan yang tercatat saat sync terakhir tersimpan, tidak ada
+    halaman yang diproses. Hash halaman 1 dicatat di `walk.page_hash`. Tanpa mark (run
+    pertama / full) dan jumlah halaman diketahui dari halaman 1, halaman
+    berikutnya diambil bersamaan (paling banyak concurrency engine sekaligus).
+
+    Setelah iterasi selesai, `walk.complete` menandakan mark atau halaman
+    terakhir tercapai; jika fetch gagal atau batas max_pages tercapai lebih
+    dulu, alasannya ada di `walk.error` dan mark tidak boleh dimajukan.
+    """
+    if not profile_link:
+        return
+    walk = walk if walk is not None else ProfileWalk()
+    mark = walk.mark
+
+    first = await crawl_engine.fetch(profile_page_url(profile_link, view, 1))
+    if first.ok:
+        walk.page_hash = content_hash(first.content)
+        # Bandingkan dengan hash yang disimpan setelah sync terakhir ter-commit,
+        # bukan dengan cache HTTP (cache tidak tahu apakah datanya sudah tersimpan)
+        if mark is not None and mark.page_hash == walk.page_hash:
+            print(f"♻️ Tidak berubah: {first.url}")
+            walk.complete = True
+            yield 1, []
+            return
+
+    page_count = parse_page_count(first.content) if first.ok else None
+    last_page = min(page_count or max_pages, max_pages)
+    window = crawl_engine.concurrency if mark is None and page_count else max(1, SYNC_PREFETCH_PAGES)
+
+    pending = deque()
+    next_page = 2
+    result, page, previous_titles = first, 1, None
+    try:
+        while True:
+            items = _page_items(result, parse, previous_titles, walk)
+            if items is None:
+                return
+            previous_titles = [item.title for item in items]
+
+            new_items, reached = _take_new(items, mark)
+            if reached or (page_count is not None and page >= page_count):
+                walk.complete = True
+            elif page >= last_page:
+                walk.error = f"Berhenti di batas {max_pages} halaman sebelum mark/halaman terakhir"
+            yield page, new_items
+            if page >= last_page or walk.complete:
+                return
+
+            while len(pending) < window and next_page <= last_page:
+                pending.append(asyncio.ensure_future(
+                    crawl_engine.fetch(profile_page_url(profile_link, view, next_page))
+                ))
+                next_page += 1
+            result = await pending.popleft()
+            page += 1
+    finally:
+        # Konsumen berhenti lebih awal: batalkan halaman yang sudah dijadwalkan
+        for future in pending:
+            future.cancel()
+
+
+def iter_profile_pages_sync(
+    profile_link: str,
+    view: str,
+    parse: Callable[[bytes], list],
+    max_pages: int = SYNC_MAX_PAGES
+) -> Iterator[Tuple[int, list]]:
+    """Versi blocking (selalu full crawl) untuk fungsi *_scrapping; halaman diambil paralel per window."""
+    if not profile_link:
+        return
+
+    first = crawl_engine.fetch_sync(profile_page_url(profile_link, view, 1))
+    page_count = parse_page_count(first.content) if first.ok else None
+    last_page = min(page_count or max_pages, max_pages)
+    window = crawl_engine.concurrency if page_count else 1
+
+    buffered = deque()
+    next_page = 2
+    result, page, previous_titles = first, 1, None
+    while True:
+        items = _page_items(result, parse, previous_titles)
+        if items is None:
+            return
+        previous_titles = [item.title for item in items]
+        yield page, items
+        if page >= last_page:
+            return
+
+        if not buffered:
+            pages = range(next_page, min(next_page + window, last_page + 1))
+            buffered.extend(crawl_engine.fetch_many_sync(
+                [profile_page_url(profile_link, view, number) for number in pages]
+            ))
+            next_page = pages.stop
+        result = buffered.popleft()
+        page += 1
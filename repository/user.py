@@ -1,6 +1,54 @@
+from typing import Optional
+from sqlalchemy import and_, exists, select, true
 from sqlalchemy.orm import Session
-from models import User, Author
+from models import User, Author, UserNameToken, write_user_name_tokens
 from schemas import UserCreate, AuthorCreate
+from search.text import NAME_PREFIX_MIN_LENGTH, name_tokens
+
+
+def user_name_filter(name: str):
+    """
+    Pengganti User.name ILIKE '%name%' yang bisa memakai index.
+    Setiap kata pada name harus menjadi awalan salah satu token nama user,
+    dicari lewat index (token, user_id) di tabel user_name_tokens. Kata yang
+    lebih pendek dari NAME_PREFIX_MIN_LENGTH harus sama persis dengan token.
+    Berbeda dengan ILIKE, potongan di tengah kata tidak lagi cocok.
+    """
+    clauses = [
+        User.id.in_(
+            select(UserNameToken.user_id).where(
+                UserNameToken.token.like(f"{token}%") if len(token) >= NAME_PREFIX_MIN_LENGTH
+                else UserNameToken.token == token
+            )
+        )
+        for token in name_tokens(name)
+    ]
+    return and_(*clauses) if clauses else true()
+
+
+def find_user_by_name(db: Session, name: str) -> Optional[User]:
+    return db.query(User).filter(user_name_filter(name)).first()
+
+
+def backfill_user_name_tokens(db: Session) -> int:
+    """
+    Isi token nama untuk user lama yang belum punya (mis. database sebelum
+    tabel token ada). Langkah migrasi satu kali (`python -m migrate
+    name-tokens`); user baru diberi token oleh event after_insert/update.
+    User tanpa nama tidak punya token, jadi tidak dipilih.
+    """
+    missing = db.query(User.id, User.name).filter(
+        User.name.isnot(None),
+        User.name != "",
+        ~exists().where(UserNameToken.user_id == User.id)
+    ).all()
+
+    connection = db.connection()
+    for user_id, name in missing:
+        write_user_name_tokens(connection, user_id, name)
+    db.commit()
+    return len(missing)
+
 
 def create_user_and_author(user_data: UserCreate, author_data: AuthorCreate, db: Session):
     new_user = User(name=user_data.name)
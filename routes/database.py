@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Depends
 from database import get_db
 from fastapi import Depends, HTTPException
-from database import Base, engine
+from database import Base, engine, async_engine, create_missing_indexes, SessionLocal, get_pool_status
+from repository.stats_rollup import rebuild_stats
+from repository.user import backfill_user_name_tokens
+from services.cache import invalidate_cache
+from repository.http_cache import http_cache
 
 router = APIRouter(
     tags=['Database']
@@ -13,6 +17,59 @@ def reset_all():
     try:
         Base.metadata.drop_all(bind=engine)
         Base.metadata.create_all(bind=engine)
+        invalidate_cache()
         return {"message": "Database reset: structure and data cleared."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/migrate/indexes")
+def migrate_indexes():
+    try:
+        created = create_missing_indexes(bind=engine)
+        return {"message": f"{len(created)} index dibuat.", "created": created}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/migrate/name-tokens")
+def migrate_name_tokens():
+    try:
+        with SessionLocal() as db:
+            count = backfill_user_name_tokens(db)
+        return {"message": f"Token nama dibuat untuk {count} user."}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stats/rebuild")
+def rebuild_stats_rollup():
+    try:
+        with SessionLocal() as db:
+            rebuild_stats(db)
+        invalidate_cache()
+        return {"message": "Tabel ringkasan statistik dibangun ulang."}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/metrics/db-pool")
+def db_pool_metrics():
+    return {
+        **get_pool_status(bind=engine),
+        "async": get_pool_status(bind=async_engine.sync_engine)
+    }
+
+
+@router.get("/metrics/http-cache")
+def http_cache_metrics():
+    if http_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **http_cache.stats()}
+
+
+@router.post("/http-cache/clear")
+def clear_http_cache():
+    # Sync berikutnya mengambil dan mem-parse ulang semua halaman
+    removed = http_cache.clear() if http_cache else 0
+    return {"message": f"{removed} halaman dihapus dari cache."}
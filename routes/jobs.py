@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends, Query, Body
+from sqlalchemy.orm import Session
+from typing import Optional, Dict, Any, Literal
+from database import get_db
+from models import Job
+from schemas import StandardResponse, JobResponse
+from repository.jobs import HANDLERS, submit_job, get_job, cancel_job, resume_job
+
+router = APIRouter(
+    tags=['Background Jobs']
+)
+
+
+def job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        params=job.params,
+        total_units=job.total_units,
+        completed_count=job.completed_count or 0,
+        error_count=job.error_count or 0,
+        counters=job.counters,
+        errors=job.errors,
+        result=job.result,
+        cancel_requested=bool(job.cancel_requested),
+        owner=job.owner,
+        heartbeat_at=job.heartbeat_at,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
+
+@router.get("/jobs", response_model=StandardResponse)
+def list_jobs(
+    status: Optional[Literal["pending", "running", "completed", "failed", "cancelled"]] = Query(None),
+    kind: Optional[str] = Query(None, description="Filter jenis job, mis. sync_garuda"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    query = db.query(Job)
+    if status:
+        query = query.filter(Job.status == status)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    jobs = query.order_by(Job.id.desc()).limit(limit).all()
+
+    return StandardResponse(
+        success=True,
+        message="Daftar job berhasil diambil.",
+        data={
+            "kinds": sorted(HANDLERS),
+            "jobs": [job_response(job) for job in jobs]
+        }
+    )
+
+
+@router.post("/jobs/{kind}", response_model=StandardResponse)
+def create_job(
+    kind: str,
+    params: Optional[Dict[str, Any]] = Body(None),
+    db: Session = Depends(get_db)
+):
+    job = submit_job(db, kind, params)
+    return StandardResponse(success=True, message=f"Job {kind} dijadwalkan.", data=job_response(job))
+
+
+@router.get("/jobs/{job_id}", response_model=StandardResponse)
+def get_job_status(job_id: int, db: Session = Depends(get_db)):
+    return StandardResponse(success=True, message="Status job berhasil diambil.", data=job_response(get_job(db, job_id)))
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=StandardResponse)
+def cancel_job_route(job_id: int, db: Session = Depends(get_db)):
+    job = cancel_job(db, job_id)
+    return StandardResponse(success=True, message="Pembatalan job diminta.", data=job_response(job))
+
+
+@router.post("/jobs/{job_id}/resume", response_model=StandardResponse)
+def resume_job_route(job_id: int, db: Session = Depends(get_db)):
+    job = resume_job(db, job_id)
+    return StandardResponse(success=True, message="Job dilanjutkan dari unit terakhir yang selesai.", data=job_response(job))
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
 from sqlalchemy.orm import Session
 import pandas as pd
 from io import StringIO
 from difflib import get_close_matches
 from database import get_db
+from services.cache import invalidate_cache
+from repository.jobs import job_handler, submit_job, job_accepted, JobContext
+from repository.lecturer_sync import sync_lecturers
+from repository.ingest import upload_frames
 from models import User, Author, Article, PublicationAuthor
 from repository.scholar_abstract_crawl import scholar_scrapping,scholar_data, scholar_sync
 import re
-import unicodedata
+from search.text import normalize
 from sqlalchemy import and_
 
 router = APIRouter(
@@ -23,43 +27,27 @@ def generate_initials(name: str) -> str:
     return f"{initials} {last_name}"
 
 
-@router.get("/sync/scholar")
-async def sync_scholar(db: Session = Depends(get_db)):
-    results = []
-
-    # Mengambil data dosen dari database
-    lecturers = db.query(User.name, Author.sinta_profile_url).select_from(User).join(Author).all()
-    print(f"Jumlah dosen: {len(lecturers)}")
-
-    for lecturer_name, profile_link in lecturers:
-        if profile_link:
-            print(f"Memproses dosen: {lecturer_name}")
+@job_handler("sync_scholar")
+async def sync_scholar_job(db: Session, job: JobContext, full: bool = False):
+    total_saved = await sync_lecturers(db, scholar_sync, scholar_data, job, source="GOOGLE_SCHOLAR", full=full)
+    return {"total_saved": total_saved}
 
-            scraped_data = scholar_sync(lecturer_name, profile_link)
-            print(f"Jumlah data yang di-scrape: {len(scraped_data)}")
 
-            scholar_data(scraped_data, db)
+@router.get("/sync/scholar")
+async def sync_scholar(
+    inline: bool = Query(False, description="true = jalankan langsung dan tunggu hasilnya; default dijadwalkan sebagai job (202 + job_id)"),
+    full: bool = Query(False, description="true = crawl ulang semua halaman profil, abaikan high-water mark"),
+    db: Session = Depends(get_db)
+):
+    if not inline:
+        return job_accepted(submit_job(db, "sync_scholar", {"full": full}))
 
-            results.extend(scraped_data)
+    await sync_lecturers(db, scholar_sync, scholar_data, source="GOOGLE_SCHOLAR", full=full)
 
+    invalidate_cache()
     return {"message": "Sync Data Article Google Scholar Selesai"}
 
 
-def normalize(text: str) -> str:
-    # Ubah ke huruf kecil
-    text = text.lower()
-
-    # Hilangkan accent/diakritik (contoh: é -> e)
-    text = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('utf-8')
-
-    # Hilangkan karakter non-alfabet dan angka (kecuali spasi)
-    text = re.sub(r'[^a-z0-9\s]', '', text)
-
-    # Hilangkan spasi berlebih
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    return text
-
 @router.post("/upload/google-scholar")
 async def upload_google_scholar_single_file(
     file: UploadFile = File(...),
@@ -69,11 +57,7 @@ async def upload_google_scholar_single_file(
         return {"error": "Format file harus Excel (.xls/.xlsx) atau CSV"}
 
     try:
-        contents = await file.read()
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(StringIO(contents.decode('utf-8')))
-        else:
-            df = pd.read_excel(BytesIO(contents))
+        frames = upload_frames(file)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Gagal membaca file: {str(e)}")
 
@@ -81,80 +65,83 @@ async def upload_google_scholar_single_file(
     skipped_count = 0
     already_exist = 0
 
-    for _, row in df.iterrows():
-        user_id = str(row.get("User ID", "")).strip()
-        title = str(row.get("Judul", "")).strip()
-        publisher_link = str(row.get("Publisher Link", "")).strip()
-        paper_link = str(row.get("Paper Link", "")).strip()
-        url = publisher_link if publisher_link else paper_link
-        journal = str(row.get("Kategori Jurnal", "")).strip()
-        year = str(row.get("Tahun", "")).strip()
-        cited = str(row.get("Cited", "")).strip()
-        authors_raw = str(row.get("Author", "")).replace("Authors :", "").strip()
-        abstract = str(row.get("Abstract", "")).strip() if "Abstract" in df.columns else None
-        doi = str(row.get("DOI", "")).strip() if "DOI" in df.columns else None
-
-        # Cari Author
-        authors_list = [a.strip() for a in authors_raw.split(',') if a.strip() and "..." not in a]
-        author = db.query(Author).filter(Author.sinta_id == user_id).first()
-        if not author or not author.user:
-            skipped_count += 1
-            continue
-
-        user = author.user
-        expected_initial = generate_initials(user.name)
-
-        author_order = None
-        for idx, name in enumerate(authors_list):
-            if name.lower() == expected_initial.lower():
-                author_order = idx + 1
-                break
-
-        if author_order is None:
-            lecturer_keywords = [kw for kw in user.name.lower().split() if len(kw) > 2]
+    # File dibaca per chunk agar memori tidak sebanding ukuran file
+    for df in frames:
+        for _, row in df.iterrows():
+            user_id = str(row.get("User ID", "")).strip()
+            title = str(row.get("Judul", "")).strip()
+            publisher_link = str(row.get("Publisher Link", "")).strip()
+            paper_link = str(row.get("Paper Link", "")).strip()
+            url = publisher_link if publisher_link else paper_link
+            journal = str(row.get("Kategori Jurnal", "")).strip()
+            year = str(row.get("Tahun", "")).strip()
+            cited = str(row.get("Cited", "")).strip()
+            authors_raw = str(row.get("Author", "")).replace("Authors :", "").strip()
+            abstract = str(row.get("Abstract", "")).strip() if "Abstract" in df.columns else None
+            doi = str(row.get("DOI", "")).strip() if "DOI" in df.columns else None
+
+            # Cari Author
+            authors_list = [a.strip() for a in authors_raw.split(',') if a.strip() and "..." not in a]
+            author = db.query(Author).filter(Author.sinta_id == user_id).first()
+            if not author or not author.user:
+                skipped_count += 1
+                continue
+
+            user = author.user
+            expected_initial = generate_initials(user.name)
+
+            author_order = None
             for idx, name in enumerate(authors_list):
-                if any(kw in name.lower() for kw in lecturer_keywords):
+                if name.lower() == expected_initial.lower():
                     author_order = idx + 1
                     break
 
-        if author_order is None:
-            skipped_count += 1
-            continue
-
-        # Cek duplikat berdasarkan judul + source
-        existing = db.query(Article).filter(and_(
-            Article.title == title,
-            Article.source == "GOOGLE_SCHOLAR"
-        )).first()
-        if existing:
-            already_exist += 1
-            continue
-
-        # Tambahkan artikel baru
-        article = Article(
-            title=title,
-            year=int(year) if year.isdigit() else None,
-            article_url=url,
-            journal=journal,
-            source="GOOGLE_SCHOLAR",
-            citation_count=int(cited) if cited.isdigit() else None,
-            abstract=abstract if abstract else None,
-            doi=doi if doi else None
-        )
-        db.add(article)
-        db.commit()
-        db.refresh(article)
-
-        # Tambahkan relasi penulis
-        db.add(PublicationAuthor(
-            article_id=article.id,
-            author_id=author.id,
-            author_order=author_order
-        ))
-        db.commit()
-
-        inserted_count += 1
-
+            if author_order is None:
+                lecturer_keywords = [kw for kw in user.name.lower().split() if len(kw) > 2]
+                for idx, name in enumerate(authors_list):
+                    if any(kw in name.lower() for kw in lecturer_keywords):
+                        author_order = idx + 1
+                        break
+
+            if author_order is None:
+                skipped_count += 1
+                continue
+
+            # Cek duplikat berdasarkan judul + source
+            existing = db.query(Article).filter(and_(
+                Article.title == title,
+                Article.source == "GOOGLE_SCHOLAR"
+            )).first()
+            if existing:
+                already_exist += 1
+                continue
+
+            # Tambahkan artikel baru
+            article = Article(
+                title=title,
+                year=int(year) if year.isdigit() else None,
+                article_url=url,
+                journal=journal,
+                source="GOOGLE_SCHOLAR",
+                citation_count=int(cited) if cited.isdigit() else None,
+                abstract=abstract if abstract else None,
+                doi=doi if doi else None
+            )
+            db.add(article)
+            db.commit()
+            db.refresh(article)
+
+            # Tambahkan relasi penulis
+            db.add(PublicationAuthor(
+                article_id=article.id,
+                author_id=author.id,
+                author_order=author_order
+            ))
+            db.commit()
+
+            inserted_count += 1
+
+    invalidate_cache()
     return {
         "success": True,
         "inserted_articles": inserted_count,
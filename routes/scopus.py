@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session
 from database import get_db
+from services.cache import invalidate_cache
+from repository.jobs import job_handler, submit_job, job_accepted, JobContext
+from repository.lecturer_sync import sync_lecturers
+from repository.ingest import ingest_scopus_articles, upload_frames
 from models import User, Author, Article
 from repository.scopus_abstract_crawl import scopus_scrapping,scopus_data, scopus_sync
 import pandas as pd
@@ -15,7 +19,7 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
 import undetected_chromedriver as uc
 from fake_useragent import UserAgent
-import unicodedata
+from search.text import normalize
 from selenium.webdriver.support import expected_conditions as EC
 from models import PublicationAuthor
 from sqlalchemy import and_
@@ -25,122 +29,43 @@ router = APIRouter(
     tags=['Scopus Data']
 )
 
-@router.get("/sync/scopus")
-async def sync_scopus(db: Session = Depends(get_db)):
-    results = []
-
-    # Mengambil data dosen dari database
-    lecturers = db.query(User.name, Author.sinta_profile_url).select_from(User).join(Author).all()
-    print(f"Jumlah dosen: {len(lecturers)}")
-
-    for lecturer_name, profile_link in lecturers:
-        if profile_link:
-            print(f"Memproses dosen: {lecturer_name}")
+@job_handler("sync_scopus")
+async def sync_scopus_job(db: Session, job: JobContext, full: bool = False):
+    total_saved = await sync_lecturers(db, scopus_sync, scopus_data, job, source="SCOPUS", full=full)
+    return {"total_saved": total_saved}
 
-            scraped_data = scopus_sync(lecturer_name, profile_link)
-            print(f"Jumlah data yang di-scrape: {len(scraped_data)}")
 
-            scopus_data(scraped_data, db)
+@router.get("/sync/scopus")
+async def sync_scopus(
+    inline: bool = Query(False, description="true = jalankan langsung dan tunggu hasilnya; default dijadwalkan sebagai job (202 + job_id)"),
+    full: bool = Query(False, description="true = crawl ulang semua halaman profil, abaikan high-water mark"),
+    db: Session = Depends(get_db)
+):
+    if not inline:
+        return job_accepted(submit_job(db, "sync_scopus", {"full": full}))
 
-            results.extend(scraped_data)
+    await sync_lecturers(db, scopus_sync, scopus_data, source="SCOPUS", full=full)
 
+    invalidate_cache()
     return {"message": "Scraping Scopus selesai dan data telah disimpan ke database!"}
 
 
-
-def normalize(text: str) -> str:
-    # Ubah ke huruf kecil
-    text = text.lower()
-
-    # Hilangkan accent/diakritik (contoh: é -> e)
-    text = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('utf-8')
-
-    # Hilangkan karakter non-alfabet dan angka (kecuali spasi)
-    text = re.sub(r'[^a-z0-9\s]', '', text)
-
-    # Hilangkan spasi berlebih
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    return text
-
 @router.post("/upload/scopus")
 async def upload_scopus(file: UploadFile = File(...), db: Session = Depends(get_db)):
     if not file.filename.endswith(('.xls', '.xlsx', '.csv')):
         return {"error": "Format file harus Excel (.xls/.xlsx) atau CSV"}
 
-    df = pd.read_csv(file.file) if file.filename.endswith('.csv') else pd.read_excel(file.file)
-    inserted_articles = 0
-    inserted_relations = 0
-    skipped_relations = 0
-
-    for _, row in df.iterrows():
-        sinta_id = str(row.get("User ID", "")).strip()
-        title = str(row.get("Title", "")).strip()
-        accred = str(row.get("Accred", "")).strip()
-        journal = str(row.get("Jurnal", "")).strip()
-        year = str(row.get("Year", "")).strip()
-        cited = str(row.get("Cited", "")).strip()
-        author_order = row.get("Order", None)
-        abstract = str(row.get("Abstract", "")).strip()
-        article_url = str(row.get("Publisher Link", "")).strip()
-        doi = str(row.get("DOI", "")).strip()
-
-        # Validasi
-        if not title or not sinta_id:
-            continue
-
-        # Cari author
-        author = db.query(Author).filter(Author.sinta_id == sinta_id).first()
-        if not author:
-            continue
-
-        # Cek apakah artikel sudah ada berdasarkan title + source
-        article = db.query(Article).filter(
-            and_(Article.title == title)
-        ).first()
-
-        if not article:
-            # Artikel belum ada → simpan
-            article = Article(
-                title=title,
-                year=int(year) if year.isdigit() else None,
-                accred=accred,
-                journal=journal,
-                source="SCOPUS",
-                citation_count=int(cited) if cited.isdigit() else None,
-                abstract=abstract,
-                article_url=article_url,
-                doi=doi
-            )
-            db.add(article)
-            db.commit()
-            db.refresh(article)
-            inserted_articles += 1
-
-        # Cek apakah relasi author-article sudah ada
-        existing_relation = db.query(PublicationAuthor).filter_by(
-            article_id=article.id,
-            author_id=author.id
-        ).first()
-
-        if not existing_relation:
-            # Simpan relasi baru
-            pub_author = PublicationAuthor(
-                article_id=article.id,
-                author_id=author.id,
-                author_order=int(author_order) if pd.notna(author_order) and str(author_order).isdigit() else None
-            )
-            db.add(pub_author)
-            db.commit()
-            inserted_relations += 1
-        else:
-            skipped_relations += 1
+    result = ingest_scopus_articles(db, upload_frames(file))
+    inserted_articles = result["inserted_articles"]
+    inserted_relations = result["inserted_relations"]
 
+    invalidate_cache()
     return {
         "success": True,
         "inserted_articles": inserted_articles,
         "inserted_relations": inserted_relations,
-        "skipped_relations": skipped_relations,
-        "message": f"{inserted_articles} artikel baru ditambahkan, {inserted_relations} relasi author-artikel baru dimasukkan."
+        "skipped_relations": result["skipped_relations"],
+        "message": f"{inserted_articles} artikel baru ditambahkan, {inserted_relations} relasi author-artikel baru dimasukkan.",
+        "chunks": result["chunks"]
     }
 
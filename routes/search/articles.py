@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, Query, Path
 from schemas import  StandardResponse
-from typing import Optional
-from sqlalchemy.orm import Session
-from database import get_db
+from typing import Optional, Literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, run_in_sync_session
 from sqlalchemy import func, case
 from fastapi import Query
 from services.article_services import get_all_articles_service, search_articles_by_authors_service, search_articles_by_title_service, get_article_detail_service
@@ -15,23 +15,27 @@ router = APIRouter(
 
 
 @router.get("/articles", response_model=StandardResponse)
-def get_all_articles_route(
+async def get_all_articles_route(
     source: Optional[str] = Query(None, description="Filter by source: SCOPUS, SINTA"),
     min_year: Optional[int] = Query(None, description="Minimum year"),
     max_year: Optional[int] = Query(None, description="Maximum year"),
     sort_by_citation: bool = Query(False, description="Sort by citation_count descending"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor dari halaman sebelumnya (page diabaikan)"),
+    include_total: bool = Query(True, description="false = lewati COUNT, total bernilai null"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    result = get_all_articles_service(
-        db=db,
+    result = await db.run_sync(
+        get_all_articles_service,
         source=source,
         min_year=min_year,
         max_year=max_year,
         sort_by_citation=sort_by_citation,
         page=page,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total
     )
 
     return StandardResponse(
@@ -42,7 +46,7 @@ def get_all_articles_route(
 
 
 @router.get("/search/articles/authors", response_model=StandardResponse)
-def search_articles_by_authors(
+async def search_articles_by_authors(
     name: str = Query(..., description="Author name to search"),
     source: str = Query(None, description="Filter by source: SCOPUS, SINTA"),
     min_year: int = Query(None),
@@ -50,9 +54,9 @@ def search_articles_by_authors(
     sort_by_citation: bool = Query(False),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    data = search_articles_by_authors_service(
+    data = await db.run_sync(lambda session: search_articles_by_authors_service(
         name=name,
         source=source,
         min_year=min_year,
@@ -60,8 +64,8 @@ def search_articles_by_authors(
         sort_by_citation=sort_by_citation,
         page=page,
         limit=limit,
-        db=db
-    )
+        db=session
+    ))
     return StandardResponse(
         success=True, 
         message=f"Articles for '{name}' fetched successfully", 
@@ -70,19 +74,27 @@ def search_articles_by_authors(
 
 
 @router.get("/search/articles/title", response_model=StandardResponse)
-def search_articles_by_title(
+async def search_articles_by_title(
     title: str = Query(..., description="Judul artikel yang ingin dicari"),
     source: Optional[str] = Query(None, description="Filter by source: SCOPUS, SINTA"),
     min_year: Optional[int] = Query(None),
     max_year: Optional[int] = Query(None),
     sort_by_citation: Optional[bool] = Query(False, description="Urutkan berdasarkan jumlah sitasi"),
+    mode: Literal["like", "fulltext", "index"] = Query("like", description="like: substring judul, fulltext: FULLTEXT index MySQL, index: inverted index in-memory (BM25)"),
+    include_abstract: bool = Query(False, description="Ikut cari di abstract"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    total, articles = search_articles_by_title_service(
-        title, source, min_year, max_year, sort_by_citation, page, limit, db
+    search = lambda session: search_articles_by_title_service(
+        title, source, min_year, max_year, sort_by_citation, page, limit, session,
+        mode=mode, include_abstract=include_abstract
     )
+    # Mode index bisa membangun inverted index (CPU): jalankan di threadpool, bukan di event loop
+    if mode == "index":
+        total, articles = await run_in_sync_session(search)
+    else:
+        total, articles = await db.run_sync(search)
 
     return StandardResponse(
         success=True,
@@ -97,11 +109,11 @@ def search_articles_by_title(
 
 
 @router.get("/articles/{article_id}", response_model=StandardResponse)
-def get_article_detail(
+async def get_article_detail(
     article_id: int = Path(..., description="ID artikel publikasi"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    response_data = get_article_detail_service(article_id, db)
+    response_data = await db.run_sync(lambda session: get_article_detail_service(article_id, session))
     return StandardResponse(
         success=True,
         message="Detail artikel berhasil diambil.",
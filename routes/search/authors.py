@@ -3,8 +3,10 @@ from schemas import AuthorDetailResponse, ArticleResponse, ResearchResponse, Art
 from repository.author_crawl import get_top_authors
 from models import Author, User, PublicationAuthor, ResearcherAuthor
 from sqlalchemy.orm import Session
-from database import get_db
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from services.cache import cached
+from sqlalchemy import func, select
 from schemas import StandardResponse
 from fastapi import Query
 
@@ -19,12 +21,13 @@ def paginate_query(query, page: int, limit: int):
     return query.offset((page - 1) * limit).limit(limit).all()
 
 @router.get("/stats/top-authors/articles")
-def get_top_authors_articles(
+@cached()
+async def get_top_authors_articles(
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    results = (
-        db.query(
+    results = (await db.execute(
+        select(
             Author.id.label("author_id"),
             User.name.label("name"),
             User.npp.label("npp"),
@@ -35,8 +38,7 @@ def get_top_authors_articles(
         .group_by(Author.id, User.name, User.npp)
         .order_by(func.count(PublicationAuthor.article_id).desc())
         .limit(limit)
-        .all()
-    )
+    )).all()
 
     data = []
     for idx, r in enumerate(results, start=1):
@@ -56,12 +58,13 @@ def get_top_authors_articles(
     }
 
 @router.get("/stats/top-authors/researches")
-def get_top_authors_researches(
+@cached()
+async def get_top_authors_researches(
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    results = (
-        db.query(
+    results = (await db.execute(
+        select(
             Author.id.label("author_id"),
             User.name.label("name"),
             User.npp.label("npp"),
@@ -72,8 +75,7 @@ def get_top_authors_researches(
         .group_by(Author.id, User.name, User.npp)
         .order_by(func.count(ResearcherAuthor.researcher_id).desc())
         .limit(limit)
-        .all()
-    )
+    )).all()
 
     data = []
     for idx, r in enumerate(results, start=1):
@@ -95,14 +97,28 @@ def get_top_authors_researches(
 
 
 @router.get("/authors/{author_id}", response_model=StandardResponse)
-def get_author_detail(
+async def get_author_detail(
     author_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     article_page: int = Query(1, ge=1),
     article_limit: int = Query(10, ge=1, le=100),
     research_page: int = Query(1, ge=1),
     research_limit: int = Query(10, ge=1, le=100)
 ):
+    # Relasi author dimuat lazy, jadi jalankan di dalam run_sync
+    return await db.run_sync(
+        author_detail, author_id, article_page, article_limit, research_page, research_limit
+    )
+
+
+def author_detail(
+    db: Session,
+    author_id: int,
+    article_page: int,
+    article_limit: int,
+    research_page: int,
+    research_limit: int
+) -> StandardResponse:
     author = db.query(Author).filter(Author.id == author_id).first()
     if not author:
         return StandardResponse(success=False, message="Author not found", data=None)
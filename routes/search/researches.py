@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Query
 from typing import Optional, Literal
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, run_in_sync_session
 from sqlalchemy import func, case
 from schemas import StandardResponse
 from fastapi import Query
@@ -14,7 +14,7 @@ router = APIRouter(
 
 
 @router.get("/researches", response_model=StandardResponse)
-def get_all_researches(
+async def get_all_researches(
     min_year: Optional[int] = Query(None, description="Tahun minimal"),
     max_year: Optional[int] = Query(None, description="Tahun maksimal"),
     termahal: bool = Query(False, description="Urutkan berdasarkan dana terbanyak"),
@@ -23,16 +23,20 @@ def get_all_researches(
     ] = Query(None, description="Sumber dana penelitian"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor dari halaman sebelumnya (page diabaikan)"),
+    include_total: bool = Query(True, description="false = lewati COUNT, total bernilai null"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    data = get_all_researches_service(
-        db=db,
+    data = await db.run_sync(
+        get_all_researches_service,
         min_year=min_year,
         max_year=max_year,
         termahal=termahal,
         fund_source=fund_source,
         page=page,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total
     )
 
     return StandardResponse(
@@ -43,7 +47,7 @@ def get_all_researches(
 
 
 @router.get("/search/researches/authors", response_model=StandardResponse)
-def search_researches_by_authors(
+async def search_researches_by_authors(
     name: str = Query(..., description="Author name to search"),
     min_year: Optional[int] = Query(None, description="Minimum year"),
     max_year: Optional[int] = Query(None, description="Maximum year"),
@@ -53,10 +57,10 @@ def search_researches_by_authors(
     termahal: bool = Query(False, description="Sort by highest fund"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return search_researches_by_authors_service(
-        db=db,
+    return await db.run_sync(
+        search_researches_by_authors_service,
         name=name,
         min_year=min_year,
         max_year=max_year,
@@ -68,7 +72,7 @@ def search_researches_by_authors(
 
 
 @router.get("/search/researches/title", response_model=StandardResponse)
-def search_researches_by_title(
+async def search_researches_by_title(
     title: str = Query(..., description="Judul penelitian yang ingin dicari"),
     min_year: Optional[int] = Query(None, description="Tahun minimal"),
     max_year: Optional[int] = Query(None, description="Tahun maksimal"),
@@ -76,17 +80,21 @@ def search_researches_by_title(
         Literal["INTERNAL_SOURCE", "BIMA_SOURCE", "SIMLITABMAS_SOURCE"]
     ] = Query(None, description="Filter berdasarkan sumber pendanaan"),
     termahal: bool = Query(False, description="Urutkan berdasarkan dana terbanyak"),
+    mode: Literal["like", "fulltext", "index"] = Query("like", description="like: substring judul, fulltext: FULLTEXT index MySQL, index: inverted index in-memory (BM25)"),
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    return search_researches_by_title_service(
-        db=db,
+    # Mode index bisa membangun inverted index (CPU): jalankan di threadpool, bukan di event loop
+    run = run_in_sync_session if mode == "index" else db.run_sync
+    return await run(
+        search_researches_by_title_service,
         title=title,
         min_year=min_year,
         max_year=max_year,
         fund_source=fund_source,
         termahal=termahal,
         page=page,
-        limit=limit
+        limit=limit,
+        mode=mode
     )
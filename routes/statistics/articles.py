@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from models import  Article
-from database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import ArticleSourceYearStat
+from database import get_async_db
+from services.cache import cached
 from schemas import StandardResponse  # pastikan diimport
-from sqlalchemy import func
 from datetime import datetime
 
 router = APIRouter()
@@ -12,25 +13,29 @@ router = APIRouter(
 )
 
 @router.get("/stats/articles/source", response_model=StandardResponse)
-def get_article_stats_by_source(
+@cached()
+async def get_article_stats_by_source(
     year_range: int = Query(6, ge=1, le=10, description="Rentang tahun ke belakang (default: 6 tahun)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     current_year = datetime.now().year
     start_year = current_year - year_range + 1
     sources = ["SCOPUS", "SINTA"]
     result = {}
 
+    # Satu query ke tabel ringkasan untuk semua sumber dan tahun
+    rows = (await db.execute(
+        select(ArticleSourceYearStat.source, ArticleSourceYearStat.year, ArticleSourceYearStat.article_count)
+        .where(ArticleSourceYearStat.year >= start_year, ArticleSourceYearStat.year <= current_year)
+    )).all()
+
     for source in sources:
-        yearly_data = {}
+        yearly_data = {str(year): 0 for year in range(current_year, start_year - 1, -1)}
 
-        for year in range(current_year, start_year - 1, -1):
-            count = (
-                db.query(func.count(Article.id))
-                .filter(Article.source.ilike(f"%{source}%"), Article.year == year)
-                .scalar()
-            )
-            yearly_data[str(year)] = count or 0
+        # Sama dengan filter ilike '%SOURCE%' sebelumnya
+        for row_source, year, count in rows:
+            if source in row_source.upper():
+                yearly_data[str(year)] += count
 
         result[source] = yearly_data
 
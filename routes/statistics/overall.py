@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from models import Author, Article, Research, PublicationAuthor, ResearcherAuthor
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Author, PublicationAuthor, ResearcherAuthor, ArticleSourceYearStat, ResearchFundYearStat
+from database import get_async_db
+from services.cache import cached
 from schemas import StandardResponse  # pastikan diimport
-from sqlalchemy import func
+from sqlalchemy import func, select
 from datetime import datetime
 
 router = APIRouter(
@@ -12,13 +13,22 @@ router = APIRouter(
 
 
 @router.get("/stats/summary", response_model=StandardResponse)
-def get_summary_counts(db: Session = Depends(get_db)):
-    total_authors = db.query(Author).count()
-    total_articles = db.query(Article).count()
-    total_researches = db.query(Research).count()
+@cached()
+async def get_summary_counts(db: AsyncSession = Depends(get_async_db)):
+    # Satu query: total artikel/penelitian dari tabel ringkasan, sisanya subquery COUNT
+    counts = (await db.execute(select(
+        select(func.count(Author.id)).scalar_subquery().label("total_authors"),
+        select(func.coalesce(func.sum(ArticleSourceYearStat.article_count), 0)).scalar_subquery().label("total_articles"),
+        select(func.coalesce(func.sum(ResearchFundYearStat.research_count), 0)).scalar_subquery().label("total_researches"),
+        select(func.count(func.distinct(PublicationAuthor.author_id))).scalar_subquery().label("total_article_authors"),
+        select(func.count(func.distinct(ResearcherAuthor.author_id))).scalar_subquery().label("total_research_authors")
+    ))).one()
 
-    total_article_authors = db.query(PublicationAuthor.author_id).distinct().count()
-    total_research_authors = db.query(ResearcherAuthor.author_id).distinct().count()
+    total_authors = counts.total_authors
+    total_articles = int(counts.total_articles)
+    total_researches = int(counts.total_researches)
+    total_article_authors = counts.total_article_authors
+    total_research_authors = counts.total_research_authors
 
     return StandardResponse(
         success=True,
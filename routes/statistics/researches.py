@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from models import Author, Article, Research
-from database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import ResearchFundYearStat
+from database import get_async_db
+from services.cache import cached
 from schemas import StandardResponse  # pastikan diimport
-from sqlalchemy import func
 from datetime import datetime
 from collections import defaultdict
 
@@ -14,9 +15,10 @@ router = APIRouter(
 
 
 @router.get("/stats/research/fund", response_model=StandardResponse)
-def get_fund_statistics(
+@cached()
+async def get_fund_statistics(
     year_range: int = Query(6, ge=0, le=10, description="Filter jumlah tahun terakhir (0 = semua tahun)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     sources = ["BIMA_SOURCE", "INTERNAL_SOURCE", "SIMLITABMAS_SOURCE"]
     current_year = datetime.now().year
@@ -26,27 +28,28 @@ def get_fund_statistics(
     stats = {source: {} for source in sources}
     total_all_fund = 0
 
+    # Satu query ke tabel ringkasan; year 0 = penelitian tanpa tahun
+    query = select(
+        ResearchFundYearStat.fund_source,
+        ResearchFundYearStat.year,
+        ResearchFundYearStat.fund_total
+    ).where(ResearchFundYearStat.year > 0, ResearchFundYearStat.research_count > 0)
+    if min_year:
+        query = query.where(ResearchFundYearStat.year >= min_year, ResearchFundYearStat.year <= current_year)
+    rows = (await db.execute(query)).all()
+
+    funds = {(fund_source, year): fund_total for fund_source, year, fund_total in rows}
+
     # Tahun yang akan digunakan
     years = (
         list(range(min_year, current_year + 1))
         if min_year else
-        db.query(Research.year).distinct().filter(Research.year.isnot(None)).order_by(Research.year).all()
+        sorted({year for _, year, _ in rows})
     )
 
-    if not isinstance(years[0], int):
-        years = [y[0] for y in years]
-
     for year in years:
         for source in sources:
-            query = db.query(
-                func.sum(Research.fund).label("total_fund")
-            ).filter(
-                Research.fund_source == source,
-                Research.year == year
-            )
-
-            result = query.one()
-            fund = result.total_fund or 0
+            fund = funds.get((source, year), 0)
             stats[source][str(year)] = {
                 "total_fund": fund
             }
@@ -66,33 +69,30 @@ def get_fund_statistics(
 
 
 @router.get("/stats/research/total", response_model=StandardResponse)
-def get_research_total(
+@cached()
+async def get_research_total(
     year_range: int = Query(6, ge=0, le=10, description="0=all years, 1=last year, 3=last 3 years, 6=last 6 years"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     current_year = datetime.now().year
 
+    query = select(
+        ResearchFundYearStat.fund_source,
+        ResearchFundYearStat.year,
+        ResearchFundYearStat.research_count
+    ).where(ResearchFundYearStat.year > 0, ResearchFundYearStat.research_count > 0)
+
     if year_range > 0:
         min_year = current_year - year_range + 1
-        years = list(range(min_year, current_year + 1))
+        query = query.where(ResearchFundYearStat.year >= min_year, ResearchFundYearStat.year <= current_year)
         range_desc = f"sejak tahun {min_year}"
     else:
-        year_tuples = db.query(Research.year).distinct().filter(Research.year.isnot(None)).order_by(Research.year).all()
-        years = [y[0] for y in year_tuples]
         range_desc = "untuk semua tahun"
 
-    # Query total count by fund_source and year
-    query = (
-        db.query(Research.fund_source, Research.year, func.count(Research.id))
-        .filter(Research.year.in_(years))
-        .group_by(Research.fund_source, Research.year)
-        .all()
-    )
-
-    # Susun hasilnya ke dalam nested dict
+    # Susun hasilnya ke dalam nested dict ('' di ringkasan = fund_source NULL)
     result = defaultdict(dict)
-    for fund_source, year, count in query:
-        result[fund_source][str(year)] = count
+    for fund_source, year, count in (await db.execute(query.order_by(ResearchFundYearStat.year))).all():
+        result[fund_source or None][str(year)] = count
 
     return StandardResponse(
         success=True,
@@ -5,6 +5,7 @@ from database import get_db
 from schemas import StandardResponse  # pastikan diimport
 from sqlalchemy import func
 from datetime import datetime
+from services.article_services import source_filter
 
 router = APIRouter(
     tags=['Statistics']
@@ -115,7 +116,7 @@ def get_article_stats_by_source(
     result = {}
 
     for source in sources:
-        query = db.query(func.count(Article.id)).filter(Article.source.ilike(f"%{source}%"))
+        query = db.query(func.count(Article.id)).filter(source_filter(db, source))
 
         if year_range > 0:
             min_year = current_year - year_range + 1
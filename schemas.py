@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional, List, Any
+from datetime import datetime
 
 
 class StandardResponse(BaseModel):
@@ -195,4 +196,22 @@ class AuthorDetailResponse(BaseModel):
 class TopAuthorResponse(BaseModel):
     author_id: int
     name: str
-    article_count: int
\ No newline at end of file
+    article_count: int
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    params: Optional[dict] = None
+    total_units: Optional[int] = None
+    completed_count: int = 0
+    error_count: int = 0
+    counters: Optional[dict] = None
+    errors: Optional[List[str]] = None
+    result: Optional[Any] = None
+    cancel_requested: bool = False
+    owner: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
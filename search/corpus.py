@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import Article, Research
+from search.inverted_index import InvertedIndex
+from search.text import tokenize
+
+# Batas kandidat yang diteruskan ke query SQL (filter tahun/sumber)
+MAX_CANDIDATES = 5000
+REFRESH_BATCH = 1000
+# Index dibangun ulang penuh setelah sekian detik, untuk perubahan yang tidak
+# terlihat oleh proses ini (worker uvicorn lain, tulisan langsung ke database)
+SEARCH_INDEX_MAX_AGE = int(os.getenv("SEARCH_INDEX_MAX_AGE", "900"))
+
+
+class CorpusIndex:
+    """
+    Inverted index untuk satu tabel, dibangun malas saat pencarian pertama.
+
+    Baris baru diambil secara inkremental lewat high-water mark id; baris yang
+    diubah/dihapus lewat ORM di proses ini dicatat oleh listener after_flush,
+    dan penulisan lewat Core (bulk) memanggil mark_stale, lalu di-index ulang
+    pada refresh berikutnya. Perubahan dari proses lain hanya terlihat lewat
+    baris baru; update/delete dari proses lain bisa basi sampai index dibangun
+    ulang penuh (SEARCH_INDEX_MAX_AGE).
+
+    refresh() memakan CPU (tokenisasi + posting BM25), jadi pemanggil async
+    harus menjalankannya di threadpool (lihat database.run_in_sync_session).
+    """
+
+    def __init__(self, model, fields: Dict[str, float]):
+        self.model = model
+        self.fields = dict(fields)
+        self.columns = {name: getattr(model, name) for name in fields}
+        self.index = InvertedIndex(fields)
+        self._last_id = 0
+        self._built_at: Optional[float] = None
+        self._stale = set()
+        self._inflight: Optional[Future] = None
+        self._lock = threading.Lock()
+
+    def mark_stale(self, ids: Iterable[int]):
+        with self._lock:
+            self._stale.update(ids)
+
+    def refresh(self, db: Session):
+        """
+        Single-flight: hanya satu refresh berjalan per index; pemanggil lain
+        menunggu hasil refresh yang sedang berjalan, tidak memuat ulang korpus.
+        """
+        with self._lock:
+            future, owner = self._inflight, False
+            if future is None:
+                future = self._inflight = Future()
+                owner = True
+        if not owner:
+            future.result()
+            return
+
+        try:
+            self._refresh(db)
+            future.set_result(None)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight = None
+
+    def _refresh(self, db: Session):
+        # Query DB dan tokenisasi dilakukan di luar lock; lock hanya dipegang
+        # saat menukar/menerapkan hasil, supaya search tetap bisa berjalan.
+        started = time.monotonic()
+        with self._lock:
+            rebuild = self._built_at is None or started - self._built_at > SEARCH_INDEX_MAX_AGE
+            stale, self._stale = self._stale, set()
+            last_id = 0 if rebuild else self._last_id
+
+        try:
+            new_docs = []
+            while True:
+                rows = self._load(db, self.model.id > last_id)
+                new_docs.extend(self._tokenize(row) for row in rows)
+                if rows:
+                    last_id = rows[-1].id
+                if len(rows) < REFRESH_BATCH:
+                    break
+
+            changed_docs, missing = [], set()
+            if not rebuild:
+                stale = [i for i in stale if i <= last_id]
+                for start in range(0, len(stale), REFRESH_BATCH):
+                    chunk = stale[start:start + REFRESH_BATCH]
+                    rows = self._load(db, self.model.id.in_(chunk))
+                    changed_docs.extend(self._tokenize(row) for row in rows)
+                    missing.update(set(chunk) - {row.id for row in rows})
+        except Exception:
+            self.mark_stale(stale)
+            raise
+
+        if rebuild:
+            index = InvertedIndex(self.fields)
+            for key, field_tokens in new_docs:
+                index.add(key, field_tokens)
+            with self._lock:
+                self.index, self._last_id, self._built_at = index, last_id, started
+            return
+
+        with self._lock:
+            for key, field_tokens in new_docs:
+                self.index.add(key, field_tokens)
+            self._last_id = max(self._last_id, last_id)
+            for key, field_tokens in changed_docs:
+                self.index.add(key, field_tokens)
+            for key in missing:
+                self.index.remove(key)
+
+    def search(self, db: Session, text: str, fields: Optional[Iterable[str]] = None) -> List[Tuple[int, float]]:
+        self.refresh(db)
+        return self.index.search(tokenize(text), fields=fields, limit=MAX_CANDIDATES)
+
+    def _load(self, db: Session, condition):
+        return (
+            db.query(self.model.id, *self.columns.values())
+            .filter(condition)
+            .order_by(self.model.id)
+            .limit(REFRESH_BATCH)
+            .all()
+        )
+
+    def _tokenize(self, row) -> Tuple[int, Dict[str, List[str]]]:
+        return row.id, {name: tokenize(getattr(row, name)) for name in self.columns}
+
+
+article_index = CorpusIndex(Article, {"title": 3.0, "journal": 1.0, "abstract": 1.0})
+research_index = CorpusIndex(Research, {"title": 1.0})
+
+_INDEXES = {Article: article_index, Research: research_index}
+STALE_IDS = "corpus_stale_ids"
+
+
+def mark_stale_on_commit(session: Session, model, ids: Iterable[int]):
+    """
+    Tandai baris yang ditulis lewat Core (bulk insert/update) untuk di-index
+    ulang begitu transaksi commit. Ditunda sampai commit: refresh sebelum
+    commit tidak melihat barisnya dan akan membuang tandanya. Ini juga
+    menangkap id yang di-commit lebih lambat dari id yang lebih besar, yang
+    terlewat oleh high-water mark.
+    """
+    if model in _INDEXES:
+        session.info.setdefault(STALE_IDS, {}).setdefault(model, set()).update(ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_changed_rows(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if type(obj) in _INDEXES and obj.id is not None:
+            mark_stale_on_commit(session, type(obj), [obj.id])
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_stale_rows(session):
+    for model, ids in session.info.pop(STALE_IDS, {}).items():
+        _INDEXES[model].mark_stale(ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_rows(session):
+    session.info.pop(STALE_IDS, None)
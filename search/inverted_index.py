@@ -0,0 +1,150 @@
+import math
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Posting dokumen terhapus dibuang (compaction) jika jumlahnya melewati batas ini
+COMPACT_MIN_DELETED = 1000
+COMPACT_RATIO = 0.25
+
+
+class InvertedIndex:
+    """
+    Inverted index in-memory dengan posting list berbasis array dan skor BM25.
+
+    Setiap field (mis. title, abstract) punya posting list dan panjang dokumen
+    sendiri; skor akhir adalah jumlah BM25 per field dikali bobot field.
+    Dokumen yang diperbarui ditandai terhapus lalu ditambahkan ulang; document
+    frequency hanya menghitung dokumen hidup, dan posting dokumen terhapus
+    dibuang begitu jumlahnya melewati COMPACT_RATIO dari dokumen hidup.
+    """
+
+    def __init__(self, fields: Dict[str, float], k1: float = 1.2, b: float = 0.75):
+        self.fields = dict(fields)
+        self.k1 = k1
+        self.b = b
+        self._keys = array("I")  # nomor dokumen internal -> id baris
+        self._doc_numbers: Dict[int, int] = {}
+        self._deleted = set()
+        self._postings: Dict[str, Dict[str, Tuple[array, array]]] = {f: {} for f in self.fields}
+        self._lengths: Dict[str, array] = {f: array("I") for f in self.fields}
+        self._total_lengths: Dict[str, int] = {f: 0 for f in self.fields}
+        # Term unik per dokumen (untuk mengurangi df saat remove) dan df dokumen hidup
+        self._doc_terms: Dict[str, List[Optional[Tuple[str, ...]]]] = {f: [] for f in self.fields}
+        self._df: Dict[str, Dict[str, int]] = {f: {} for f in self.fields}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_numbers)
+
+    def add(self, key: int, field_tokens: Dict[str, List[str]]):
+        with self._lock:
+            self.remove(key)
+
+            doc = len(self._keys)
+            self._keys.append(key)
+            self._doc_numbers[key] = doc
+
+            for field in self.fields:
+                tokens = field_tokens.get(field) or []
+                self._lengths[field].append(len(tokens))
+                self._total_lengths[field] += len(tokens)
+
+                postings = self._postings[field]
+                df = self._df[field]
+                counts = Counter(tokens)
+                for term, tf in counts.items():
+                    entry = postings.get(term)
+                    if entry is None:
+                        entry = postings[term] = (array("I"), array("H"))
+                    entry[0].append(doc)
+                    entry[1].append(min(tf, 0xFFFF))
+                    df[term] = df.get(term, 0) + 1
+                self._doc_terms[field].append(tuple(counts))
+
+    def remove(self, key: int):
+        with self._lock:
+            doc = self._doc_numbers.pop(key, None)
+            if doc is None:
+                return
+            self._deleted.add(doc)
+            for field in self.fields:
+                self._total_lengths[field] -= self._lengths[field][doc]
+                df = self._df[field]
+                for term in self._doc_terms[field][doc]:
+                    df[term] -= 1
+                    if not df[term]:
+                        del df[term]
+                self._doc_terms[field][doc] = None
+
+            deleted = len(self._deleted)
+            if deleted >= COMPACT_MIN_DELETED and deleted > len(self._doc_numbers) * COMPACT_RATIO:
+                self._compact()
+
+    def _compact(self):
+        """Bangun ulang posting tanpa dokumen terhapus; nomor dokumen dipadatkan."""
+        live = [doc for doc in range(len(self._keys)) if doc not in self._deleted]
+        renumber = {old: new for new, old in enumerate(live)}
+
+        self._keys = array("I", (self._keys[doc] for doc in live))
+        self._doc_numbers = {key: doc for doc, key in enumerate(self._keys)}
+        for field in self.fields:
+            self._lengths[field] = array("I", (self._lengths[field][doc] for doc in live))
+            self._doc_terms[field] = [self._doc_terms[field][doc] for doc in live]
+
+            postings = {}
+            for term, (docs, tfs) in self._postings[field].items():
+                new_docs, new_tfs = array("I"), array("H")
+                for doc, tf in zip(docs, tfs):
+                    new_doc = renumber.get(doc)
+                    if new_doc is not None:
+                        new_docs.append(new_doc)
+                        new_tfs.append(tf)
+                if new_docs:
+                    postings[term] = (new_docs, new_tfs)
+            self._postings[field] = postings
+        self._deleted = set()
+
+    def search(
+        self,
+        terms: Iterable[str],
+        fields: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Kembalikan [(id baris, skor)] terurut dari skor tertinggi."""
+        terms = set(terms)
+        fields = [f for f in (fields or self.fields) if f in self.fields]
+
+        with self._lock:
+            live_docs = len(self._doc_numbers)
+            if not live_docs or not terms:
+                return []
+
+            scores: Dict[int, float] = {}
+            for field in fields:
+                postings = self._postings[field]
+                live_df = self._df[field]
+                lengths = self._lengths[field]
+                avg_length = (self._total_lengths[field] / live_docs) or 1.0
+                weight = self.fields[field]
+
+                for term in terms:
+                    entry = postings.get(term)
+                    df = live_df.get(term, 0)
+                    if entry is None or not df:
+                        continue
+                    docs, tfs = entry
+                    idf = math.log(1 + (live_docs - df + 0.5) / (df + 0.5))
+
+                    for doc, tf in zip(docs, tfs):
+                        if doc in self._deleted:
+                            continue
+                        norm = self.k1 * (1 - self.b + self.b * lengths[doc] / avg_length)
+                        score = weight * idf * tf * (self.k1 + 1) / (tf + norm)
+                        scores[doc] = scores.get(doc, 0.0) + score
+
+            ranked = sorted(scores.items(), key=lambda x: (-x[1], -self._keys[x[0]]))
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [(self._keys[doc], score) for doc, score in ranked]
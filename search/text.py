@@ -0,0 +1,80 @@
+import re
+import unicodedata
+from typing import List
+
+# Kata umum Indonesia/Inggris yang tidak berguna untuk ranking
+STOPWORDS = frozenset("""
+ada adalah agar akan antara atas atau bagi bahwa beberapa berbasis berdasarkan
+dalam dan dari dengan di ini itu juga ke kepada oleh pada para sebagai secara
+nya serta studi tentang terhadap untuk yang
+a an and are as at be by for from in into is of on or the to using via with
+""".split())
+
+# Partikel/klitik Indonesia yang cukup aman dipotong
+ID_SUFFIXES = ("nya", "lah", "kah")
+
+
+def normalize(text: str) -> str:
+    # Ubah ke huruf kecil
+    text = text.lower()
+
+    # Hilangkan accent/diakritik (contoh: é -> e)
+    text = unicodedata.normalize('NFKD', text).encode('ASCII', 'ignore').decode('utf-8')
+
+    # Hilangkan karakter non-alfabet dan angka (kecuali spasi)
+    text = re.sub(r'[^a-z0-9\s]', '', text)
+
+    # Hilangkan spasi berlebih
+    text = re.sub(r'\s+', ' ', text).strip()
+
+    return text
+
+
+def stem(token: str) -> str:
+    for suffix in ID_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            return token[:-len(suffix)]
+
+    # Bentuk jamak Inggris sederhana (networks -> network, studies -> study)
+    if token.endswith("ies") and len(token) > 5:
+        return token[:-3] + "y"
+    if token.endswith("s") and not token.endswith(("ss", "is", "us")) and len(token) > 4:
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    if not text:
+        return []
+    # Tanda hubung dan garis miring jadi pemisah kata, bukan digabung
+    text = re.sub(r'[-/_]', ' ', text)
+    return [stem(t) for t in normalize(text).split() if t not in STOPWORDS]
+
+
+# Token nama yang lebih pendek (mis. inisial "a") hanya dicocokkan persis, bukan
+# sebagai awalan, supaya nama pendek tidak tertaut ke dosen yang salah
+NAME_PREFIX_MIN_LENGTH = 2
+
+
+def name_tokens(name: str) -> List[str]:
+    """Token nama orang untuk lookup ber-index (tanpa stopword/stemming)."""
+    if not name:
+        return []
+    tokens = []
+    for token in normalize(re.sub(r'[-/_.,]', ' ', name)).split():
+        token = token[:64]
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def title_key(title: str) -> str:
+    """
+    Kunci pencocokan judul di Python untuk hasil query `title IN (...)`.
+    Collation MySQL (_ci) tidak membedakan huruf besar/kecil dan aksen, jadi
+    kuncinya juga mengabaikan keduanya (ditambah spasi berlebih); kunci yang
+    lebih ketat akan melewatkan baris yang ditemukan database.
+    """
+    text = unicodedata.normalize('NFKD', title.casefold())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r'\s+', ' ', text).strip()
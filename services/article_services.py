@@ -1,11 +1,53 @@
-from sqlalchemy.orm import Session
-from typing import Optional, Dict, Any, List, Tuple, Optional
+import os
+from sqlalchemy.orm import Session, selectinload
+from typing import Optional, Dict, Any, List, Tuple, Optional, Literal
 from sqlalchemy import case
 from models import Article
 from schemas import ArticleResponseNoAbstract, ArticleAuthorNoAvatarResponse, ArticleResponse, ArticleAuthorResponse
-from sqlalchemy import func
+from sqlalchemy import func, or_
 from fastapi import HTTPException
-from models import User, Article
+from models import User, Article, PublicationAuthor, Author
+from services.cache import TTLCache
+from services.fulltext import fulltext_filter
+from search.corpus import article_index
+from repository.user import user_name_filter
+from services.pagination import keyset_order, keyset_filter, encode_cursor, decode_cursor
+
+# Muat graf Article -> PublicationAuthor -> Author -> User untuk satu halaman
+# dengan satu query IN per level, bukan lazy load per baris (N+1)
+ARTICLE_AUTHORS_LOADER = (
+    selectinload(Article.authors)
+    .selectinload(PublicationAuthor.author)
+    .selectinload(Author.user)
+)
+
+# Daftar sumber artikel berubah sangat jarang; disimpan per proses agar
+# source_filter tidak menjalankan SELECT DISTINCT di setiap request
+SOURCE_LIST_TTL = int(os.getenv("SOURCE_LIST_TTL", "300"))
+_source_list = TTLCache(max_entries=1, default_ttl=SOURCE_LIST_TTL)
+
+
+def _article_sources(db: Session, fresh: bool = False) -> List[str]:
+    hit, sources, version = _source_list.lookup("sources")
+    if hit and not fresh:
+        return sources
+    sources = [value for (value,) in db.query(Article.source).distinct() if value]
+    _source_list.store("sources", sources, version)
+    return sources
+
+
+def source_filter(db: Session, source: str):
+    """
+    Filter sumber yang tetap bisa memakai index (source, year, id): nilai
+    parsial (mis. "scholar") dicocokkan dulu ke daftar sumber yang ada,
+    lalu artikel difilter dengan IN pada nilai persisnya.
+    """
+    pattern = source.upper()
+    sources = [value for value in _article_sources(db) if pattern in value.upper()]
+    if not sources:
+        # Mungkin sumber baru yang belum ada di daftar cache
+        sources = [value for value in _article_sources(db, fresh=True) if pattern in value.upper()]
+    return Article.source.in_(sources)
 
 def get_all_articles_service(
     db: Session,
@@ -14,30 +56,42 @@ def get_all_articles_service(
     max_year: Optional[int] = None,
     sort_by_citation: bool = False,
     page: int = 1,
-    limit: int = 10
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = True
 ) -> Dict[str, Any]:
 
     query = db.query(Article)
 
     if source:
-        query = query.filter(Article.source.ilike(f"%{source.upper()}%"))
+        query = query.filter(source_filter(db, source))
 
     if min_year is not None:
         query = query.filter(Article.year >= min_year)
     if max_year is not None:
         query = query.filter(Article.year <= max_year)
 
-    if sort_by_citation:
-        query = query.order_by(
-            case((Article.citation_count == None, 1), else_=0),
-            Article.citation_count.desc()
-        )
-    else:
-        query = query.order_by(Article.year.desc())
+    sort = "citation" if sort_by_citation else "year"
+    sort_column = Article.citation_count if sort_by_citation else Article.year
 
-    total = query.count()
+    total = query.count() if include_total else None
+
+    # Mode cursor: lanjut dari (nilai sort, id) terakhir, tanpa OFFSET
+    position = decode_cursor(cursor, sort)
+    if position is not None:
+        query = query.filter(keyset_filter(sort_column, Article.id, position))
+
+    query = query.order_by(*keyset_order(sort_column, Article.id))
+    if position is None:
+        query = query.offset((page - 1) * limit)
 
-    paginated = query.offset((page - 1) * limit).limit(limit).all()
+    rows = query.options(ARTICLE_AUTHORS_LOADER).limit(limit + 1).all()
+    paginated = rows[:limit]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = paginated[-1]
+        next_cursor = encode_cursor(sort, getattr(last, sort_column.key), last.id)
 
     articles_data = []
     for article in paginated:
@@ -68,6 +122,7 @@ def get_all_articles_service(
         "page": page,
         "limit": limit,
         "total": total,
+        "next_cursor": next_cursor,
         "articles": articles_data
     }
 
@@ -82,38 +137,56 @@ def search_articles_by_authors_service(
     limit: int,
     db: Session
 ):
-    users = db.query(User).filter(func.lower(User.name).like(f"%{name.lower()}%")).all()
-    if not users:
-        raise HTTPException(status_code=404, detail="Authors not found")
-
-    matched_author_ids = [user.author.id for user in users if user.author]
-    if not matched_author_ids:
-        raise HTTPException(status_code=404, detail="Authors found but no associated author records")
-
-    article_set = set()
-    for author_id in matched_author_ids:
-        pa_records = db.query(Article).join(Article.authors).filter_by(author_id=author_id).all()
-        article_set.update(pa_records)
-
-    filtered_articles = []
-    for article in article_set:
-        if source and (not article.source or source.upper() not in article.source.upper()):
-            continue
-        if min_year and article.year and article.year < min_year:
-            continue
-        if max_year and article.year and article.year > max_year:
-            continue
-        filtered_articles.append(article)
+    name_filter = user_name_filter(name)
+
+    matched_author_ids = (
+        db.query(Author.id)
+        .join(User, Author.user_id == User.id)
+        .filter(name_filter)
+    )
+
+    # Join author-match, filter, sort, COUNT dan LIMIT/OFFSET semuanya di SQL
+    matched_article_ids = db.query(PublicationAuthor.article_id).filter(
+        PublicationAuthor.author_id.in_(matched_author_ids)
+    )
+    query = db.query(Article).filter(Article.id.in_(matched_article_ids))
+
+    if source:
+        query = query.filter(source_filter(db, source))
+
+    # Artikel tanpa tahun tetap ikut, sama seperti filter sebelumnya
+    if min_year:
+        query = query.filter(or_(Article.year == None, Article.year >= min_year))
+    if max_year:
+        query = query.filter(or_(Article.year == None, Article.year <= max_year))
 
     if sort_by_citation:
-        filtered_articles.sort(key=lambda x: (x.citation_count is None, -(x.citation_count or 0)))
+        query = query.order_by(
+            case((Article.citation_count == None, 1), else_=0),
+            Article.citation_count.desc(),
+            Article.id.desc()
+        )
     else:
-        filtered_articles.sort(key=lambda x: x.year if x.year else 0, reverse=True)
+        query = query.order_by(
+            case((Article.year == None, 1), else_=0),
+            Article.year.desc(),
+            Article.id.desc()
+        )
 
-    total = len(filtered_articles)
-    start = (page - 1) * limit
-    end = start + limit
-    paginated = filtered_articles[start:end]
+    total = query.count()
+    if total == 0:
+        # Bedakan "nama tidak ditemukan" dari "tidak ada artikel" hanya saat hasil kosong
+        if not db.query(matched_author_ids.exists()).scalar():
+            if not db.query(db.query(User.id).filter(name_filter).exists()).scalar():
+                raise HTTPException(status_code=404, detail="Authors not found")
+            raise HTTPException(status_code=404, detail="Authors found but no associated author records")
+
+    paginated = (
+        query.options(ARTICLE_AUTHORS_LOADER)
+        .offset((page - 1) * limit)
+        .limit(limit)
+        .all()
+    )
 
     articles_response = []
     for article in paginated:
@@ -155,31 +228,67 @@ def search_articles_by_title_service(
     sort_by_citation: Optional[bool],
     page: int,
     limit: int,
-    db: Session
+    db: Session,
+    mode: Literal["like", "fulltext", "index"] = "like",
+    include_abstract: bool = False
 ) -> Tuple[int, List[ArticleResponseNoAbstract]]:
 
-    query = db.query(Article).filter(
-        func.lower(Article.title).like(f"%{title.lower()}%")
-    )
+    columns = [Article.title, Article.abstract] if include_abstract else [Article.title]
+    relevance = None
+    index_scores = None
+    if mode == "index":
+        fields = ("title", "journal", "abstract") if include_abstract else ("title", "journal")
+        index_scores = dict(article_index.search(db, title, fields=fields))
+        query = db.query(Article).filter(Article.id.in_(list(index_scores)))
+    elif mode == "fulltext":
+        match_filter, relevance = fulltext_filter(db, columns, title)
+        query = db.query(Article).filter(match_filter)
+    else:
+        query = db.query(Article).filter(
+            or_(*[func.lower(column).like(f"%{title.lower()}%") for column in columns])
+        )
 
     if source:
-        query = query.filter(Article.source.ilike(f"%{source.upper()}%"))
+        query = query.filter(source_filter(db, source))
 
     if min_year:
         query = query.filter(Article.year >= min_year)
     if max_year:
         query = query.filter(Article.year <= max_year)
 
-    if sort_by_citation:
-        query = query.order_by(
-            case((Article.citation_count == None, 1), else_=0),
-            Article.citation_count.desc()
+    if index_scores is not None and not sort_by_citation:
+        # SQL hanya menyaring kandidat dari index; urutan pakai skor BM25
+        matched_ids = sorted(
+            (row.id for row in query.with_entities(Article.id)),
+            key=lambda article_id: (-index_scores[article_id], -article_id)
         )
+        total = len(matched_ids)
+        page_ids = matched_ids[(page - 1) * limit:page * limit]
+        by_id = {
+            article.id: article
+            for article in db.query(Article)
+            .options(ARTICLE_AUTHORS_LOADER)
+            .filter(Article.id.in_(page_ids))
+        }
+        articles = [by_id[article_id] for article_id in page_ids]
     else:
-        query = query.order_by(Article.year.desc())
-
-    total = query.count()
-    articles = query.offset((page - 1) * limit).limit(limit).all()
+        if sort_by_citation:
+            query = query.order_by(
+                case((Article.citation_count == None, 1), else_=0),
+                Article.citation_count.desc()
+            )
+        elif relevance is not None:
+            query = query.order_by(relevance.desc(), Article.id.desc())
+        else:
+            query = query.order_by(Article.year.desc())
+
+        total = query.count()
+        articles = (
+            query.options(ARTICLE_AUTHORS_LOADER)
+            .offset((page - 1) * limit)
+            .limit(limit)
+            .all()
+        )
 
     results = []
     for article in articles:
@@ -210,7 +319,12 @@ def search_articles_by_title_service(
 
 
 def get_article_detail_service(article_id: int, db: Session) -> ArticleResponse:
-    article = db.query(Article).filter(Article.id == article_id).first()
+    article = (
+        db.query(Article)
+        .options(ARTICLE_AUTHORS_LOADER)
+        .filter(Article.id == article_id)
+        .first()
+    )
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
 
@@ -0,0 +1,269 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.managers import BaseManager
+from typing import Any, Callable, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models import CacheVersion
+from repository.bulk import upsert_increment
+
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+# Alamat proses cache bersama, mis. "127.0.0.1:50055"; kosong = cache per proses
+CACHE_BACKEND_URL = os.getenv("CACHE_BACKEND_URL")
+CACHE_AUTHKEY = os.getenv("CACHE_AUTHKEY", "publikasi-cache").encode()
+# Tanpa cache bersama, tiap worker memeriksa versi data di DB paling sering tiap N detik
+CACHE_VERSION_CHECK_SECONDS = float(os.getenv("CACHE_VERSION_CHECK_SECONDS", "2"))
+
+
+class TTLCache:
+    """
+    Cache LRU berukuran terbatas dengan TTL per entri.
+
+    Setiap entri disimpan bersama versi data saat dihitung; invalidate()
+    menaikkan versi sehingga semua entri lama otomatis tidak terpakai.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, default_ttl: int = CACHE_TTL):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def version(self) -> int:
+        return self._version
+
+    def lookup(self, key: str) -> Tuple[bool, Any, int]:
+        """Kembalikan (hit, value, versi saat ini)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, version, value = entry
+                if version == self._version and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return True, value, self._version
+                del self._entries[key]
+            return False, None, self._version
+
+    def store(self, key: str, value: Any, version: int, ttl: Optional[int] = None):
+        """Simpan hasil yang dihitung pada versi tertentu; diabaikan jika versi sudah naik."""
+        with self._lock:
+            if version != self._version:
+                return
+            expires_at = time.monotonic() + (ttl if ttl is not None else self.default_ttl)
+            self._entries[key] = (expires_at, version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> int:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            return self._version
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "version": self._version}
+
+
+# ==== Backend bersama lewat multiprocessing manager ====
+
+_server_cache = None
+
+
+def _get_server_cache():
+    global _server_cache
+    if _server_cache is None:
+        _server_cache = TTLCache()
+    return _server_cache
+
+
+class CacheManager(BaseManager):
+    pass
+
+
+CacheManager.register("get_cache", callable=_get_server_cache)
+
+
+def _parse_address(url: str) -> Tuple[str, int]:
+    host, _, port = url.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def serve(url: str = CACHE_BACKEND_URL or "127.0.0.1:50055"):
+    """Jalankan proses cache bersama: python -m services.cache"""
+    manager = CacheManager(address=_parse_address(url), authkey=CACHE_AUTHKEY)
+    print(f"🗄️ Cache server berjalan di {url}")
+    manager.get_server().serve_forever()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+_warned = set()
+
+
+def _warn_once(key: str, message: str):
+    """Cetak peringatan sekali saja sampai operasi yang sama berhasil lagi."""
+    if key not in _warned:
+        _warned.add(key)
+        print(message)
+
+
+def _recovered(key: str):
+    if key in _warned:
+        _warned.discard(key)
+        print(f"✅ {key} kembali normal")
+
+
+def get_cache():
+    """Cache bersama jika CACHE_BACKEND_URL di-set dan bisa dihubungi, selain itu cache lokal."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend = None
+                if CACHE_BACKEND_URL:
+                    try:
+                        manager = CacheManager(address=_parse_address(CACHE_BACKEND_URL), authkey=CACHE_AUTHKEY)
+                        manager.connect()
+                        backend = manager.get_cache()
+                    except Exception as e:
+                        print(f"⚠️ Cache server {CACHE_BACKEND_URL} tidak bisa dihubungi, pakai cache lokal: {e}")
+                _backend = backend or TTLCache()
+    return _backend
+
+
+# ==== Invalidasi antar worker tanpa cache bersama ====
+
+class _DbVersion:
+    """
+    Versi data di tabel cache_versions. Worker yang memakai cache lokal
+    membacanya paling sering tiap CACHE_VERSION_CHECK_SECONDS; jika versi
+    sudah dinaikkan worker lain, cache lokal dikosongkan.
+    """
+
+    def __init__(self):
+        self._seen: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        return time.monotonic() - self._checked_at >= CACHE_VERSION_CHECK_SECONDS
+
+    def sync(self, cache: TTLCache):
+        with self._lock:
+            if not self.due():
+                return
+            self._checked_at = time.monotonic()
+            try:
+                with SessionLocal() as db:
+                    version = db.query(CacheVersion.version).filter(CacheVersion.id == 1).scalar() or 0
+            except Exception as e:
+                _warn_once("Versi cache di database", f"⚠️ Versi cache di database tidak bisa dibaca: {e}")
+                return
+            _recovered("Versi cache di database")
+            if self._seen is not None and version != self._seen:
+                cache.invalidate()
+            self._seen = version
+
+    def bump(self):
+        with SessionLocal() as db:
+            upsert_increment(db, CacheVersion.__table__, [{"id": 1, "version": 1}], keys=["id"], increment_columns=["version"])
+            db.commit()
+
+
+_db_version = _DbVersion()
+
+
+def _local_cache() -> Optional[TTLCache]:
+    """Cache lokal proses ini, atau None jika memakai cache bersama."""
+    cache = get_cache()
+    return cache if isinstance(cache, TTLCache) else None
+
+
+def invalidate_cache():
+    """Dipanggil setelah upload/sync menulis data, agar response lama tidak dipakai lagi."""
+    try:
+        get_cache().invalidate()
+    except Exception as e:
+        print(f"⚠️ Gagal invalidasi cache: {e}")
+    if _local_cache() is not None:
+        # Worker lain hanya punya cache lokal masing-masing; beri tahu lewat DB
+        try:
+            _db_version.bump()
+        except Exception as e:
+            print(f"⚠️ Gagal menaikkan versi cache di database: {e}")
+
+
+def cached(ttl: Optional[int] = None) -> Callable:
+    """
+    Cache response endpoint berdasarkan nama route dan query param-nya
+    (parameter db diabaikan). Pasang di bawah dekorator @router.get.
+    """
+    def decorator(func):
+        route = f"{func.__module__}.{func.__name__}"
+
+        def make_key(kwargs) -> str:
+            params = sorted((k, repr(v)) for k, v in kwargs.items() if k != "db")
+            return f"{route}:{params}"
+
+        def lookup(key):
+            try:
+                result = get_cache().lookup(key)
+            except Exception as e:
+                _warn_once("Cache", f"⚠️ Cache tidak tersedia: {e}")
+                return False, None, None
+            _recovered("Cache")
+            return result
+
+        def store(key, value, version):
+            if version is None:
+                return
+            try:
+                get_cache().store(key, value, version, ttl)
+            except Exception as e:
+                _warn_once("Cache", f"⚠️ Cache tidak tersedia: {e}")
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(**kwargs):
+                local = _local_cache()
+                if local is not None and _db_version.due():
+                    await run_in_threadpool(_db_version.sync, local)
+                key = make_key(kwargs)
+                hit, value, version = lookup(key)
+                if hit:
+                    return value
+                value = await func(**kwargs)
+                store(key, value, version)
+                return value
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            local = _local_cache()
+            if local is not None and _db_version.due():
+                _db_version.sync(local)
+            key = make_key(kwargs)
+            hit, value, version = lookup(key)
+            if hit:
+                return value
+            value = func(**kwargs)
+            store(key, value, version)
+            return value
+        return wrapper
+
+    return decorator
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,39 @@
+import re
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import and_, or_, func, true
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.mysql import match
+
+# Sama dengan innodb_ft_min_token_size bawaan MySQL; kata lebih pendek tidak diindeks
+FULLTEXT_MIN_TOKEN = 3
+
+
+def search_terms(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def fulltext_filter(db: Session, columns: list, text: str) -> Tuple[Any, Optional[Any]]:
+    """
+    Bangun filter pencarian teks untuk kolom yang punya FULLTEXT index.
+
+    MySQL: MATCH ... AGAINST (BOOLEAN MODE), setiap kata wajib ada (prefix match),
+    dan ekspresi yang sama dipakai sebagai skor relevansi.
+    Database lain (SQLite untuk testing): setiap kata harus muncul di salah satu
+    kolom lewat LIKE, tanpa skor relevansi.
+    """
+    terms = search_terms(text)
+
+    if db.get_bind().dialect.name == "mysql":
+        fulltext_terms = [t for t in terms if len(t) >= FULLTEXT_MIN_TOKEN]
+        if fulltext_terms:
+            relevance = match(
+                *columns,
+                against=" ".join(f"+{t}*" for t in fulltext_terms)
+            ).in_boolean_mode()
+            return relevance, relevance
+
+    clauses = [
+        or_(*[func.lower(column).like(f"%{term}%") for column in columns])
+        for term in terms
+    ]
+    return (and_(*clauses) if clauses else true()), None
@@ -0,0 +1,49 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+
+def keyset_order(value_column, id_column) -> list:
+    """
+    Urutan (value desc, id desc) yang dipakai keyset pagination; NULL di akhir.
+    MySQL dan SQLite menaruh NULL di akhir pada DESC, jadi tidak perlu CASE
+    dan index (value, id) bisa dipakai untuk ORDER BY. Dialect yang menaruh
+    NULL di awal pada DESC (PostgreSQL) tidak cocok dengan keyset_filter.
+    """
+    return [value_column.desc(), id_column.desc()]
+
+
+def keyset_filter(value_column, id_column, cursor: List[Any]):
+    """Baris setelah posisi cursor [is_null, value, id] pada urutan keyset_order."""
+    is_null, value, last_id = cursor
+    if is_null:
+        return and_(value_column == None, id_column < last_id)
+    return or_(
+        value_column == None,
+        value_column < value,
+        and_(value_column == value, id_column < last_id)
+    )
+
+
+def encode_cursor(sort: str, value: Any, row_id: int) -> str:
+    payload = json.dumps([sort, value is None, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], sort: str) -> Optional[List[Any]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, is_null, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(row_id, int):
+            raise ValueError("invalid id")
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail="Cursor dibuat untuk urutan yang berbeda")
+    return [bool(is_null), value, row_id]
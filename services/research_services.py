@@ -1,11 +1,43 @@
-from typing import Optional, Literal
+from typing import Optional, Literal, Dict, List, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import case
 from models import Research
 from schemas import ResearchResponse, StandardResponse
 from fastapi import HTTPException
 from sqlalchemy import func
-from models import User
+from models import User, Author, ResearcherAuthor
+from services.fulltext import fulltext_filter
+from search.corpus import research_index
+from repository.user import user_name_filter
+from services.pagination import keyset_order, keyset_filter, encode_cursor, decode_cursor
+
+
+def get_research_members(db: Session, research_ids: List[int]) -> Dict[int, List[Tuple[int, str]]]:
+    """
+    Ambil (author_id, nama) anggota untuk sekumpulan research dalam satu query,
+    urut sesuai relasi ResearcherAuthor.
+    """
+    members: Dict[int, List[Tuple[int, str]]] = {}
+    if not research_ids:
+        return members
+
+    rows = (
+        db.query(ResearcherAuthor.researcher_id, Author.id, User.name)
+        .join(Author, ResearcherAuthor.author_id == Author.id)
+        .join(User, Author.user_id == User.id)
+        .filter(ResearcherAuthor.researcher_id.in_(set(research_ids)))
+        .order_by(ResearcherAuthor.researcher_id, ResearcherAuthor.id)
+        .all()
+    )
+    for research_id, author_id, name in rows:
+        members.setdefault(research_id, []).append((author_id, name))
+    return members
+
+
+def format_personils(members: List[Tuple[int, str]], leader: str) -> str:
+    # Hindari duplikat nama personil dan pastikan bukan leader
+    personil_names = {name for _, name in members if name != leader}
+    return "; ".join(sorted(personil_names))
 
 
 def get_all_researches_service(
@@ -15,7 +47,9 @@ def get_all_researches_service(
     termahal: bool,
     fund_source: Optional[Literal["INTERNAL_SOURCE", "BIMA_SOURCE", "SIMLITABMAS_SOURCE"]],
     page: int,
-    limit: int
+    limit: int,
+    cursor: Optional[str] = None,
+    include_total: bool = True
 ):
     query = db.query(Research)
 
@@ -26,38 +60,36 @@ def get_all_researches_service(
     if fund_source:
         query = query.filter(Research.fund_source == fund_source)
 
+    sort = "fund" if termahal else "year"
+    sort_column = Research.fund if termahal else Research.year
+
+    total = query.count() if include_total else None
+
+    # Mode cursor: lanjut dari (nilai sort, id) terakhir, tanpa OFFSET
+    position = decode_cursor(cursor, sort)
+    if position is not None:
+        query = query.filter(keyset_filter(sort_column, Research.id, position))
+
     # Sorting
-    if termahal:
-        query = query.order_by(
-            case((Research.fund == None, 1), else_=0),
-            Research.fund.desc()
-        )
-    else:
-        query = query.order_by(
-            case((Research.year == None, 1), else_=0),
-            Research.year.desc()
-        )
+    query = query.order_by(*keyset_order(sort_column, Research.id))
+    if position is None:
+        query = query.offset((page - 1) * limit)
 
-    total = query.count()
-    researches_list = query.offset((page - 1) * limit).limit(limit).all()
+    rows = query.limit(limit + 1).all()
+    researches_list = rows[:limit]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = researches_list[-1]
+        next_cursor = encode_cursor(sort, getattr(last, sort_column.key), last.id)
+
+    members = get_research_members(db, [research.id for research in researches_list])
 
     result = []
     for research in researches_list:
         leader = research.leader_name or "Unknown"
-
-        # Hindari duplikat nama personil dan pastikan bukan leader
-        personil_names = set()
-        for ra in research.authors:
-            if ra.author and ra.author.user:
-                name = ra.author.user.name
-                if name != leader:
-                    personil_names.add(name)
-        personils = "; ".join(sorted(personil_names))
-
-        first_author = next(
-            (ra.author for ra in research.authors if ra.author and ra.author.user),
-            None
-        )
+        research_members = members.get(research.id, [])
+        first_author = research_members[0] if research_members else None
 
         result.append(ResearchResponse(
             title=research.title,
@@ -67,15 +99,16 @@ def get_all_researches_service(
             sumber_pendanaan=research.fund_source,
             jenis_penelitian=research.fund_type,
             leader_name=leader,
-            personils=personils,
-            author_name=first_author.user.name if first_author else "Unknown",
-            author_id=first_author.id if first_author else 0
+            personils=format_personils(research_members, leader),
+            author_name=first_author[1] if first_author else "Unknown",
+            author_id=first_author[0] if first_author else 0
         ))
 
     return {
         "page": page,
         "limit": limit,
         "total": total,
+        "next_cursor": next_cursor,
         "researches": result
     }
 
@@ -90,69 +123,64 @@ def search_researches_by_authors_service(
     page: int,
     limit: int
 ):
-    users = db.query(User).filter(func.lower(User.name).like(f"%{name.lower()}%")).all()
-    if not users:
-        raise HTTPException(status_code=404, detail="Authors not found")
+    name_filter = user_name_filter(name)
+
+    # Satu baris per pasangan (research, author yang cocok), seperti sebelumnya
+    query = (
+        db.query(Research, Author.id.label("author_id"), User.name.label("author_name"))
+        .join(ResearcherAuthor, ResearcherAuthor.researcher_id == Research.id)
+        .join(Author, ResearcherAuthor.author_id == Author.id)
+        .join(User, Author.user_id == User.id)
+        .filter(name_filter)
+    )
 
-    researches_raw = []
-    for user in users:
-        author = user.author
-        if not author:
-            continue
-
-        for ra in author.research:
-            research = ra.research
-            if not research:
-                continue
-
-            # Filter tahun
-            if min_year is not None and (not research.year or research.year < min_year):
-                continue
-            if max_year is not None and (not research.year or research.year > max_year):
-                continue
-
-            # Filter fund source
-            if fund_source and research.fund_source != fund_source:
-                continue
-
-            # Leader dari field langsung
-            leader = research.leader_name or "Unknown"
-
-            # Personils (hindari duplikat dan pengecualian leader)
-            personil_names = set()
-            for r in research.authors:
-                if r.author and r.author.user:
-                    name_ = r.author.user.name
-                    if name_ != leader:
-                        personil_names.add(name_)
-            personils = "; ".join(sorted(personil_names))
-
-            researches_raw.append({
-                "research": research,
-                "author_name": user.name,
-                "author_id": author.id,
-                "leader": leader,
-                "personils": personils
-            })
-
-    total = len(researches_raw)
+    # Filter tahun
+    if min_year is not None:
+        query = query.filter(Research.year >= min_year)
+    if max_year is not None:
+        query = query.filter(Research.year <= max_year)
+
+    # Filter fund source
+    if fund_source:
+        query = query.filter(Research.fund_source == fund_source)
 
     # Sorting
     if termahal:
-        researches_raw.sort(
-            key=lambda x: x["research"].fund if x["research"].fund is not None else -1,
-            reverse=True
+        query = query.order_by(
+            case((Research.fund == None, 1), else_=0),
+            Research.fund.desc(),
+            Research.id.desc(),
+            Author.id
         )
     else:
-        researches_raw.sort(
-            key=lambda x: x["research"].year if x["research"].year else 0,
-            reverse=True
+        query = query.order_by(
+            case((Research.year == None, 1), else_=0),
+            Research.year.desc(),
+            Research.id.desc(),
+            Author.id
         )
 
+    total = query.count()
+    if total == 0 and not db.query(db.query(User.id).filter(name_filter).exists()).scalar():
+        raise HTTPException(status_code=404, detail="Authors not found")
+
     # Pagination
-    start = (page - 1) * limit
-    end = start + limit
-    paginated = researches_raw[start:end]
+    rows = query.offset((page - 1) * limit).limit(limit).all()
+
+    # Personil hanya untuk research di halaman ini, satu query batch
+    members = get_research_members(db, [row.Research.id for row in rows])
+
+    paginated = []
+    for row in rows:
+        research = row.Research
+        leader = research.leader_name or "Unknown"
+        paginated.append({
+            "research": research,
+            "author_name": row.author_name,
+            "author_id": row.author_id,
+            "leader": leader,
+            "personils": format_personils(members.get(research.id, []), leader)
+        })
 
     researches = [
         ResearchResponse(
@@ -190,11 +218,21 @@ def search_researches_by_title_service(
     fund_source: Optional[Literal["INTERNAL_SOURCE", "BIMA_SOURCE", "SIMLITABMAS_SOURCE"]],
     termahal: bool,
     page: int,
-    limit: int
+    limit: int,
+    mode: Literal["like", "fulltext", "index"] = "like"
 ):
-    query = db.query(Research).filter(
-        func.lower(Research.title).like(f"%{title.lower()}%")
-    )
+    relevance = None
+    index_scores = None
+    if mode == "index":
+        index_scores = dict(research_index.search(db, title))
+        query = db.query(Research).filter(Research.id.in_(list(index_scores)))
+    elif mode == "fulltext":
+        match_filter, relevance = fulltext_filter(db, [Research.title], title)
+        query = db.query(Research).filter(match_filter)
+    else:
+        query = db.query(Research).filter(
+            func.lower(Research.title).like(f"%{title.lower()}%")
+        )
 
     if min_year is not None:
         query = query.filter(Research.year >= min_year)
@@ -203,52 +241,57 @@ def search_researches_by_title_service(
     if fund_source:
         query = query.filter(Research.fund_source == fund_source)
 
-    if termahal:
-        query = query.order_by(
-            case((Research.fund == None, 1), else_=0),
-            Research.fund.desc()
-        )
-    else:
-        query = query.order_by(
-            case((Research.year == None, 1), else_=0),
-            Research.year.desc()
+    if index_scores is not None and not termahal:
+        # SQL hanya menyaring kandidat dari index; urutan pakai skor BM25
+        matched_ids = sorted(
+            (row.id for row in query.with_entities(Research.id)),
+            key=lambda research_id: (-index_scores[research_id], -research_id)
         )
+        total = len(matched_ids)
+        if total == 0:
+            raise HTTPException(status_code=404, detail="Researches not found")
 
-    matched_researches = query.all()
-
-    if not matched_researches:
-        raise HTTPException(status_code=404, detail="Researches not found")
-
-    researches_raw = []
-    for research in matched_researches:
+        page_ids = matched_ids[(page - 1) * limit:page * limit]
+        by_id = {research.id: research for research in db.query(Research).filter(Research.id.in_(page_ids))}
+        page_researches = [by_id[research_id] for research_id in page_ids]
+    else:
+        if termahal:
+            query = query.order_by(
+                case((Research.fund == None, 1), else_=0),
+                Research.fund.desc(),
+                Research.id.desc()
+            )
+        elif relevance is not None:
+            query = query.order_by(relevance.desc(), Research.id.desc())
+        else:
+            query = query.order_by(
+                case((Research.year == None, 1), else_=0),
+                Research.year.desc(),
+                Research.id.desc()
+            )
+
+        total = query.count()
+        if total == 0:
+            raise HTTPException(status_code=404, detail="Researches not found")
+
+        page_researches = query.offset((page - 1) * limit).limit(limit).all()
+
+    members = get_research_members(db, [research.id for research in page_researches])
+
+    paginated = []
+    for research in page_researches:
         leader = research.leader_name or "Unknown"
+        research_members = members.get(research.id, [])
+        first_author = research_members[0] if research_members else None
 
-        personil_names = set()
-        for ra in research.authors:
-            if ra.author and ra.author.user:
-                name = ra.author.user.name
-                if name != leader:
-                    personil_names.add(name)
-        personils = "; ".join(sorted(personil_names))
-
-        first_author = next(
-            (ra.author for ra in research.authors if ra.author and ra.author.user),
-            None
-        )
-
-        researches_raw.append({
+        paginated.append({
             "research": research,
-            "author_name": first_author.user.name if first_author else "Unknown",
-            "author_id": first_author.id if first_author else 0,
+            "author_name": first_author[1] if first_author else "Unknown",
+            "author_id": first_author[0] if first_author else 0,
             "leader": leader,
-            "personils": personils
+            "personils": format_personils(research_members, leader)
         })
 
-    total = len(researches_raw)
-    start = (page - 1) * limit
-    end = start + limit
-    paginated = researches_raw[start:end]
-
     researches = [
         ResearchResponse(
             title=item["research"].title,